@@ -0,0 +1,191 @@
+from __future__ import annotations
+from datetime import datetime
+from decimal import Decimal
+import json
+from perfsize.files import atomic_write
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import (
+    Comparison,
+    Condition,
+    Config,
+    LazyConfigs,
+    Plan,
+    Result,
+    Run,
+)
+from typing import Any, Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+VERSION = 1
+
+
+def encode_requirements(
+    requirements: Dict[str, List[Condition]],
+) -> Dict[str, List[List[str]]]:
+    encoded: Dict[str, List[List[str]]] = {}
+    for metric, conditions in requirements.items():
+        encoded[metric] = []
+        for condition in conditions:
+            function = condition.function
+            if not isinstance(function, Comparison):
+                raise ValueError(
+                    f"Cannot save condition {condition} of {metric}, only conditions made by lt, lte, gt, gte, eq or neq"
+                )
+            encoded[metric].append(
+                [function.operator, str(function.target), condition.description]
+            )
+    return encoded
+
+
+def decode_requirements(
+    encoded: Dict[str, List[List[str]]],
+) -> Dict[str, List[Condition]]:
+    return {
+        metric: [
+            Condition(Comparison(operator, Decimal(target)), description)
+            for operator, target, description in conditions
+        ]
+        for metric, conditions in encoded.items()
+    }
+
+
+def tested_configs(plan: Plan) -> List[Config]:
+    # Configs in history, then any others with runs, each once.
+    configs = plan.configs
+    if isinstance(configs, LazyConfigs):
+        candidates = list(configs.materialized.values())
+    else:
+        candidates = list(configs.values())
+    tested = {id(config): config for config in plan.history}
+    for config in candidates:
+        if config.runs:
+            tested.setdefault(id(config), config)
+    return list(tested.values())
+
+
+def save(plan: Plan, path: str) -> None:
+    """Save plan with all runs and results as a compressed npz file.
+
+    The "meta" array holds a JSON summary: parameters, requirements, history,
+    recommendation and the status of each tested config. Runs and results
+    are in separate arrays with one element per run or result, which numpy
+    only reads when accessed. Result values are stored as strings, so they
+    load as the same Decimals. Conditions must be made by lt and the others.
+    """
+    names = list(plan.parameter_lists)
+    configs = tested_configs(plan)
+    index = {id(config): position for position, config in enumerate(configs)}
+    metrics: Dict[str, int] = {}
+    run_config: List[int] = []
+    run_ids: List[str] = []
+    run_starts: List[str] = []
+    run_ends: List[str] = []
+    run_aborted: List[bool] = []
+    result_run: List[int] = []
+    result_metric: List[int] = []
+    result_value: List[str] = []
+    for position, config in enumerate(configs):
+        for run in config.runs:
+            for result in run.results:
+                result_run.append(len(run_ids))
+                result_metric.append(metrics.setdefault(result.metric, len(metrics)))
+                result_value.append(str(result.value))
+            run_config.append(position)
+            run_ids.append(run.id)
+            run_starts.append(run.start.isoformat())
+            run_ends.append(run.end.isoformat())
+            run_aborted.append(run.aborted)
+    meta = {
+        "version": VERSION,
+        "parameter_lists": plan.parameter_lists,
+        "load_parameters": plan.load_parameters,
+        "lazy": isinstance(plan.configs, LazyConfigs),
+        "requirements": encode_requirements(plan.requirements),
+        "configs": [[config.parameters[name] for name in names] for config in configs],
+        "statuses": [config.status for config in configs],
+        "confidences": [config.confidence for config in configs],
+        "history": [index[id(config)] for config in plan.history],
+        "recommendation": plan.recommendation,
+        "metrics": list(metrics),
+        "runs": len(run_ids),
+        "results": len(result_value),
+    }
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        "run_config": np.array(run_config, dtype=np.int32),
+        "run_id": np.array(run_ids, dtype=str),
+        "run_start": np.array(run_starts, dtype=str),
+        "run_end": np.array(run_ends, dtype=str),
+        "run_aborted": np.array(run_aborted, dtype=bool),
+        "result_run": np.array(result_run, dtype=np.int32),
+        "result_metric": np.array(result_metric, dtype=np.int32),
+        "result_value": np.array(result_value, dtype=str),
+    }
+    with atomic_write(path, "wb") as f:
+        np.savez_compressed(f, **arrays)  # type: ignore[arg-type]
+
+
+def summary(path: str) -> Dict[str, Any]:
+    """The JSON summary of a saved plan, without reading runs or results."""
+    with np.load(path, allow_pickle=False) as arrays:
+        meta: Dict[str, Any] = json.loads(bytes(arrays["meta"]).decode())
+    if meta["version"] != VERSION:
+        raise ValueError(
+            f"Unsupported plan file version {meta['version']}, expected {VERSION}"
+        )
+    return meta
+
+
+def load(path: str, runs: bool = True) -> Plan:
+    """Plan saved by save, with history and recommendation. Configs get
+    their runs and results unless `runs` is False."""
+    meta = summary(path)
+    requirements = decode_requirements(meta["requirements"])
+    plan = Plan(
+        meta["parameter_lists"],
+        requirements,
+        lazy=meta["lazy"],
+        load_parameters=meta["load_parameters"] or None,
+    )
+    configs = [plan.configs[tuple(values)] for values in meta["configs"]]
+    plan.history = [configs[position] for position in meta["history"]]
+    plan.recommendation = meta["recommendation"]
+    if not runs:
+        return plan
+    with np.load(path, allow_pickle=False) as arrays:
+        run_config = arrays["run_config"].tolist()
+        run_ids = arrays["run_id"].tolist()
+        run_starts = arrays["run_start"].tolist()
+        run_ends = arrays["run_end"].tolist()
+        run_aborted = arrays["run_aborted"].tolist()
+        result_run = arrays["result_run"]
+        result_metric = arrays["result_metric"].tolist()
+        result_value = arrays["result_value"].tolist()
+    # Results are saved run by run, so those of each run are contiguous.
+    bounds = np.searchsorted(result_run, np.arange(len(run_ids) + 1)).tolist()
+    metrics = meta["metrics"]
+    values = list(map(Decimal, result_value))
+    for run_index, (position, run_id, start, end, aborted) in enumerate(
+        zip(run_config, run_ids, run_starts, run_ends, run_aborted)
+    ):
+        config = configs[position]
+        conditions = [config.requirements.get(metric, []) for metric in metrics]
+        rows = range(bounds[run_index], bounds[run_index + 1])
+        results = [
+            Result(
+                metrics[result_metric[row]],
+                values[row],
+                conditions[result_metric[row]],
+            )
+            for row in rows
+        ]
+        run = Run(
+            run_id, datetime.fromisoformat(start), datetime.fromisoformat(end), results
+        )
+        run.aborted = aborted
+        config.runs.append(run)
+    return plan
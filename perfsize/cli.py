@@ -0,0 +1,115 @@
+from __future__ import annotations
+import argparse
+from decimal import Decimal
+import importlib
+import json
+from perfsize.archive import save
+from perfsize.journal import Journal
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import Comparison, Condition, Plan, Workflow
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = LazyModule("yaml")
+
+USAGE = """\
+Run a plan defined in YAML and print the recommendation as JSON. Exits with
+status 1 if no config met the requirements. Example plan:
+
+parameters:
+  instance_type: [ml.m5.large, ml.m5.xlarge]
+  steady_state_tps: [10, 20, 30]
+load_parameters: [steady_state_tps]
+requirements:
+  latency_success_p99: ["< 200", ">= 0"]
+step_manager: perfsize.step.binary.BinarySearchStepManager
+environment_manager: perfsize.environment.mock.MockEnvironmentManager
+load_manager: perfsize.load.mock.MockLoadManager
+result_managers:
+  - class: perfsize.result.mock.MockResultManager
+reporters: []
+workflow:
+  teardown_between_steps: true
+
+Managers are given as a dotted class name, or as a mapping with the class
+name and the keyword options to create it with. The step manager also gets
+the plan as its first argument. Workflow options are passed to Workflow.
+"""
+
+
+def parse_condition(text: str) -> Condition:
+    """Condition from text like "< 200", an operator and a decimal target."""
+    operator, _, target = text.strip().partition(" ")
+    if operator not in Comparison.OPERATORS or not target.strip():
+        raise ValueError(
+            f"Invalid condition {text!r}, expected an operator and a target like '< 200'"
+        )
+    return Condition(
+        Comparison(operator, Decimal(target.strip())),
+        f"value {operator} {target.strip()}",
+    )
+
+
+def create(spec: Any, *args: Any) -> Any:
+    """Instance of the class named by spec, a dotted name or a mapping with
+    "class" and optional "options"."""
+    if isinstance(spec, str):
+        spec = {"class": spec}
+    module_name, _, class_name = spec["class"].rpartition(".")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(*args, **spec.get("options", {}))
+
+
+def create_workflow(definition: Dict[str, Any]) -> Workflow:
+    plan = Plan(
+        parameter_lists={
+            name: [str(value) for value in values]
+            for name, values in definition["parameters"].items()
+        },
+        requirements={
+            metric: [parse_condition(condition) for condition in conditions]
+            for metric, conditions in definition.get("requirements", {}).items()
+        },
+        lazy=definition.get("lazy", False),
+        load_parameters=definition.get("load_parameters"),
+    )
+    return Workflow(
+        plan=plan,
+        step_manager=create(definition["step_manager"], plan),
+        environment_manager=create(definition["environment_manager"]),
+        load_manager=create(definition["load_manager"]),
+        result_managers=[create(spec) for spec in definition["result_managers"]],
+        reporters=[create(spec) for spec in definition.get("reporters", [])],
+        **definition.get("workflow", {}),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="perfsize",
+        description=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("plan", help="YAML file defining the plan and managers")
+    parser.add_argument(
+        "--journal", help="journal file to resume from and record steps to"
+    )
+    parser.add_argument("--save", help="file to save the plan with all runs to")
+    args = parser.parse_args(argv)
+
+    with open(args.plan) as f:
+        definition = yaml.safe_load(f)
+    workflow = create_workflow(definition)
+    if args.journal:
+        workflow.journal = Journal(args.journal)
+    try:
+        recommendation = workflow.run()
+    finally:
+        if workflow.journal is not None:
+            workflow.journal.close()
+    if args.save:
+        save(workflow.plan, args.save)
+    print(json.dumps(recommendation))
+    return 0 if recommendation else 1
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from decimal import Decimal
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import Comparison, Condition, Config, Plan, Run
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import weakref
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+# Decimals with at most this many significant digits, and an exponent well
+# within range, convert to distinct float64 values in the same order, so
+# comparing the floats gives the same answer as comparing the Decimals.
+FLOAT_DIGITS = 15
+FLOAT_EXPONENT = 300
+
+
+def exact(value: Decimal) -> bool:
+    return (
+        value.is_finite()
+        and len(value.as_tuple().digits) <= FLOAT_DIGITS
+        and abs(value.adjusted()) <= FLOAT_EXPONENT
+    )
+
+
+class BatchEvaluator:
+    """Status of many runs at once against the given requirements, like
+    Run.status with the conditions of each result replaced by the ones
+    required for its metric. A finished plan can be checked against new
+    requirements this way without querying results again.
+
+    Values are grouped by metric, and each Comparison condition is applied to
+    all values of its metric in one numpy operation. Other condition
+    functions, and values or targets float64 cannot represent exactly, are
+    called one value at a time. Statuses are cached per run until results
+    are added to it or it is aborted, and per config of several runs until
+    a run is added or one of its runs changes that way.
+    """
+
+    def __init__(self, requirements: Dict[str, List[Condition]]):
+        self.requirements = requirements
+        self.cache: (
+            "weakref.WeakKeyDictionary[Run, Tuple[int, bool, Optional[bool]]]"
+        ) = weakref.WeakKeyDictionary()
+        # The mean Run of a config is new on each call, so its status is
+        # cached on the config instead.
+        self.config_cache: "weakref.WeakKeyDictionary[Config, Tuple[Tuple[Tuple[int, bool], ...], Optional[bool]]]" = (weakref.WeakKeyDictionary())
+
+    def evaluate(self, runs: Sequence[Run]) -> List[Optional[bool]]:
+        statuses: List[Optional[bool]] = [None] * len(runs)
+        pending = []
+        for index, run in enumerate(runs):
+            cached = self.cache.get(run)
+            if cached is not None and cached[:2] == (len(run.results), run.aborted):
+                statuses[index] = cached[2]
+            else:
+                pending.append(index)
+        computed = self.compute([runs[index] for index in pending])
+        for index, status in zip(pending, computed):
+            run = runs[index]
+            statuses[index] = status
+            self.cache[run] = (len(run.results), run.aborted, status)
+        return statuses
+
+    def compute(self, runs: Sequence[Run]) -> List[Optional[bool]]:
+        failed = np.zeros(len(runs), dtype=bool)
+        checked = np.zeros(len(runs), dtype=bool)
+        by_metric: Dict[str, Tuple[List[int], List[Decimal]]] = {}
+        for index, run in enumerate(runs):
+            for result in run.results:
+                if self.requirements.get(result.metric):
+                    rows, values = by_metric.setdefault(result.metric, ([], []))
+                    rows.append(index)
+                    values.append(result.value)
+        for metric, (rows, values) in by_metric.items():
+            passed = self.check(self.requirements[metric], values)
+            np.logical_or.at(failed, rows, ~passed)
+            checked[rows] = True
+        return [
+            False if run.aborted or failed[index] else True if checked[index] else None
+            for index, run in enumerate(runs)
+        ]
+
+    def check(self, conditions: List[Condition], values: List[Decimal]) -> np.ndarray:
+        """Whether each value meets all conditions."""
+        exact_values = np.array([exact(value) for value in values], dtype=bool)
+        floats = np.array(
+            [float(value) if exact(value) else 0.0 for value in values],
+            dtype=np.float64,
+        )
+        passed = np.ones(len(values), dtype=bool)
+        for condition in conditions:
+            function = condition.function
+            if isinstance(function, Comparison) and exact(function.target):
+                operator = Comparison.OPERATORS[function.operator]
+                meets = np.asarray(operator(floats, float(function.target)))
+                slow = np.flatnonzero(~exact_values)
+            else:
+                meets = np.ones(len(values), dtype=bool)
+                slow = np.arange(len(values))
+            for row in slow:
+                meets[row] = function(values[row])
+            passed &= meets
+        return passed
+
+    def evaluate_configs(self, configs: Sequence[Config]) -> List[Optional[bool]]:
+        """Like Config.status of each config, against the requirements."""
+        statuses: List[Optional[bool]] = [None] * len(configs)
+        indexes = []
+        runs = []
+        for index, config in enumerate(configs):
+            if any(run.aborted for run in config.runs):
+                statuses[index] = False
+            elif len(config.runs) > 1:
+                cached = self.config_cache.get(config)
+                if cached is not None and cached[0] == self.runs_key(config):
+                    statuses[index] = cached[1]
+                else:
+                    indexes.append(index)
+                    runs.append(config.combined())
+            elif config.runs:
+                indexes.append(index)
+                runs.append(config.runs[0])
+        for index, status in zip(indexes, self.evaluate(runs)):
+            statuses[index] = status
+            config = configs[index]
+            if len(config.runs) > 1:
+                self.config_cache[config] = (self.runs_key(config), status)
+        return statuses
+
+    @staticmethod
+    def runs_key(config: Config) -> Tuple[Tuple[int, bool], ...]:
+        return tuple((len(run.results), run.aborted) for run in config.runs)
+
+    def evaluate_plan(self, plan: Plan) -> List[Tuple[Config, Optional[bool]]]:
+        """Each config tested in the plan, in history order, with its status
+        against the requirements."""
+        configs = list({id(config): config for config in plan.history}.values())
+        return list(zip(configs, self.evaluate_configs(configs)))
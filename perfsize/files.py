@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+import os
+from typing import Any, IO, Iterator
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w") -> Iterator[IO[Any]]:
+    """Open a temporary file next to path for writing, and rename it to path
+    once the block completes, so readers never see a partial file. If the
+    block raises, the temporary file is removed and path is left as it was."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
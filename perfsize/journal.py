@@ -0,0 +1,98 @@
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+import json
+import os
+from perfsize.perfsize import Config, Result, Run
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+def parameters_key(parameters: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Canonical key of config parameters, regardless of their order."""
+    return tuple(sorted(parameters.items()))
+
+
+def encode_run(config: Config, run: Run) -> Dict[str, Any]:
+    """JSON compatible record of a run of config. Decimal values are kept as
+    strings so they decode exactly."""
+    return {
+        "parameters": config.parameters,
+        "id": run.id,
+        "start": run.start.isoformat(),
+        "end": run.end.isoformat(),
+        "aborted": run.aborted,
+        "results": [
+            {"metric": result.metric, "value": str(result.value)}
+            for result in run.results
+        ],
+    }
+
+
+def decode_run(record: Dict[str, Any], config: Config) -> Run:
+    """Run from a record made by encode_run, with the conditions of results
+    taken from the requirements of config."""
+    results = [
+        Result(
+            metric=result["metric"],
+            value=Decimal(result["value"]),
+            conditions=config.requirements.get(result["metric"], []),
+        )
+        for result in record["results"]
+    ]
+    run = Run(
+        record["id"],
+        datetime.fromisoformat(record["start"]),
+        datetime.fromisoformat(record["end"]),
+        results,
+    )
+    run.aborted = record["aborted"]
+    return run
+
+
+class Journal:
+    """Append-only JSON lines file with one record per completed step, so a
+    Workflow can resume after a crash without running finished steps again.
+
+    Records already in the file are loaded on creation, to be taken back by
+    `pop` when the step manager hands out the same config again. A last line
+    cut short by a crash is dropped. Each append is one buffered write and a
+    flush. With `fsync`, it is also forced to disk, which survives a machine
+    crash rather than only a process crash, at the cost of a slower append.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.recorded: Dict[Tuple[Tuple[str, str], ...], Deque[Dict[str, Any]]] = {}
+        complete = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete += len(line)
+                    record = json.loads(line)
+                    key = parameters_key(record["parameters"])
+                    self.recorded.setdefault(key, deque()).append(record)
+        self.file = open(path, "ab")
+        self.file.truncate(complete)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.recorded.values())
+
+    def pop(self, config: Config) -> Optional[Run]:
+        """Earliest recorded run of config not taken yet, or None."""
+        records = self.recorded.get(parameters_key(config.parameters))
+        if not records:
+            return None
+        return decode_run(records.popleft(), config)
+
+    def append(self, config: Config, run: Run) -> None:
+        line = json.dumps(encode_run(config, run), separators=(",", ":")) + "\n"
+        self.file.write(line.encode())
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.file.close()
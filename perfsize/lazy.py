@@ -0,0 +1,15 @@
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """Stand-in for the module with the given name, imported on first access
+    to one of its attributes. Keeps heavy dependencies like numpy and pandas
+    out of the import time of modules that may not need them."""
+
+    def __getattr__(self, name: str) -> Any:
+        module = importlib.import_module(self.__name__)
+        # Later lookups find the attributes directly.
+        self.__dict__.update(module.__dict__)
+        return getattr(module, name)
@@ -11,3 +11,6 @@ class MockLoadManager(LoadManager):
         end = datetime.utcnow()
         id = f"{start.timestamp()}-test"
         return Run(id, start, end, results=[])
+
+    def abort(self, config: Config) -> None:
+        print(f"MockLoadManager is aborting load based on {config}")
@@ -1,45 +1,108 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError,
+    wait,
+)
 from datetime import datetime
-import decimal
-from decimal import Decimal, FloatOperation
+from decimal import Decimal
 import itertools
+import operator
+import statistics
+from statistics import NormalDist
+import time
 from typing import (
+    Any,
     Callable,
     Dict,
-    KeysView,
+    Iterator,
     List,
+    Mapping,
     Optional,
+    Sequence,
+    Set,
     Tuple,
-    ValuesView,
+    TYPE_CHECKING,
+    Union,
+    overload,
 )
 
+if TYPE_CHECKING:
+    from perfsize.journal import Journal
+    from perfsize.table import ResultsTable
+
+
+def reject_float(value: Any, name: str) -> None:
+    # Avoid accidental mixing of decimals and floats in results and
+    # conditions, without changing the decimal context of the process.
+    if isinstance(value, float):
+        raise TypeError(f"{name} {value!r} must be a Decimal, not a float")
+
+
+class Comparison:
+    """Check of a value against a target with one of OPERATORS, callable like
+    the functions returned by lt and the others. Unlike a lambda, it can be
+    pickled, and evaluated on whole arrays of values at once."""
+
+    OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+        "==": operator.eq,
+        "!=": operator.ne,
+    }
+
+    def __init__(self, operator: str, target: Decimal):
+        if operator not in self.OPERATORS:
+            raise ValueError(
+                f"Unsupported operator {operator}, expected one of {list(self.OPERATORS)}"
+            )
+        reject_float(target, "Target")
+        self.operator = operator
+        self.target = target
+
+    def __call__(self, value: Decimal) -> bool:
+        reject_float(value, "Value")
+        return bool(self.OPERATORS[self.operator](value, self.target))
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Comparison)
+            and self.operator == other.operator
+            and self.target == other.target
+        )
 
-# Avoid accidental mixing of decimals and floats in constructors or comparisons
-c = decimal.getcontext()
-c.traps[FloatOperation] = True
+    def __hash__(self) -> int:
+        return hash((self.operator, self.target))
+
+    def __repr__(self) -> str:
+        return f"Comparison('{self.operator}', {self.target!r})"
 
 
-def lt(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x < target
+def lt(target: Decimal) -> Comparison:
+    return Comparison("<", target)
 
 
-def lte(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x <= target
+def lte(target: Decimal) -> Comparison:
+    return Comparison("<=", target)
 
 
-def gt(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x > target
+def gt(target: Decimal) -> Comparison:
+    return Comparison(">", target)
 
 
-def gte(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x >= target
+def gte(target: Decimal) -> Comparison:
+    return Comparison(">=", target)
 
 
-def eq(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x == target
+def eq(target: Decimal) -> Comparison:
+    return Comparison("==", target)
 
 
-def neq(target: Decimal) -> Callable[[Decimal], bool]:
-    return lambda x: x != target
+def neq(target: Decimal) -> Comparison:
+    return Comparison("!=", target)
 
 
 class Condition:
@@ -53,6 +116,7 @@ class Condition:
 
 class Result:
     def __init__(self, metric: str, value: Decimal, conditions: List[Condition]):
+        reject_float(value, f"Value of {metric}")
         self.metric = metric
         self.value = value
         self.conditions = conditions
@@ -81,6 +145,8 @@ class Run:
         self.start = start
         self.end = end
         self.results = results
+        # Set when load was stopped early because requirements were violated.
+        self.aborted = False
 
     def __repr__(self) -> str:
         return (
@@ -89,13 +155,17 @@ class Run:
 
     @property
     def status(self) -> Optional[bool]:
-        # False if any failure, else True if any success, else None
+        # False if aborted or any failure, else True if any success, else None
+        if self.aborted:
+            return False
+        # Checks each condition once, rather than once each for successes
+        # and failures.
         found_success: Optional[bool] = None
         for result in self.results:
-            if result.successes:
+            for condition in result.conditions:
+                if not condition.function(result.value):
+                    return False
                 found_success = True
-            if result.failures:
-                return False
         return found_success
 
     # TODO: Add context (screenshots, graphs, captions, DataFrames) per Run/Plan
@@ -112,36 +182,294 @@ class Config:
     def __repr__(self) -> str:
         return f"Config(parameters={self.parameters},requirements={self.requirements},runs={self.runs})"
 
+    # Largest shift of a metric's mean checked, in standard errors.
+    MAX_Z = 4.0
+
+    def samples(self) -> Tuple[Dict[str, List[Decimal]], Dict[str, List[Condition]]]:
+        # Values of each metric over the runs, and its latest conditions.
+        values: Dict[str, List[Decimal]] = {}
+        conditions: Dict[str, List[Condition]] = {}
+        for run in self.runs:
+            for result in run.results:
+                values.setdefault(result.metric, []).append(result.value)
+                conditions[result.metric] = result.conditions
+        return values, conditions
+
+    @property
+    def status(self) -> Optional[bool]:
+        # Status of all runs together: False if any was aborted, else the
+        # status of the mean of each metric. Same as Run.status for one run.
+        if not self.runs:
+            return None
+        if any(run.aborted for run in self.runs):
+            return False
+        return self.combined().status
+
+    def combined(self) -> Run:
+        # The run itself if there is one, else a Run with the mean of each
+        # metric over the runs. Needs at least one run.
+        if len(self.runs) == 1:
+            return self.runs[0]
+        values, conditions = self.samples()
+        means = [
+            Result(metric, statistics.mean(metric_values), conditions[metric])
+            for metric, metric_values in values.items()
+        ]
+        return Run("mean", self.runs[0].start, self.runs[-1].end, means)
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """Probability that status is right given the spread of each metric
+        over the runs, or None with fewer than two runs.
+
+        A metric's status holds while its mean moves by up to z standard
+        errors either way, and its confidence is the normal CDF of the largest
+        such z, capped at MAX_Z. A pass is as confident as its least confident
+        metric, a failure as its most confident failing metric. Aborted runs
+        and configs without conditions are certain.
+        """
+        if any(run.aborted for run in self.runs):
+            return 1.0
+        if len(self.runs) < 2:
+            return None
+        status = self.status
+        values, conditions = self.samples()
+        confidences = []
+        for metric, metric_values in values.items():
+            if not conditions[metric]:
+                continue
+            mean = statistics.mean(metric_values)
+            if (
+                status is False
+                and not Result(metric, mean, conditions[metric]).failures
+            ):
+                continue
+            z = self.margin(metric, metric_values, conditions[metric])
+            confidences.append(NormalDist().cdf(z))
+        if not confidences:
+            return 1.0
+        return min(confidences) if status else max(confidences)
+
+    def margin(
+        self, metric: str, values: List[Decimal], conditions: List[Condition]
+    ) -> float:
+        # Largest z, up to MAX_Z, for which the status of the mean of values
+        # is the same at the mean plus or minus z standard errors. Zero if the
+        # metric has a single value, as its spread is unknown.
+        if len(values) < 2:
+            return 0.0
+        mean = statistics.mean(values)
+        error = statistics.stdev(values) / Decimal(len(values)).sqrt()
+        passed = not Result(metric, mean, conditions).failures
+
+        def flips(z: float) -> bool:
+            shift = error * Decimal(repr(z))
+            return any(
+                (not Result(metric, value, conditions).failures) != passed
+                for value in (mean - shift, mean + shift)
+            )
+
+        if error == 0 or not flips(self.MAX_Z):
+            return self.MAX_Z
+        low, high = 0.0, self.MAX_Z
+        for _ in range(20):
+            middle = (low + high) / 2
+            if flips(middle):
+                high = middle
+            else:
+                low = middle
+        return low
+
+
+class Combinations(Sequence[Tuple[str, ...]]):
+    """All combinations of parameter values, in the same order as
+    itertools.product, without materializing them. Each combination is
+    addressed by a mixed-radix index with one digit per parameter, the last
+    parameter varying fastest.
+
+    `order` lists parameter names from slowest to fastest varying, if other
+    than plan order. Combinations still list values in plan order."""
+
+    def __init__(
+        self, parameter_lists: Dict[str, List[str]], order: Optional[List[str]] = None
+    ):
+        names = list(parameter_lists.keys())
+        if order is None:
+            order = names
+        if sorted(order) != sorted(names):
+            raise ValueError(f"Order {order} must list each parameter of {names}")
+        self.positions = [names.index(name) for name in order]
+        self.value_lists = [parameter_lists[name] for name in order]
+        self.value_indexes = [
+            {value: index for index, value in enumerate(values)}
+            for values in self.value_lists
+        ]
+        self.size = 1
+        for values in self.value_lists:
+            self.size *= len(values)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple[str, ...]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Tuple[str, ...]]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Tuple[str, ...], List[Tuple[str, ...]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Combination index out of range: {index}")
+        combination = [""] * len(self.positions)
+        for position, values in zip(
+            reversed(self.positions), reversed(self.value_lists)
+        ):
+            index, digit = divmod(index, len(values))
+            combination[position] = values[digit]
+        return tuple(combination)
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        combinations = itertools.product(*self.value_lists)
+        if self.positions == sorted(self.positions):
+            return combinations
+        ordered = [self.positions.index(i) for i in range(len(self.positions))]
+        return (tuple(combination[i] for i in ordered) for combination in combinations)
+
+    def __contains__(self, combination: object) -> bool:
+        try:
+            self.index(combination)
+        except ValueError:
+            return False
+        return True
+
+    def index(self, combination: object, start: int = 0, stop: int = -1) -> int:
+        if not (
+            isinstance(combination, tuple) and len(combination) == len(self.value_lists)
+        ):
+            raise ValueError(f"Not a combination: {combination}")
+        index = 0
+        for position, values, value_index in zip(
+            self.positions, self.value_lists, self.value_indexes
+        ):
+            value = combination[position]
+            if value not in value_index:
+                raise ValueError(f"Not a combination: {combination}")
+            index = index * len(values) + value_index[value]
+        return index
+
+
+class LazyConfigs(Mapping[Tuple[str, ...], Config]):
+    """Configs by combination, each created on first access and kept."""
+
+    def __init__(
+        self,
+        combinations: Combinations,
+        parameter_names: List[str],
+        requirements: Dict[str, List[Condition]],
+    ):
+        self.combinations = combinations
+        self.parameter_names = parameter_names
+        self.requirements = requirements
+        self.materialized: Dict[Tuple[str, ...], Config] = {}
+
+    def __getitem__(self, combination: Tuple[str, ...]) -> Config:
+        config = self.materialized.get(combination)
+        if config is None:
+            if combination not in self.combinations:
+                raise KeyError(combination)
+            config = Config(
+                dict(zip(self.parameter_names, combination)), self.requirements
+            )
+            self.materialized[combination] = config
+        return config
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        return iter(self.combinations)
+
+    def __len__(self) -> int:
+        return len(self.combinations)
+
+    def __repr__(self) -> str:
+        return f"LazyConfigs(materialized={self.materialized})"
+
 
 class Plan:
     def __init__(
         self,
         parameter_lists: Dict[str, List[str]],
         requirements: Dict[str, List[Condition]],
+        lazy: bool = False,
+        load_parameters: Optional[List[str]] = None,
     ):
         self.parameter_lists = parameter_lists
         self.requirements = requirements
 
-        self.configs: Dict[Tuple[str, ...], Config] = {}
-        parameter_names: KeysView[str] = parameter_lists.keys()
-        parameter_values: ValuesView[List[str]] = parameter_lists.values()
-        self.combinations: List[Tuple[str, ...]] = list(
-            itertools.product(*parameter_values)
+        # Parameters that only change the load sent, like TPS, so configs that
+        # differ only in these can share one deployed environment. Configs are
+        # ordered with the other, infrastructure parameters varying slowest,
+        # so configs sharing an environment are tested one after another.
+        self.load_parameters = load_parameters or []
+        for name in self.load_parameters:
+            if name not in parameter_lists:
+                raise ValueError(f"Plan has no parameter {name}")
+        self.infrastructure_parameters = [
+            name for name in parameter_lists if name not in self.load_parameters
+        ]
+
+        # A lazy plan creates combinations and their configs only when used,
+        # for grids too large to create upfront.
+        self.combinations: Sequence[Tuple[str, ...]]
+        self.configs: Mapping[Tuple[str, ...], Config]
+        parameter_names = list(parameter_lists.keys())
+        combinations = Combinations(
+            parameter_lists, self.infrastructure_parameters + self.load_parameters
         )
-        for combo in self.combinations:
-            parameters: Dict[str, str] = {}
-            index = 0
-            for key in parameter_names:
-                parameters[key] = combo[index]
-                index = index + 1
-            self.configs[combo] = Config(parameters, requirements)
+        if lazy:
+            self.combinations = combinations
+            self.configs = LazyConfigs(combinations, parameter_names, requirements)
+        else:
+            self.combinations = list(combinations)
+            self.configs = {
+                combo: Config(dict(zip(parameter_names, combo)), requirements)
+                for combo in self.combinations
+            }
 
         self.history: List[Config] = []
         self.recommendation: Dict[str, str] = {}
+        self.results_table: Optional["ResultsTable"] = None
 
     def __repr__(self) -> str:
         return f"Plan(parameter_lists={self.parameter_lists},requirements={self.requirements})"
 
+    @property
+    def results(self) -> "ResultsTable":
+        """Columnar table of the results of all runs so far. Created from
+        the configs in history on first use, then extended by add_results."""
+        if self.results_table is None:
+            from perfsize.table import ResultsTable
+
+            self.results_table = ResultsTable(self.parameter_lists)
+            for config in {id(config): config for config in self.history}.values():
+                for run in config.runs:
+                    self.results_table.append(config, run)
+        return self.results_table
+
+    def add_results(self, config: Config, run: Run) -> None:
+        # Called once results of a new run of config are in.
+        if self.results_table is not None:
+            self.results_table.append(config, run)
+
+    def infrastructure_key(self, config: Config) -> Tuple[str, ...]:
+        """Values of infrastructure parameters, equal for configs that can be
+        tested on the same deployed environment."""
+        return tuple(config.parameters[name] for name in self.infrastructure_parameters)
+
     # TODO: Add properties for earliest start and latest end times across runs
 
 
@@ -154,6 +482,23 @@ class StepManager:
         # TODO: each implementation can add other state tracking like step index
         raise NotImplementedError
 
+    def next_batch(self, count: int, pending: Sequence[Config] = ()) -> List[Config]:
+        # Up to count configs to test at the same time, while the `pending`
+        # configs handed out earlier are still being tested. Empty with nothing
+        # pending means the process is completed. By default, one config at a time
+        # once nothing is pending, for implementations that pick each step
+        # based on the result of the previous one.
+        if pending:
+            return []
+        config = self.next()
+        return [config] if config else []
+
+    def peek(self) -> Optional[Config]:
+        # Config that next will probably return after the current step, for
+        # setting up its environment in advance, without changing any state.
+        # None if there is no good guess.
+        return None
+
 
 class EnvironmentManager:
     def setup(self, config: Config) -> None:
@@ -168,13 +513,36 @@ class LoadManager:
         # TODO: create Run object to track timing and results
         raise NotImplementedError
 
+    def abort(self, config: Config) -> None:
+        # Called from another thread while send is running, to stop sending
+        # load early. send should then return the Run as usual.
+        raise NotImplementedError
+
 
 class ResultManager:
     def query(self, config: Config, run: Run) -> None:
         raise NotImplementedError
 
+    def interim_start(self, config: Config) -> None:
+        # Called before each load for config is sent, including repeated runs
+        # of the same config, so interim results cover only that load.
+        pass
+
+    def interim(self, config: Config) -> List[Result]:
+        # Results so far while load for config is still being sent, checked
+        # periodically for early abort after interim_start. A failure should
+        # mean the step fails whatever the rest of the load does, so only
+        # bounds that more requests cannot bring back into range belong here.
+        # Default is no interim results, so never aborts.
+        return []
+
 
 class Reporter:
+    def step(self, plan: Plan, config: Config, run: Run) -> None:
+        # Called as each step completes, with the run of config and its
+        # results. Default is to report only at the end, in render.
+        pass
+
     def render(self, plan: Plan) -> str:
         raise NotImplementedError
 
@@ -190,7 +558,19 @@ class Workflow:
         reporters: List[Reporter],
         teardown_between_steps: bool = True,
         teardown_at_end: bool = True,
+        abort_check_seconds: Optional[float] = None,
+        abort_patience: int = 1,
+        lookahead: bool = False,
+        journal: Optional["Journal"] = None,
+        confidence: Optional[float] = None,
+        max_runs: int = 5,
     ):
+        if lookahead and not teardown_between_steps:
+            raise ValueError("Look-ahead requires teardown_between_steps")
+        if confidence is not None and not 0.5 < confidence < 1:
+            raise ValueError(f"Confidence {confidence} must be between 0.5 and 1")
+        if max_runs < 1:
+            raise ValueError(f"Max runs {max_runs} must be at least 1")
         self.plan = plan
         self.step_manager = step_manager
         self.environment_manager = environment_manager
@@ -199,28 +579,348 @@ class Workflow:
         self.reporters = reporters
         self.teardown_between_steps = teardown_between_steps
         self.teardown_at_end = teardown_at_end
+        # When set, check interim results this often while load is sent, and
+        # abort once they fail requirements this many checks in a row.
+        self.abort_check_seconds = abort_check_seconds
+        self.abort_patience = abort_patience
+        # Environment setups done, and total time they took.
+        self.deploy_count = 0
+        self.deploy_seconds = 0.0
+        # When set, set up the environment for the config the step manager
+        # expects to hand out next while the current one is being tested, in
+        # a separate environment. Counts how often that guess was right.
+        self.lookahead = lookahead
+        self.lookahead_hits = 0
+        self.lookahead_misses = 0
+        # When set, each completed step is appended to the journal, and steps
+        # recorded in it already are not run again. The step manager must pick
+        # the same steps given the same results for resume to line up.
+        self.journal = journal
+        # When set, run each config again until Config.confidence reaches
+        # this, up to max_runs times.
+        self.confidence = confidence
+        self.max_runs = max_runs
+
+    def send(self, config: Config) -> Run:
+        if self.abort_check_seconds is None:
+            return self.load_manager.send(config)
+        for result_manager in self.result_managers:
+            result_manager.interim_start(config)
+        failed_checks = 0
+        aborted = False
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.load_manager.send, config)
+            while True:
+                try:
+                    run = future.result(timeout=self.abort_check_seconds)
+                    break
+                except TimeoutError:
+                    pass
+                if aborted:
+                    continue
+                results = [
+                    result
+                    for result_manager in self.result_managers
+                    for result in result_manager.interim(config)
+                ]
+                if any(result.failures for result in results):
+                    failed_checks += 1
+                else:
+                    failed_checks = 0
+                if failed_checks >= self.abort_patience:
+                    failures = " ".join(
+                        f"{result.metric}={result.value}"
+                        for result in results
+                        if result.failures
+                    )
+                    print(f"Aborting step: {config.parameters} {failures}")
+                    self.load_manager.abort(config)
+                    aborted = True
+        run.aborted = aborted
+        return run
+
+    def reusable(self, deployed: Optional[Config], config: Optional[Config]) -> bool:
+        # Whether config can be tested on the environment deployed for another.
+        return (
+            deployed is not None
+            and config is not None
+            and self.plan.infrastructure_key(deployed)
+            == self.plan.infrastructure_key(config)
+        )
+
+    def setup(self, environment_manager: EnvironmentManager, config: Config) -> float:
+        # Set up the environment for config, returning how long it took.
+        start = time.monotonic()
+        environment_manager.setup(config)
+        return time.monotonic() - start
+
+    def deploy(
+        self,
+        environment_manager: EnvironmentManager,
+        deployed: Optional[Config],
+        config: Config,
+    ) -> Config:
+        # Set up the environment for config, unless the deployed one has the
+        # same infrastructure parameters. Returns the config deployed.
+        if deployed and self.reusable(deployed, config):
+            return deployed
+        self.count_deploy(self.setup(environment_manager, config))
+        return config
+
+    def count_deploy(self, seconds: float) -> None:
+        self.deploy_count += 1
+        self.deploy_seconds += seconds
+
+    def report_deploys(self) -> None:
+        print(f"Deploys: {self.deploy_count} taking {self.deploy_seconds:.1f}s")
+        if self.lookahead:
+            print(
+                f"Look-ahead deploys: {self.lookahead_hits} used, {self.lookahead_misses} discarded"
+            )
+
+    def discard(self, config: Config, setup: "Future[float]") -> float:
+        # Tear down a look-ahead environment once its setup is done, returning
+        # how long the setup took.
+        seconds = setup.result()
+        self.environment_manager.teardown(config)
+        return seconds
+
+    def resume(self, config: Config) -> bool:
+        # Take the run of config from the journal if recorded there already.
+        run = self.journal.pop(config) if self.journal is not None else None
+        if run is None:
+            return False
+        config.runs.append(run)
+        self.completed(config, run, "Step (from journal)")
+        return True
+
+    def replay(self, config: Config) -> bool:
+        # Take runs of config from the journal while more are needed. True if
+        # no more runs are needed, False if config must be sent again.
+        if not self.resume(config):
+            return False
+        while self.repeat(config):
+            if not self.resume(config):
+                return False
+        return True
+
+    def repeat(self, config: Config) -> bool:
+        # Whether config needs another run to reach the confidence target.
+        if self.confidence is None or len(config.runs) >= self.max_runs:
+            return False
+        confidence = config.confidence
+        return confidence is None or confidence < self.confidence
+
+    def record(self, config: Config, run: Run) -> None:
+        config.runs.append(run)
+        for result_manager in self.result_managers:
+            result_manager.query(config, run)
+        self.completed(config, run, "Step")
+        if self.journal is not None:
+            self.journal.append(config, run)
+
+    def completed(self, config: Config, run: Run, label: str) -> None:
+        # Results of a new run of config are in. Prints one line per step,
+        # with the run rather than all runs of config so far.
+        self.plan.add_results(config, run)
+        values = " ".join(f"{result.metric}={result.value}" for result in run.results)
+        print(f"{label}: {config.parameters} run={run.id} status={run.status} {values}")
+        for reporter in self.reporters:
+            reporter.step(self.plan, config, run)
 
     def run(self) -> Dict[str, str]:
         config = self.step_manager.next()
-        while config:
-            self.environment_manager.setup(config)
-            run = self.load_manager.send(config)
-            config.runs.append(run)
-            for result_manager in self.result_managers:
-                result_manager.query(config, run)
-            print(f"Step: {config}")
-            if self.teardown_between_steps:
-                self.environment_manager.teardown(config)
-            next_config = self.step_manager.next()
-            # If no more configs to test, and teardown not already happening
-            # between steps, do teardown on final config.
-            if (
-                not next_config
-                and not self.teardown_between_steps
-                and self.teardown_at_end
-            ):
-                self.environment_manager.teardown(config)
-            config = next_config
+        deployed: Optional[Config] = None
+        # Environment set up in the background for the probable next config.
+        lookahead: Optional[Tuple[Config, "Future[float]"]] = None
+        discards: List["Future[float]"] = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            while config:
+                if self.replay(config):
+                    config = self.step_manager.next()
+                    continue
+                if lookahead and self.reusable(lookahead[0], config):
+                    self.count_deploy(lookahead[1].result())
+                    self.lookahead_hits += 1
+                    deployed = lookahead[0]
+                elif lookahead:
+                    self.lookahead_misses += 1
+                    if not lookahead[1].cancel():
+                        discards.append(executor.submit(self.discard, *lookahead))
+                lookahead = None
+                deployed = self.deploy(self.environment_manager, deployed, config)
+                if self.lookahead:
+                    guess = self.step_manager.peek()
+                    if guess and not self.reusable(deployed, guess):
+                        future = executor.submit(
+                            self.setup, self.environment_manager, guess
+                        )
+                        lookahead = (guess, future)
+                self.record(config, self.send(config))
+                while self.repeat(config):
+                    self.record(config, self.send(config))
+                next_config = self.step_manager.next()
+                # Keep the environment if the next config can be tested on it.
+                # Otherwise tear it down if tearing down between steps, or if
+                # no more configs to test and tearing down at end.
+                if not self.reusable(deployed, next_config) and (
+                    self.teardown_between_steps
+                    or (not next_config and self.teardown_at_end)
+                ):
+                    self.environment_manager.teardown(deployed)
+                    deployed = None
+                config = next_config
+            if lookahead:
+                self.lookahead_misses += 1
+                if not lookahead[1].cancel():
+                    discards.append(executor.submit(self.discard, *lookahead))
+            for discard in discards:
+                self.count_deploy(discard.result())
+        self.report_deploys()
+        for reporter in self.reporters:
+            print(reporter.render(self.plan))
+        return self.plan.recommendation
+
+
+class ParallelWorkflow(Workflow):
+    """Workflow testing several configs at the same time, each in one of the
+    given environment slots, as many as the step manager hands out at once.
+
+    Setup, sending load and teardown of each slot run in worker threads. Step
+    manager calls, result queries and all updates to Plan and Config happen in
+    the calling thread, so they need no locks. The load manager must be safe
+    to call from several threads at once.
+    """
+
+    def __init__(
+        self,
+        plan: Plan,
+        step_manager: StepManager,
+        environment_managers: Sequence[EnvironmentManager],
+        load_manager: LoadManager,
+        result_managers: List[ResultManager],
+        reporters: List[Reporter],
+        teardown_between_steps: bool = True,
+        teardown_at_end: bool = True,
+        journal: Optional["Journal"] = None,
+        confidence: Optional[float] = None,
+        max_runs: int = 5,
+    ):
+        if not environment_managers:
+            raise ValueError("At least one environment manager is required")
+        super().__init__(
+            plan,
+            step_manager,
+            environment_managers[0],
+            load_manager,
+            result_managers,
+            reporters,
+            teardown_between_steps,
+            teardown_at_end,
+            journal=journal,
+            confidence=confidence,
+            max_runs=max_runs,
+        )
+        self.environment_managers = list(environment_managers)
+
+    def setup_and_send(
+        self, slot: int, config: Config, setup: bool, teardown: Optional[Config]
+    ) -> Tuple[Run, Optional[float]]:
+        # Returns the Run, and how long setup took if it was needed.
+        if teardown:
+            self.environment_managers[slot].teardown(teardown)
+        setup_seconds = None
+        if setup:
+            start = time.monotonic()
+            self.environment_managers[slot].setup(config)
+            setup_seconds = time.monotonic() - start
+        return self.load_manager.send(config), setup_seconds
+
+    def run(self) -> Dict[str, str]:
+        free = list(range(len(self.environment_managers)))
+        deployed: Dict[int, Config] = {}
+        steps: Dict["Future[Any]", Tuple[int, Config]] = {}
+        teardowns: Dict["Future[Any]", int] = {}
+        with ThreadPoolExecutor(max_workers=len(free)) as executor:
+            while True:
+                resumed = False
+                if free:
+                    for config in self.step_manager.next_batch(
+                        len(free), [config for _, config in steps.values()]
+                    ):
+                        if self.replay(config):
+                            resumed = True
+                            continue
+                        # Prefer a slot already deployed with the same
+                        # infrastructure parameters, then one not deployed.
+                        key = self.plan.infrastructure_key(config)
+                        slot = min(
+                            free,
+                            key=lambda slot: (
+                                0
+                                if slot in deployed
+                                and self.plan.infrastructure_key(deployed[slot]) == key
+                                else 1 if slot not in deployed else 2
+                            ),
+                        )
+                        free.remove(slot)
+                        setup = slot not in deployed or (
+                            self.plan.infrastructure_key(deployed[slot]) != key
+                        )
+                        previous = None
+                        if setup:
+                            if self.teardown_between_steps:
+                                previous = deployed.get(slot)
+                            deployed[slot] = config
+                        future = executor.submit(
+                            self.setup_and_send, slot, config, setup, previous
+                        )
+                        steps[future] = (slot, config)
+                    # Tear down environments not reused by the configs above.
+                    if self.teardown_between_steps:
+                        for slot in [slot for slot in free if slot in deployed]:
+                            free.remove(slot)
+                            teardown = executor.submit(
+                                self.environment_managers[slot].teardown,
+                                deployed.pop(slot),
+                            )
+                            teardowns[teardown] = slot
+                if resumed:
+                    # Ask for more configs given the results from the journal.
+                    continue
+                if not steps and not teardowns:
+                    break
+                done: Set["Future[Any]"]
+                done, _ = wait([*steps, *teardowns], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in teardowns:
+                        future.result()
+                        free.append(teardowns.pop(future))
+                        continue
+                    slot, config = steps.pop(future)
+                    run: Run
+                    setup_seconds: Optional[float]
+                    run, setup_seconds = future.result()
+                    if setup_seconds is not None:
+                        self.count_deploy(setup_seconds)
+                    self.record(config, run)
+                    if self.repeat(config):
+                        # Run again in the same slot, without setup.
+                        future = executor.submit(
+                            self.setup_and_send, slot, config, False, None
+                        )
+                        steps[future] = (slot, config)
+                        continue
+                    free.append(slot)
+                free.sort()
+            if self.teardown_at_end:
+                final_teardowns = [
+                    executor.submit(self.environment_managers[slot].teardown, config)
+                    for slot, config in deployed.items()
+                ]
+                for teardown in final_teardowns:
+                    teardown.result()
+        self.report_deploys()
         for reporter in self.reporters:
             print(reporter.render(self.plan))
         return self.plan.recommendation
@@ -15,6 +15,9 @@ Configs:
 History:
 {pformat(plan.history)}
 
+Status and confidence:
+{pformat([(c.parameters, c.status, c.confidence) for c in plan.history], sort_dicts=False)}
+
 Recommendation:
 {pformat(plan.recommendation)}
 """
@@ -0,0 +1,104 @@
+import csv
+from datetime import timedelta
+import json
+from perfsize.perfsize import Config, Plan, Reporter, Run
+from typing import Any, Dict, IO, List, Optional
+
+
+class StreamReporter(Reporter):
+    """Write one row per completed step to a JSON lines or CSV file while the
+    workflow runs, and render a summary built from the same steps.
+
+    Each row has the step number, the config parameters, the run id, start,
+    end and whether it was aborted, the status of the run, the status and
+    confidence of the config over its runs so far, and each result value as
+    a string. CSV has fixed columns, so it has one row per result instead,
+    with the metric and value in their own columns, and a row without them
+    for a step without results. Rows are flushed as they are written, and
+    only running totals are kept in memory.
+    """
+
+    FORMATS = ("jsonl", "csv")
+
+    def __init__(self, path: str, format: str = "jsonl"):
+        if format not in self.FORMATS:
+            raise ValueError(
+                f"Unsupported format {format}, expected one of {self.FORMATS}"
+            )
+        self.path = path
+        self.format = format
+        self.file: Optional[IO[str]] = None
+        self.writer: Optional["csv.DictWriter[str]"] = None
+        self.steps = 0
+        self.passed = 0
+        self.failed = 0
+        self.aborted = 0
+        self.load_time = timedelta()
+        self.first_passed: Optional[Dict[str, Any]] = None
+
+    def row(self, config: Config, run: Run) -> Dict[str, Any]:
+        return {
+            "step": self.steps,
+            "parameters": config.parameters,
+            "run_id": run.id,
+            "start": run.start.isoformat(),
+            "end": run.end.isoformat(),
+            "aborted": run.aborted,
+            "status": run.status,
+            "config_status": config.status,
+            "confidence": config.confidence,
+            "results": {result.metric: str(result.value) for result in run.results},
+        }
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.file is None:
+            self.file = open(self.path, "w", newline="")
+        if self.format == "jsonl":
+            self.file.write(json.dumps(row, separators=(",", ":")) + "\n")
+        else:
+            flat = {
+                **{
+                    key: row[key] for key in row if key not in ("parameters", "results")
+                },
+                **row["parameters"],
+            }
+            if self.writer is None:
+                self.writer = csv.DictWriter(
+                    self.file, fieldnames=[*flat, "metric", "value"]
+                )
+                self.writer.writeheader()
+            results = row["results"].items() or [(None, None)]
+            for metric, value in results:
+                self.writer.writerow({**flat, "metric": metric, "value": value})
+        self.file.flush()
+
+    def step(self, plan: Plan, config: Config, run: Run) -> None:
+        self.steps += 1
+        row = self.row(config, run)
+        self.write(row)
+        if run.status:
+            self.passed += 1
+            if self.first_passed is None:
+                self.first_passed = row
+        elif run.status is False:
+            self.failed += 1
+        if run.aborted:
+            self.aborted += 1
+        self.load_time += run.end - run.start
+
+    def render(self, plan: Plan) -> str:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+        lines: List[str] = [
+            f"Steps: {self.steps} (passed {self.passed}, failed {self.failed}, aborted {self.aborted}, no status {self.steps - self.passed - self.failed})",
+            f"Load time: {self.load_time}",
+        ]
+        if self.first_passed is not None:
+            lines.append(
+                f"First passing step: {self.first_passed['step']} {self.first_passed['parameters']}"
+            )
+        lines.append(f"Recommendation: {plan.recommendation}")
+        lines.append(f"Steps written to: {self.path}")
+        return "\n".join(lines)
@@ -1,13 +1,49 @@
-from datetime import datetime
+from __future__ import annotations
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+import hashlib
+import json
 import logging.config
-from numpy import array, min, max, percentile
+import mmap
 import os
-from pandas import DataFrame
-from perfsize.perfsize import Condition, Config, gte, lt, Result, ResultManager, Run
-from pprint import pprint
-from typing import Dict, List, Optional, Union
-import yaml
+from perfsize.files import atomic_write
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import (
+    Comparison,
+    Condition,
+    Config,
+    gte,
+    lt,
+    Result,
+    ResultManager,
+    Run,
+)
+from perfsize.result.latency import (
+    LatencyCounts,
+    LatencyDistribution,
+    LatencyHistogram,
+)
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = LazyModule("numpy")
+    pd = LazyModule("pandas")
 
 log = logging.getLogger(__name__)
 
@@ -35,67 +71,652 @@ class Metric:
     simulation_end = "simulation_end"
 
 
-class GatlingResultManager(ResultManager):
-    def __init__(self, results_path: str):
-        self.results_path = results_path
+def request_metric(request_name: str, metric: str) -> str:
+    """Name of a Result for one metric of the requests with given name."""
+    return f"{request_name}_{metric}"
+
+
+def planned_requests(config: Config) -> int:
+    """Requests the load of config sends, from the parameters of the Gatling
+    scenario: a linear ramp from ramp_start_tps to steady_state_tps over
+    ramp_minutes, then steady_state_tps for steady_state_minutes."""
+    parameters = config.parameters
+    steady_tps = Decimal(parameters["steady_state_tps"])
+    ramp_tps = (Decimal(parameters.get("ramp_start_tps", "0")) + steady_tps) / 2
+    ramp_seconds = Decimal(parameters.get("ramp_minutes", "0")) * 60
+    steady_seconds = Decimal(parameters["steady_state_minutes"]) * 60
+    return int(ramp_tps * ramp_seconds + steady_tps * steady_seconds)
+
+
+# Status codes used in RequestChunk.status.
+STATUS_OTHER = 0
+STATUS_OK = 1
+STATUS_KO = 2
+
+# Percentiles reported for successful request latencies.
+PERCENTILES = (25, 50, 75, 90, 95, 98, 99)
+
 
-    def get_stats(self, df: DataFrame) -> Dict[str, Decimal]:
-        df_success = df[(df["status"] == "OK")]
-        df_fail = df[(df["status"] == "KO")]
-        latency_list_success = list(df_success["latency"])
-        latency_list_fail = list(df_fail["latency"])
-        count_success = Decimal(len(latency_list_success))
-        count_fail = Decimal(len(latency_list_fail))
+class RequestStats:
+    """Running aggregates for requests sharing one name.
+
+    Successful latencies go into a LatencyCounts (exact) or LatencyHistogram
+    (bounded error and fixed memory), chosen by `latency_backend`.
+    """
+
+    def __init__(self, latency_backend: str = "exact") -> None:
+        self.count_success = 0
+        self.count_fail = 0
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.latencies: LatencyDistribution
+        if latency_backend == "histogram":
+            self.latencies = LatencyHistogram()
+        else:
+            self.latencies = LatencyCounts()
+
+    def add(self, start: int, end: int, status: str) -> None:
+        if status == "OK":
+            self.count_success += 1
+            self.latencies.add(end - start)
+        elif status == "KO":
+            self.count_fail += 1
+        if self.start is None or start < self.start:
+            self.start = start
+        if self.end is None or end > self.end:
+            self.end = end
+
+    def extend(self, start: np.ndarray, end: np.ndarray, status: np.ndarray) -> None:
+        ok = status == STATUS_OK
+        self.latencies.record(end[ok] - start[ok])
+        self.count_success += int(ok.sum())
+        self.count_fail += int((status == STATUS_KO).sum())
+        if start.size:
+            first = int(start.min())
+            last = int(end.max())
+            if self.start is None or first < self.start:
+                self.start = first
+            if self.end is None or last > self.end:
+                self.end = last
+
+    def merge(self, other: "RequestStats") -> None:
+        self.count_success += other.count_success
+        self.count_fail += other.count_fail
+        self.latencies.merge(other.latencies)
+        if other.start is not None and (self.start is None or other.start < self.start):
+            self.start = other.start
+        if other.end is not None and (self.end is None or other.end > self.end):
+            self.end = other.end
+
+    def get_stats(self) -> Dict[str, Decimal]:
+        assert self.start is not None and self.end is not None
+        count_success = Decimal(self.count_success)
+        count_fail = Decimal(self.count_fail)
         count_total = count_success + count_fail
-        latency_success = array(latency_list_success)
-        if not latency_list_success:
-            # Handle case of empty success list by forcing 0.
-            latency_success = array([0])
         stats: Dict[str, Decimal] = {}
         stats[Metric.count_success] = count_success
         stats[Metric.count_fail] = count_fail
         stats[Metric.count_total] = count_total
         stats[Metric.percent_success] = (count_success / count_total) * 100
         stats[Metric.percent_fail] = (count_fail / count_total) * 100
-        stats[Metric.latency_success_min] = Decimal(int(min(latency_success)))
-        stats[Metric.latency_success_p25] = Decimal(
-            int(percentile(latency_success, 25))
-        )
-        stats[Metric.latency_success_p50] = Decimal(
-            int(percentile(latency_success, 50))
-        )
-        stats[Metric.latency_success_p75] = Decimal(
-            int(percentile(latency_success, 75))
-        )
-        stats[Metric.latency_success_p90] = Decimal(
-            int(percentile(latency_success, 90))
-        )
-        stats[Metric.latency_success_p95] = Decimal(
-            int(percentile(latency_success, 95))
-        )
-        stats[Metric.latency_success_p98] = Decimal(
-            int(percentile(latency_success, 98))
+        if self.latencies.count:
+            assert self.latencies.min is not None and self.latencies.max is not None
+            low = self.latencies.min
+            high = self.latencies.max
+            percentiles = self.latencies.percentiles(PERCENTILES)
+        else:
+            # Handle case of empty success list by forcing 0.
+            low = high = 0
+            percentiles = [0.0] * len(PERCENTILES)
+        stats[Metric.latency_success_min] = Decimal(low)
+        for q, value in zip(PERCENTILES, percentiles):
+            stats[f"latency_success_p{q}"] = Decimal(int(value))
+        stats[Metric.latency_success_max] = Decimal(high)
+        stats[Metric.simulation_start] = Decimal(self.start)
+        stats[Metric.simulation_end] = Decimal(self.end)
+        return stats
+
+
+def status_codes(status: pd.Series) -> np.ndarray:
+    """Map a column of "OK"/"KO" strings to the STATUS_* codes."""
+    return np.select(
+        [status == "OK", status == "KO"], [STATUS_OK, STATUS_KO], STATUS_OTHER
+    ).astype(np.int8)
+
+
+def millis(duration: Optional[timedelta]) -> int:
+    """Whole milliseconds in a duration, 0 for None."""
+    if duration is None:
+        return 0
+    return duration // timedelta(milliseconds=1)
+
+
+def last_request_end(simulation_log_path: str, block_size: int = 64 * 1024) -> int:
+    """End time in epoch millis of the last REQUEST line, read backwards from
+    the end of the file so long logs are not scanned twice."""
+    with open(simulation_log_path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            lines = tail.split(b"\n")
+            # The first line may be cut off unless the start of file is reached.
+            complete = lines if position == 0 else lines[1:]
+            for line in reversed(complete):
+                if line.startswith(b"REQUEST"):
+                    tokens = line.split(b"\t")
+                    if len(tokens) != 8:
+                        raise ValueError(f"Unexpected request format: {line!r}")
+                    return int(tokens[5])
+            tail = lines[0]
+    raise RuntimeError(f"ERROR: Simulation log has no requests: {simulation_log_path}")
+
+
+class RequestChunk:
+    """Columns for the REQUEST lines found in one block of simulation.log."""
+
+    def __init__(
+        self,
+        names: List[str],
+        codes: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+        status: np.ndarray,
+    ):
+        # Distinct request names, in order of first appearance.
+        self.names = names
+        # Per request: index into names, start and end in epoch millis, status.
+        self.codes = codes
+        self.start = start
+        self.end = end
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def select(self, rows: np.ndarray) -> "RequestChunk":
+        return RequestChunk(
+            self.names,
+            self.codes[rows],
+            self.start[rows],
+            self.end[rows],
+            self.status[rows],
         )
-        stats[Metric.latency_success_p99] = Decimal(
-            int(percentile(latency_success, 99))
+
+
+def _gather(data: np.ndarray, offsets: np.ndarray, width: int) -> np.ndarray:
+    """Copy `width` bytes from each offset into one row per offset, zero filling
+    anything past either end of data."""
+    if len(data) >= width:
+        # Index a strided view of every window instead of building an index
+        # per byte.
+        windows = np.lib.stride_tricks.sliding_window_view(data, width)
+        inside = (offsets >= 0) & (offsets <= len(data) - width)
+        if inside.all():
+            rows: np.ndarray = windows[offsets]
+            return rows
+        rows = windows[np.where(inside, offsets, 0)]
+    else:
+        inside = np.zeros(len(offsets), dtype=bool)
+        rows = np.zeros((len(offsets), width), dtype=np.uint8)
+    for row in np.flatnonzero(~inside):
+        begin = int(offsets[row])
+        left = -begin if begin < 0 else 0
+        source = begin + left
+        count = max(min(len(data) - source, width - left), 0)
+        rows[row] = 0
+        rows[row, left : left + count] = data[source : source + count]
+    return rows
+
+
+def _parse_ints(data: np.ndarray, begin: np.ndarray, end: np.ndarray) -> np.ndarray:
+    # Gather digits right aligned into one row per value, then accumulate one
+    # column of digits at a time over the transposed rows. Up to 15 digits are
+    # exact in int64 with room to spare, which covers epoch millis.
+    width = end - begin
+    bad = (width == 0) | (width > 15)
+    width = np.where(bad, 0, width)
+    max_width = int(width.max(initial=0))
+    # Subtracting in uint8 wraps anything below "0" around, so one comparison
+    # finds every non digit.
+    digits = np.ascontiguousarray(
+        (_gather(data, end - max_width, max_width) - np.uint8(ord("0"))).T
+    )
+    if not (width == max_width).all():
+        digits *= np.arange(max_width)[:, None] >= max_width - width
+    bad |= (digits > 9).any(axis=0)
+    values = np.zeros(len(begin), dtype=np.int64)
+    for column in digits:
+        values *= 10
+        values += column
+    for row in np.flatnonzero(bad):
+        # Leave signs, whitespace and errors to int(), like the other engines.
+        values[row] = int(bytes(data[begin[row] : end[row]]))
+    return values
+
+
+# Keeps the low `n` bytes of a little endian 8 byte word, for n from 0 to 8.
+_BYTE_MASKS = [(1 << (8 * n)) - 1 for n in range(9)]
+
+
+def _parse_names(
+    data: np.ndarray, begin: np.ndarray, end: np.ndarray
+) -> Tuple[List[str], np.ndarray]:
+    width = end - begin
+    # Read every name as a whole number of 8 byte words, with the bytes past
+    # its end masked off, so rows can be hashed and factorized as integers.
+    words = (int(width.max(initial=0)) + 7) // 8 or 1
+    keys = _gather(data, begin, words * 8).view("<u8")
+    kept = width.astype(np.int32)[:, None] - np.arange(0, 8 * words, 8, dtype=np.int32)
+    np.clip(kept, 0, 8, out=kept)
+    keys = keys & np.array(_BYTE_MASKS, dtype=np.uint64)[kept]
+    multipliers = np.arange(1, 2 * words, 2, dtype=np.uint64) * np.uint64(
+        0x9E3779B97F4A7C15
+    )
+    hashes = (keys * multipliers).sum(axis=1, dtype=np.uint64)
+    unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    if not (keys == keys[first[inverse]]).all():
+        # Hash collision between different names, compare whole names instead.
+        padded = keys.view(f"S{words * 8}").ravel()
+        unique, first, inverse = np.unique(
+            padded, return_index=True, return_inverse=True
         )
-        stats[Metric.latency_success_max] = Decimal(int(max(latency_success)))
-        stats[Metric.simulation_start] = Decimal(int(min(array(list(df["start"])))))
-        stats[Metric.simulation_end] = Decimal(int(max(array(list(df["end"])))))
-        return stats
+        inverse = inverse.ravel()
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    names = [bytes(data[begin[i] : end[i]]).decode() for i in first[order]]
+    return names, rank[inverse]
 
-    def parse(self, simulation_log_path: str) -> Dict[str, Dict[str, Decimal]]:
-        request_names: List[str] = []
-        requests: List[Dict[str, Union[datetime, str, int]]] = []
 
-        with open(simulation_log_path) as f:
-            lines = f.readlines()
-        if not lines:
-            raise RuntimeError(f"ERROR: Simulation log is empty: {simulation_log_path}")
+# "REQUEST" as a little endian word, and the mask for its 7 bytes.
+_REQUEST_WORD = int.from_bytes(b"REQUEST\0", "little")
+_REQUEST_MASK = _BYTE_MASKS[len(b"REQUEST")]
+
+
+def tokenize_requests(data: np.ndarray) -> RequestChunk:
+    """Extract REQUEST columns from a uint8 array of complete simulation.log lines
+    with vectorized NumPy operations instead of a loop per line."""
+    # Find tabs and newlines with one comparison, as the only bytes up to "\n"
+    # expected in a log. Each line's separators run from the one after the
+    # newline ending the line before, to the newline ending it (or past the
+    # last separator, for a last line without a newline).
+    separators = np.flatnonzero(data <= ord("\n"))
+    kinds = data[separators]
+    if (kinds < ord("\t")).any():
+        # Other control characters, only expected in error messages.
+        separators = separators[kinds >= ord("\t")]
+        kinds = data[separators]
+    newlines = np.flatnonzero(kinds == ord("\n"))
+    first = np.concatenate(([0], newlines + 1))
+    last = np.append(newlines, len(separators))
+    starts = np.concatenate(([0], separators[newlines] + 1))
+    # Compare the first 7 bytes of every line with "REQUEST" as one word.
+    words = _gather(data, starts, 8).view("<u8").ravel()
+    is_request = (words & np.uint64(_REQUEST_MASK)) == np.uint64(_REQUEST_WORD)
+    first = first[is_request]
+    last = last[is_request]
+    starts = starts[is_request]
+
+    # Every REQUEST line must have 8 tab separated tokens, see aggregate_dataframe.
+    bad = np.flatnonzero(last - first != 7)
+    if bad.size:
+        row = bad[0]
+        stop = separators[last[row]] + 1 if last[row] < len(separators) else None
+        line = bytes(data[starts[row] : stop]).decode()
+        raise ValueError(f"Unexpected request format: {line}")
+    positions = separators[first[:, None] + np.arange(7)]
+
+    names, codes = _parse_names(data, positions[:, 2] + 1, positions[:, 3])
+    start = _parse_ints(data, positions[:, 3] + 1, positions[:, 4])
+    end = _parse_ints(data, positions[:, 4] + 1, positions[:, 5])
+    status_begin = positions[:, 5] + 1
+    two_chars = positions[:, 6] - status_begin == 2
+    char1 = data[np.minimum(status_begin, len(data) - 1)]
+    char2 = data[np.minimum(status_begin + 1, len(data) - 1)]
+    status = np.full(len(codes), STATUS_OTHER, dtype=np.int8)
+    status[two_chars & (char1 == ord("O")) & (char2 == ord("K"))] = STATUS_OK
+    status[two_chars & (char1 == ord("K")) & (char2 == ord("O"))] = STATUS_KO
+    return RequestChunk(names, codes, start, end, status)
+
+
+class ParseCache:
+    """Parsed aggregates saved as a compressed npz sidecar next to each
+    simulation.log, so reports and re-evaluations skip parsing the log again.
+
+    Entries are keyed by the log's size and modification time, plus a SHA-256
+    of its content when `content_hash` is set, by the latency backend, and by
+    an optional `variant` naming other settings that change the results. A
+    log that changed is parsed again and its sidecar replaced. When `max_bytes`
+    is given, the least recently used sidecars in `root` and the run
+    directories directly under it are deleted once their total size goes over
+    it. To keep directory scans rare, that is checked each time a tenth of
+    `max_bytes` has been written, so the total can go over by that much.
+    """
+
+    VERSION = 1
+    SUFFIX = ".perfsize.npz"
+    # Fraction of max_bytes to write between evictions.
+    EVICT_INTERVAL = 0.1
+
+    def __init__(
+        self, root: str, max_bytes: Optional[int] = None, content_hash: bool = False
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.content_hash = content_hash
+        self.written = 0
+
+    def sidecar_path(
+        self, simulation_log_path: str, latency_backend: str, variant: str = ""
+    ) -> str:
+        if variant:
+            variant = f".{variant}"
+        return f"{simulation_log_path}.{latency_backend}{variant}{self.SUFFIX}"
+
+    def fingerprint(self, simulation_log_path: str) -> Dict[str, Union[int, str]]:
+        stat = os.stat(simulation_log_path)
+        fingerprint: Dict[str, Union[int, str]] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if self.content_hash:
+            digest = hashlib.sha256()
+            with open(simulation_log_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            fingerprint["sha256"] = digest.hexdigest()
+        return fingerprint
+
+    def load(
+        self, simulation_log_path: str, latency_backend: str, variant: str = ""
+    ) -> Optional[Dict[str, RequestStats]]:
+        sidecar_path = self.sidecar_path(simulation_log_path, latency_backend, variant)
+        try:
+            with np.load(sidecar_path, allow_pickle=False) as arrays:
+                meta = json.loads(bytes(arrays["meta"]).decode())
+                fingerprint = self.fingerprint(simulation_log_path)
+                if (
+                    meta["version"] != self.VERSION
+                    or meta["fingerprint"] != fingerprint
+                ):
+                    return None
+                by_name: Dict[str, RequestStats] = {}
+                for index, entry in enumerate(meta["names"]):
+                    request_stats = RequestStats(latency_backend)
+                    request_stats.count_success = entry["count_success"]
+                    request_stats.count_fail = entry["count_fail"]
+                    request_stats.start = entry["start"]
+                    request_stats.end = entry["end"]
+                    latencies = request_stats.latencies
+                    latencies.count = entry["count"]
+                    latencies.min = entry["min"]
+                    latencies.max = entry["max"]
+                    keys = arrays[f"keys_{index}"]
+                    counts = arrays[f"counts_{index}"]
+                    if isinstance(latencies, LatencyHistogram):
+                        latencies.counts[keys] = counts
+                    elif isinstance(latencies, LatencyCounts):
+                        latencies.counts = dict(zip(keys.tolist(), counts.tolist()))
+                    by_name[entry["name"]] = request_stats
+        except (OSError, KeyError, ValueError) as e:
+            log.debug(f"Ignoring parse cache {sidecar_path}: {e}")
+            return None
+        # Mark as recently used for eviction.
+        os.utime(sidecar_path)
+        return by_name
+
+    def save(
+        self,
+        simulation_log_path: str,
+        latency_backend: str,
+        by_name: Dict[str, RequestStats],
+        variant: str = "",
+    ) -> None:
+        arrays: Dict[str, np.ndarray] = {}
+        names = []
+        for index, (name, request_stats) in enumerate(by_name.items()):
+            latencies = request_stats.latencies
+            names.append(
+                {
+                    "name": name,
+                    "count_success": request_stats.count_success,
+                    "count_fail": request_stats.count_fail,
+                    "start": request_stats.start,
+                    "end": request_stats.end,
+                    "count": latencies.count,
+                    "min": latencies.min,
+                    "max": latencies.max,
+                }
+            )
+            if isinstance(latencies, LatencyHistogram):
+                keys = np.flatnonzero(latencies.counts)
+                counts = latencies.counts[keys]
+            else:
+                assert isinstance(latencies, LatencyCounts)
+                keys = np.fromiter(latencies.counts.keys(), dtype=np.int64)
+                counts = np.fromiter(latencies.counts.values(), dtype=np.int64)
+            arrays[f"keys_{index}"] = keys
+            arrays[f"counts_{index}"] = counts
+        meta = {
+            "version": self.VERSION,
+            "fingerprint": self.fingerprint(simulation_log_path),
+            "names": names,
+        }
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+        sidecar_path = self.sidecar_path(simulation_log_path, latency_backend, variant)
+        with atomic_write(sidecar_path, "wb") as f:
+            np.savez_compressed(f, **arrays)  # type: ignore[arg-type]
+        self.written += os.path.getsize(sidecar_path)
+        if (
+            self.max_bytes is not None
+            and self.written >= self.max_bytes * self.EVICT_INTERVAL
+        ):
+            self.evict()
+
+    def scan(self) -> List[Tuple[int, int, str]]:
+        """Modification time, size and path of the sidecars in root and the
+        directories directly under it. Gatling report directories hold many
+        files in subdirectories, so those are not walked."""
+        with os.scandir(self.root) as entries:
+            directories = [self.root]
+            directories.extend(entry.path for entry in entries if entry.is_dir())
+        sidecars = []
+        for directory in directories:
+            try:
+                with os.scandir(directory) as entries:
+                    paths = [e.path for e in entries if e.name.endswith(self.SUFFIX)]
+            except FileNotFoundError:
+                continue
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                sidecars.append((stat.st_mtime_ns, stat.st_size, path))
+        return sidecars
+
+    def evict(self) -> None:
+        if self.max_bytes is None:
+            return
+        self.written = 0
+        sidecars = self.scan()
+        total = sum(size for _, size, _ in sidecars)
+        for _, size, path in sorted(sidecars):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class RunDirectoryIndex:
+    """Sorted names of the directories directly under results_path, so run
+    directories can be found by run tag prefix with a binary search.
+
+    The directory is scanned again only when its mtime changed, or when a
+    lookup finds nothing, and only the names added or removed since are
+    applied. mtime resolution can be coarse on network file systems, so an
+    mtime within `RACY_SECONDS` of the last scan is not trusted: a directory
+    created in the same tick as the scan would not change it.
+    """
+
+    RACY_SECONDS = 2
+
+    def __init__(self, results_path: str):
+        self.results_path = results_path
+        self.names: List[str] = []
+        self.mtime_ns: Optional[int] = None
+
+    def refresh(self, force: bool = False) -> None:
+        mtime_ns = os.stat(self.results_path).st_mtime_ns
+        if mtime_ns == self.mtime_ns and not force:
+            return
+        scanned_ns = time.time_ns()
+        with os.scandir(self.results_path) as entries:
+            current = {entry.name for entry in entries if entry.is_dir()}
+        known = set(self.names)
+        if known - current:
+            self.names = [name for name in self.names if name in current]
+        added = current - known
+        if len(added) > len(self.names):
+            self.names = sorted(self.names + list(added))
+        else:
+            for name in added:
+                insort(self.names, name)
+        racy = mtime_ns >= scanned_ns - self.RACY_SECONDS * 10**9
+        self.mtime_ns = None if racy else mtime_ns
+
+    def find(self, prefix: str) -> List[str]:
+        self.refresh()
+        matches = self._find(prefix)
+        if not matches:
+            self.refresh(force=True)
+            matches = self._find(prefix)
+        return matches
+
+    def _find(self, prefix: str) -> List[str]:
+        matches = []
+        index = bisect_left(self.names, prefix)
+        while index < len(self.names) and self.names[index].startswith(prefix):
+            matches.append(self.names[index])
+            index += 1
+        return matches
+
+
+class GatlingResultManager(ResultManager):
+    """Parse Gatling simulation.log files into `Result` items.
+
+    `engine` selects how simulation.log is read:
+    - "pandas": load every request into a DataFrame (default).
+    - "stream": read line by line into running aggregates per request name,
+      so memory does not grow with the number of requests.
+    - "numpy": memory map the file and tokenize blocks of `chunk_size` bytes
+      with NumPy, feeding the same running aggregates as "stream".
 
+    `latency_backend` selects how successful latencies are summarized:
+    - "exact": keep a count per distinct latency, percentiles match numpy.
+    - "histogram": LatencyHistogram, fixed memory per request name and a
+      bounded relative error, for very long runs.
+
+    `by_request_name` also adds results per request name to each Run, named by
+    `request_metric`, so requirements can target a single endpoint.
+
+    `multi_node` queries every directory matching the run tag, one per load
+    generator, parsing them in up to `max_workers` processes and merging the
+    results as if they were one log.
+
+    `cache` is an optional ParseCache to reuse aggregates from earlier parses.
+
+    `warmup` and `cooldown` drop requests that start within that long after
+    the simulation start, or before the end of the last request, so warm-up
+    effects like JIT compilation and cold caches do not skew the results.
+    `windows` gives the same metrics per time window for a closer look, and
+    `follow` gives live stats of a log that is still being written.
+
+    `validate_time_range` checks that all requests fall within the start and
+    end of the Run being queried, to catch results from an unrelated run.
+
+    `interim` follows run directories created while a step's load is being
+    sent, for early abort by Workflow once `interim_min_requests` are in.
+    Percentiles and failure rates can still recover, for example once
+    warm-up effects pass, so only bounds the rest of the load cannot undo are
+    checked: upper bounds on INCREASING_METRICS, such as the maximum latency,
+    and lower bounds on DECREASING_METRICS. With `planned_requests`, a
+    function giving the number of requests the load of a config sends, such
+    as the module level planned_requests, failures so far over that total
+    also bound the final failure rate, so an upper bound on percent_fail or a
+    lower bound on percent_success is checked against that.
+    """
+
+    ENGINES = ("pandas", "stream", "numpy")
+    LATENCY_BACKENDS = ("exact", "histogram")
+    # Metrics that only move one way as more requests come in.
+    INCREASING_METRICS = (
+        Metric.count_success,
+        Metric.count_fail,
+        Metric.count_total,
+        Metric.latency_success_max,
+    )
+    DECREASING_METRICS = (Metric.latency_success_min,)
+
+    def __init__(
+        self,
+        results_path: str,
+        engine: str = "pandas",
+        chunk_size: int = 16 * 1024 * 1024,
+        by_request_name: bool = True,
+        latency_backend: str = "exact",
+        multi_node: bool = False,
+        max_workers: Optional[int] = None,
+        cache: Optional[ParseCache] = None,
+        warmup: Optional[timedelta] = None,
+        cooldown: Optional[timedelta] = None,
+        validate_time_range: bool = False,
+        interim_min_requests: int = 100,
+        planned_requests: Optional[Callable[[Config], int]] = None,
+    ):
+        if engine not in self.ENGINES:
+            raise ValueError(
+                f"Unsupported engine {engine}, expected one of {self.ENGINES}"
+            )
+        self.results_path = results_path
+        self.run_index = RunDirectoryIndex(results_path)
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.by_request_name = by_request_name
+        if latency_backend not in self.LATENCY_BACKENDS:
+            raise ValueError(
+                f"Unsupported latency backend {latency_backend}, expected one of {self.LATENCY_BACKENDS}"
+            )
+        self.latency_backend = latency_backend
+        self.multi_node = multi_node
+        self.max_workers = max_workers
+        self.cache = cache
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.validate_time_range = validate_time_range
+        self.interim_min_requests = interim_min_requests
+        self.planned_requests = planned_requests
+        self.interim_known: Set[str] = set()
+        self.followers: Dict[str, SimulationLogFollower] = {}
+
+    def get_stats(self, df: pd.DataFrame) -> Dict[str, Decimal]:
+        request_stats = RequestStats(self.latency_backend)
+        request_stats.extend(
+            df["start"].to_numpy(), df["end"].to_numpy(), status_codes(df["status"])
+        )
+        return request_stats.get_stats()
+
+    def check_header(self, line: str) -> None:
         # Check Gatling version is supported. First line expected to have:
         # RUN	GenericSageMakerScenario	test_run_tag	1620982654518	 	3.2.0
-        line = lines[0]
         if not line.startswith("RUN"):
             raise ValueError(f"Unexpected first line: {line}")
         tokens = line.split("\t")
@@ -107,6 +728,98 @@ class GatlingResultManager(ResultManager):
                 f"Unrecognized Gatling version may not be supported: {gatling_version}"
             )
 
+    def parse(self, simulation_log_path: str) -> Dict[str, Dict[str, Decimal]]:
+        return self.combine(self.aggregate(simulation_log_path))
+
+    def parse_many(
+        self, simulation_log_paths: List[str]
+    ) -> Dict[str, Dict[str, Decimal]]:
+        """Parse several simulation.log files, like those from multiple load
+        generators in one run, in parallel processes. Results are the same as
+        parsing the logs concatenated in the given order."""
+        if len(simulation_log_paths) == 1 or self.max_workers == 1:
+            partials = [self.aggregate(path) for path in simulation_log_paths]
+        else:
+            # The cache is used here rather than in the workers, which get a
+            # copy of it, so its count of bytes written between evictions
+            # stays in this process.
+            cached = [self.load_cached(path) for path in simulation_log_paths]
+            missing = [
+                path
+                for path, partial in zip(simulation_log_paths, cached)
+                if partial is None
+            ]
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                parsed = dict(zip(missing, executor.map(self.parse_log, missing)))
+            partials = []
+            for path, partial in zip(simulation_log_paths, cached):
+                if partial is None:
+                    partial = parsed[path]
+                    self.save_cached(path, partial)
+                partials.append(partial)
+        by_name: Dict[str, RequestStats] = {}
+        for partial in partials:
+            for name, request_stats in partial.items():
+                if name in by_name:
+                    by_name[name].merge(request_stats)
+                else:
+                    by_name[name] = request_stats
+        return self.combine(by_name)
+
+    def aggregate(self, simulation_log_path: str) -> Dict[str, RequestStats]:
+        cached = self.load_cached(simulation_log_path)
+        if cached is not None:
+            return cached
+        by_name = self.parse_log(simulation_log_path)
+        self.save_cached(simulation_log_path, by_name)
+        return by_name
+
+    @property
+    def cache_variant(self) -> str:
+        # Trimmed aggregates are cached separately from untrimmed ones.
+        if self.warmup or self.cooldown:
+            return f"warmup{millis(self.warmup)}-cooldown{millis(self.cooldown)}"
+        return ""
+
+    def load_cached(
+        self, simulation_log_path: str
+    ) -> Optional[Dict[str, RequestStats]]:
+        if not self.cache:
+            return None
+        return self.cache.load(
+            simulation_log_path, self.latency_backend, self.cache_variant
+        )
+
+    def save_cached(
+        self, simulation_log_path: str, by_name: Dict[str, RequestStats]
+    ) -> None:
+        if self.cache:
+            self.cache.save(
+                simulation_log_path, self.latency_backend, by_name, self.cache_variant
+            )
+
+    def parse_log(self, simulation_log_path: str) -> Dict[str, RequestStats]:
+        if self.engine == "stream":
+            by_name = self.aggregate_stream(simulation_log_path)
+        elif self.engine == "numpy":
+            by_name = self.aggregate_numpy(simulation_log_path)
+        else:
+            by_name = self.aggregate_dataframe(simulation_log_path)
+        if not by_name:
+            raise RuntimeError(
+                f"ERROR: Simulation log has no requests after trimming warmup {self.warmup} and cooldown {self.cooldown}: {simulation_log_path}"
+            )
+        return by_name
+
+    def aggregate_dataframe(self, simulation_log_path: str) -> Dict[str, RequestStats]:
+        requests: List[Dict[str, Union[str, int]]] = []
+
+        with open(simulation_log_path) as f:
+            lines = f.readlines()
+        if not lines:
+            raise RuntimeError(f"ERROR: Simulation log is empty: {simulation_log_path}")
+        self.check_header(lines[0])
+
         # Sample lines from simulation.log (there are other line formats too):
         # REQUEST	1		Predict-intelligent-case-routing-1-happy_path	1573776120651	1573776125919	KO	status.find.is(200), but actually found 503
         # REQUEST	6		Predict-intelligent-case-routing-1-happy_path	1573776125622	1573776129161	OK	 .
@@ -124,72 +837,453 @@ class GatlingResultManager(ResultManager):
                 start = int(tokens[4])  # 1573776120651
                 end = int(tokens[5])  # 1573776125919
                 status = tokens[6]  # KO or OK
-                request: Dict[str, Union[datetime, str, int]] = {}
+                request: Dict[str, Union[str, int]] = {}
                 request["name"] = name
                 if name == ALL_REQUESTS:
                     raise RuntimeError(
                         f"ERROR: Request name cannot be reserved word '{ALL_REQUESTS}'."
                     )
-                if name not in request_names:
-                    request_names.append(name)
                 request["start"] = start
                 request["end"] = end
                 request["latency"] = end - start
                 request["status"] = status
-                request["time"] = datetime.fromtimestamp(int(start / 1000))
                 requests.append(request)
         if not requests:
             raise RuntimeError(
                 f"ERROR: Simulation log has no requests: {simulation_log_path}"
             )
 
-        df = DataFrame(requests)
-        df.set_index("time", inplace=True)
+        df = pd.DataFrame(requests)
+        lower, upper = self.trim_bounds(simulation_log_path)
+        if lower is not None or upper is not None:
+            df = df[self.within(df["start"].to_numpy(), lower, upper)]
+        # One grouping pass over all rows, instead of a mask per request name.
+        start = df["start"].to_numpy()
+        end = df["end"].to_numpy()
+        statuses = status_codes(df["status"])
+        by_name: Dict[str, RequestStats] = {}
+        for name, rows in df.groupby("name", sort=False).indices.items():
+            request_stats = by_name[name] = RequestStats(self.latency_backend)
+            request_stats.extend(start[rows], end[rows], statuses[rows])
+        return by_name
+
+    def aggregate_stream(self, simulation_log_path: str) -> Dict[str, RequestStats]:
+        lower, upper = self.trim_bounds(simulation_log_path)
+        found = False
+        by_name: Dict[str, RequestStats] = {}
+        with open(simulation_log_path) as f:
+            line = f.readline()
+            if not line:
+                raise RuntimeError(
+                    f"ERROR: Simulation log is empty: {simulation_log_path}"
+                )
+            self.check_header(line)
+            # Iterating the file reads it in buffered chunks, one line at a time.
+            for line in f:
+                if line.startswith("REQUEST"):
+                    tokens = line.split("\t")
+                    if len(tokens) != 8:
+                        raise ValueError(f"Unexpected request format: {line}")
+                    name = tokens[3]
+                    if name == ALL_REQUESTS:
+                        raise RuntimeError(
+                            f"ERROR: Request name cannot be reserved word '{ALL_REQUESTS}'."
+                        )
+                    found = True
+                    start = int(tokens[4])
+                    if (lower is not None and start < lower) or (
+                        upper is not None and start >= upper
+                    ):
+                        continue
+                    request_stats = by_name.get(name)
+                    if request_stats is None:
+                        request_stats = by_name[name] = RequestStats(
+                            self.latency_backend
+                        )
+                    request_stats.add(start, int(tokens[5]), tokens[6])
+        if not found:
+            raise RuntimeError(
+                f"ERROR: Simulation log has no requests: {simulation_log_path}"
+            )
+        return by_name
+
+    def aggregate_numpy(self, simulation_log_path: str) -> Dict[str, RequestStats]:
+        lower, upper = self.trim_bounds(simulation_log_path)
+        by_name: Dict[str, RequestStats] = {}
+        for chunk in self.iter_chunks(simulation_log_path):
+            if lower is not None or upper is not None:
+                chunk = chunk.select(self.within(chunk.start, lower, upper))
+            self.accumulate(by_name, chunk)
+        return by_name
+
+    def iter_chunks(self, simulation_log_path: str) -> Iterator[RequestChunk]:
+        """Tokenize simulation.log in blocks of whole lines with NumPy."""
+        size = os.path.getsize(simulation_log_path)
+        if size == 0:
+            raise RuntimeError(f"ERROR: Simulation log is empty: {simulation_log_path}")
+        with open(simulation_log_path, "rb") as f:
+            # Left for garbage collection to unmap rather than closed here, since
+            # an exception traceback may still reference views into the buffer.
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = buffer.find(b"\n") + 1 or size
+        self.check_header(buffer[:header_end].decode())
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        found = False
+        begin = header_end
+        while begin < size:
+            # Split into blocks of whole lines, each at most chunk_size bytes
+            # unless a single line is longer than that.
+            stop = begin + self.chunk_size
+            if stop >= size:
+                stop = size
+            else:
+                newline = buffer.rfind(b"\n", begin, stop)
+                if newline < 0:
+                    newline = buffer.find(b"\n", stop)
+                stop = size if newline < 0 else newline + 1
+            chunk = tokenize_requests(data[begin:stop])
+            found = found or len(chunk) > 0
+            yield chunk
+            begin = stop
+        if not found:
+            raise RuntimeError(
+                f"ERROR: Simulation log has no requests: {simulation_log_path}"
+            )
+
+    def trim_bounds(
+        self, simulation_log_path: str
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Range of request start times in epoch millis to keep, after dropping
+        `warmup` from the start of the simulation (time in the RUN line) and
+        `cooldown` before the end of the last request in the log."""
+        lower: Optional[int] = None
+        upper: Optional[int] = None
+        if self.warmup:
+            with open(simulation_log_path) as f:
+                tokens = f.readline().split("\t")
+            if len(tokens) != 6:
+                raise ValueError(f"Unexpected run format: {tokens}")
+            lower = int(tokens[3]) + millis(self.warmup)
+        if self.cooldown:
+            upper = last_request_end(simulation_log_path) - millis(self.cooldown)
+        return lower, upper
+
+    @staticmethod
+    def within(
+        start: np.ndarray, lower: Optional[int], upper: Optional[int]
+    ) -> np.ndarray:
+        keep = np.ones(len(start), dtype=bool)
+        if lower is not None:
+            keep &= start >= lower
+        if upper is not None:
+            keep &= start < upper
+        return keep
+
+    def accumulate(self, by_name: Dict[str, RequestStats], chunk: RequestChunk) -> None:
+        # Group rows by request name with one sort instead of a mask per name.
+        # Stable sorts of 16 bit integers are radix sorts, linear in the rows.
+        codes = chunk.codes
+        if len(chunk.names) <= np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(chunk.names) + 1))
+        for code, name in enumerate(chunk.names):
+            if name == ALL_REQUESTS:
+                raise RuntimeError(
+                    f"ERROR: Request name cannot be reserved word '{ALL_REQUESTS}'."
+                )
+            rows = order[bounds[code] : bounds[code + 1]]
+            if not rows.size:
+                continue
+            request_stats = by_name.get(name)
+            if request_stats is None:
+                request_stats = by_name[name] = RequestStats(self.latency_backend)
+            request_stats.extend(chunk.start[rows], chunk.end[rows], chunk.status[rows])
+
+    def windows(
+        self, simulation_log_path: str, window: Union[str, timedelta] = "10s"
+    ) -> pd.DataFrame:
+        """Metrics across all requests per time window, like "1s", "10s" or
+        "1min", indexed by window start. Requests are assigned to windows by
+        start time, windows are aligned to multiples of the window length
+        since the epoch and given in UTC, and warmup and cooldown are trimmed
+        as for `parse`. Adds `throughput` in requests per second. Windows
+        without requests are left out."""
+        length = millis(pd.Timedelta(window).to_pytimedelta())
+        if length <= 0:
+            raise ValueError(f"Window must be positive: {window}")
+        lower, upper = self.trim_bounds(simulation_log_path)
+        by_window: Dict[int, RequestStats] = {}
+        for chunk in self.iter_chunks(simulation_log_path):
+            if lower is not None or upper is not None:
+                chunk = chunk.select(self.within(chunk.start, lower, upper))
+            slots = chunk.start // length
+            order = np.argsort(slots, kind="stable")
+            sorted_slots = slots[order]
+            distinct, bounds = np.unique(sorted_slots, return_index=True)
+            bounds = np.append(bounds, len(sorted_slots))
+            for i, slot in enumerate(distinct.tolist()):
+                rows = order[bounds[i] : bounds[i + 1]]
+                request_stats = by_window.get(slot)
+                if request_stats is None:
+                    request_stats = by_window[slot] = RequestStats(self.latency_backend)
+                request_stats.extend(
+                    chunk.start[rows], chunk.end[rows], chunk.status[rows]
+                )
+        records: List[Dict[str, Union[datetime, Decimal]]] = []
+        for slot in sorted(by_window):
+            stats = by_window[slot].get_stats()
+            record: Dict[str, Union[datetime, Decimal]] = {
+                "time": datetime.fromtimestamp(slot * length / 1000, timezone.utc)
+            }
+            record.update(stats)
+            record["throughput"] = stats[Metric.count_total] * 1000 / length
+            records.append(record)
+        df = pd.DataFrame(records)
+        if not df.empty:
+            df.set_index("time", inplace=True)
+        return df
+
+    def follow(self, simulation_log_path: str) -> "SimulationLogFollower":
+        """Follow simulation.log while Gatling is still writing it."""
+        return SimulationLogFollower(self, simulation_log_path)
+
+    def check_time_range(
+        self, stats: Dict[str, Decimal], run: Run, simulation_log_path: str
+    ) -> None:
+        # Gatling times are epoch millis. Naive Run times are taken as UTC, like
+        # the datetime.utcnow() used by load managers.
+        first = datetime.fromtimestamp(
+            float(stats[Metric.simulation_start]) / 1000, timezone.utc
+        )
+        last = datetime.fromtimestamp(
+            float(stats[Metric.simulation_end]) / 1000, timezone.utc
+        )
+        start, end = [
+            time if time.tzinfo else time.replace(tzinfo=timezone.utc)
+            for time in (run.start, run.end)
+        ]
+        if first < start or last > end:
+            raise RuntimeError(
+                f"ERROR: Requests from {first} to {last} in {simulation_log_path} are outside of run {run.id} from {run.start} to {run.end}"
+            )
+
+    def combine(
+        self, by_name: Dict[str, RequestStats]
+    ) -> Dict[str, Dict[str, Decimal]]:
+        all_requests = RequestStats(self.latency_backend)
+        for request_stats in by_name.values():
+            all_requests.merge(request_stats)
         combined_stats: Dict[str, Dict[str, Decimal]] = {}
-        combined_stats[ALL_REQUESTS] = self.get_stats(df)
-        for name in request_names:
-            df_subset = df[(df["name"] == name)]
-            combined_stats[name] = self.get_stats(df_subset)
+        combined_stats[ALL_REQUESTS] = all_requests.get_stats()
+        for name, request_stats in by_name.items():
+            combined_stats[name] = request_stats.get_stats()
         return combined_stats
 
     # Gatling saves results in folders named with given run_tag appended by timestamp.
     # Search results_path for this run_tag, which must be unique, and return
     # directory name.
     def find_run_dir(self, run_tag: str) -> str:
-        run_dir: Optional[str] = None
-        for dirpath, dirnames, filenames in os.walk(self.results_path):
-            for dir in dirnames:
-                if dir.startswith(run_tag):
-                    if not run_dir:
-                        run_dir = dir
-                    else:
-                        raise RuntimeError(
-                            f"ERROR: Found multiple matches with run_tag {run_tag}: {run_dir} and {dir}"
-                        )
-        if not run_dir:
+        run_dirs = self.find_run_dirs(run_tag)
+        if len(run_dirs) > 1:
+            raise RuntimeError(
+                f"ERROR: Found multiple matches with run_tag {run_tag}: {run_dirs[0]} and {run_dirs[1]}"
+            )
+        return run_dirs[0]
+
+    # With multiple load generators, each one saves its own folder starting with
+    # the same run_tag. Return all of them, sorted by name. Only directories
+    # directly under results_path are considered, see RunDirectoryIndex.
+    def find_run_dirs(self, run_tag: str) -> List[str]:
+        run_dirs = self.run_index.find(run_tag)
+        if not run_dirs:
             raise RuntimeError(
                 f"ERROR: Unable to find directory starting with run_tag {run_tag}"
             )
-        return run_dir
+        return run_dirs
 
     def query(self, config: Config, run: Run) -> None:
         log.debug(f"About to process {self.results_path}/{run.id}*/simulation.log")
-        run_dir = self.find_run_dir(run.id)
-        simulation_log_path = (
+        if self.multi_node:
+            run_dirs = self.find_run_dirs(run.id)
+        else:
+            run_dirs = [self.find_run_dir(run.id)]
+        simulation_log_paths = [
             self.results_path + os.sep + run_dir + os.sep + "simulation.log"
-        )
-        combined_stats = self.parse(simulation_log_path)
+            for run_dir in run_dirs
+        ]
+        combined_stats = self.parse_many(simulation_log_paths)
         # pprint(combined_stats)
-
-        # Add stat results to run. Include any matching requirement conditions.
-        stats = combined_stats[ALL_REQUESTS]
-        for metric in stats:
-            conditions = []
-            if metric in config.requirements:
-                conditions = config.requirements[metric]
-            run.results.append(
-                Result(metric=metric, value=stats[metric], conditions=conditions)
+        if self.validate_time_range:
+            self.check_time_range(
+                combined_stats[ALL_REQUESTS], run, ", ".join(simulation_log_paths)
             )
 
-        # TODO: Add results by request name split as well. Maybe use naming convention f"{request_name}_{metric}")
-        # TODO: Assert that time range is valid within run definition.
+        run.results.extend(self.results(config, combined_stats))
+
+    def results(
+        self, config: Config, combined_stats: Dict[str, Dict[str, Decimal]]
+    ) -> List[Result]:
+        # Stat results with any matching requirement conditions. Stats across
+        # all requests use the plain metric name, stats for each request name
+        # use request_metric(name, metric).
+        results = []
+        for name, stats in combined_stats.items():
+            if name != ALL_REQUESTS and not self.by_request_name:
+                continue
+            for metric in stats:
+                key = metric if name == ALL_REQUESTS else request_metric(name, metric)
+                conditions = []
+                if key in config.requirements:
+                    conditions = config.requirements[key]
+                results.append(
+                    Result(metric=key, value=stats[metric], conditions=conditions)
+                )
+        return results
+
+    def interim_start(self, config: Config) -> None:
+        # Note existing run directories before the load starts, so only those
+        # Gatling creates for this load are followed.
+        self.run_index.refresh(force=True)
+        self.interim_known = set(self.run_index.names)
+        self.followers = {}
+
+    def interim(self, config: Config) -> List[Result]:
+        # Live stats of the run directories created since interim_start, once
+        # there are at least interim_min_requests.
+        self.run_index.refresh()
+        for run_dir in self.run_index.names:
+            if run_dir not in self.interim_known and run_dir not in self.followers:
+                self.followers[run_dir] = self.follow(
+                    self.results_path + os.sep + run_dir + os.sep + "simulation.log"
+                )
+        by_name: Dict[str, RequestStats] = {}
+        for follower in self.followers.values():
+            follower.poll()
+            for name, request_stats in follower.by_name.items():
+                if name not in by_name:
+                    by_name[name] = RequestStats(self.latency_backend)
+                by_name[name].merge(request_stats)
+        count = sum(len(follower) for follower in self.followers.values())
+        if not by_name or count < self.interim_min_requests:
+            return []
+        stats = self.combine(by_name)
+        bounds = self.planned_bounds(config, stats[ALL_REQUESTS])
+        results = []
+        for result in self.results(config, stats):
+            value = result.value
+            operators = self.final_operators(result.metric)
+            if result.metric in bounds:
+                value, operators = bounds[result.metric]
+            conditions = [
+                condition
+                for condition in result.conditions
+                if isinstance(condition.function, Comparison)
+                and condition.function.operator in operators
+            ]
+            if conditions:
+                results.append(Result(result.metric, value, conditions))
+        return results
+
+    def planned_bounds(
+        self, config: Config, stats: Dict[str, Decimal]
+    ) -> Dict[str, Tuple[Decimal, Tuple[str, ...]]]:
+        """Failure and success rates across all requests the load can still
+        end with, and the operators of conditions that fail for good against
+        them: the failures so far stay failures whatever the rest does."""
+        if self.planned_requests is None:
+            return {}
+        planned = max(Decimal(self.planned_requests(config)), stats[Metric.count_total])
+        least_fail = stats[Metric.count_fail] / planned * 100
+        return {
+            Metric.percent_fail: (least_fail, ("<", "<=")),
+            Metric.percent_success: (100 - least_fail, (">", ">=")),
+        }
+
+    @classmethod
+    def final_operators(cls, metric: str) -> Tuple[str, ...]:
+        """Operators of conditions on metric that stay failed once they fail,
+        for metrics across all requests or per request name."""
+        if metric.endswith(cls.INCREASING_METRICS):
+            return ("<", "<=")
+        if metric.endswith(cls.DECREASING_METRICS):
+            return (">", ">=")
+        return ()
+
+
+class SimulationLogFollower:
+    """Running aggregates of a simulation.log that is still being written.
+
+    Each `poll` reads only the bytes appended since the previous one, and
+    feeds complete REQUEST lines through the NumPy tokenizer into the same
+    aggregates as a full parse. A partial last line is kept until the rest of
+    it is written. The log does not have to exist yet, and is read again from
+    the start if it was replaced by a shorter one. `snapshot` gives the stats
+    so far, in the same format as `GatlingResultManager.parse`.
+
+    Requests within `warmup` of the simulation start are dropped as in a full
+    parse, `cooldown` is not applied since the end is not known yet.
+    """
+
+    def __init__(self, result_manager: GatlingResultManager, simulation_log_path: str):
+        self.result_manager = result_manager
+        self.simulation_log_path = simulation_log_path
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.remainder = b""
+        self.lower: Optional[int] = None
+        self.header_checked = False
+        self.count = 0
+        self.by_name: Dict[str, RequestStats] = {}
+
+    def poll(self) -> int:
+        """Read newly written lines, returning how many requests were added."""
+        try:
+            size = os.path.getsize(self.simulation_log_path)
+        except FileNotFoundError:
+            return 0
+        if size < self.offset:
+            log.warning(f"Simulation log was truncated: {self.simulation_log_path}")
+            self.reset()
+        if size == self.offset:
+            return 0
+        with open(self.simulation_log_path, "rb") as f:
+            f.seek(self.offset)
+            block = f.read(size - self.offset)
+        self.offset += len(block)
+        data = self.remainder + block
+        complete = data.rfind(b"\n") + 1
+        self.remainder = data[complete:]
+        data = data[:complete]
+        if not self.header_checked:
+            if not data:
+                return 0
+            header_end = data.find(b"\n") + 1
+            header = data[:header_end].decode()
+            self.result_manager.check_header(header)
+            if self.result_manager.warmup:
+                self.lower = int(header.split("\t")[3]) + millis(
+                    self.result_manager.warmup
+                )
+            self.header_checked = True
+            data = data[header_end:]
+        if not data:
+            # Only the header, or part of a line, was written since last time.
+            return 0
+        chunk = tokenize_requests(np.frombuffer(data, dtype=np.uint8))
+        if self.lower is not None:
+            chunk = chunk.select(chunk.start >= self.lower)
+        self.result_manager.accumulate(self.by_name, chunk)
+        self.count += len(chunk)
+        return len(chunk)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def snapshot(self) -> Dict[str, Dict[str, Decimal]]:
+        """Stats of the requests read so far, empty if there are none yet."""
+        if not self.by_name:
+            return {}
+        return self.result_manager.combine(self.by_name)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from math import floor
+from perfsize.lazy import LazyModule
+from typing import Dict, List, Optional, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+
+def percentiles_from_counts(
+    values: Sequence[int], counts: Sequence[int], qs: Sequence[float]
+) -> List[float]:
+    """Same results as `numpy.percentile` with linear interpolation, computed
+    from sorted distinct values and how often each one occurs."""
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1])
+    results: List[float] = []
+    for q in qs:
+        virtual = (total - 1) * (q / 100)
+        previous = int(floor(virtual))
+        following = previous + 1 if previous + 1 < total else previous
+        below = int(values[int(np.searchsorted(cumulative, previous, side="right"))])
+        above = int(values[int(np.searchsorted(cumulative, following, side="right"))])
+        gamma = virtual - previous
+        # Same interpolation order as numpy, so truncation to int matches exactly.
+        diff = above - below
+        if gamma >= 0.5:
+            results.append(above - diff * (1 - gamma))
+        else:
+            results.append(below + diff * gamma)
+    return results
+
+
+class LatencyDistribution:
+    """Latencies in millis that can be recorded incrementally and merged."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def add(self, latency: int) -> None:
+        raise NotImplementedError
+
+    def record(self, latencies: np.ndarray) -> None:
+        if latencies.size:
+            self.count += int(latencies.size)
+            self._update_range(int(latencies.min()), int(latencies.max()))
+
+    def merge(self, other: "LatencyDistribution") -> None:
+        if other.count:
+            assert other.min is not None and other.max is not None
+            self.count += other.count
+            self._update_range(other.min, other.max)
+
+    def percentiles(self, qs: Sequence[float]) -> List[float]:
+        raise NotImplementedError
+
+    def _update_range(self, low: int, high: int) -> None:
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+
+class LatencyCounts(LatencyDistribution):
+    """Exact latencies, kept as a count per distinct value. Memory depends on
+    the spread of latencies rather than on the number of requests."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.counts: Dict[int, int] = {}
+
+    def add(self, latency: int) -> None:
+        self.count += 1
+        self._update_range(latency, latency)
+        self.counts[latency] = self.counts.get(latency, 0) + 1
+
+    def record(self, latencies: np.ndarray) -> None:
+        super().record(latencies)
+        if not latencies.size:
+            return
+        low = int(latencies.min())
+        if int(latencies.max()) - low <= latencies.size:
+            # Latencies usually span a narrow range, count them without sorting.
+            counts = np.bincount(latencies - low)
+            values = np.flatnonzero(counts)
+            counts = counts[values]
+            values = values + low
+        else:
+            values, counts = np.unique(latencies, return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def merge(self, other: LatencyDistribution) -> None:
+        if not isinstance(other, LatencyCounts):
+            raise TypeError(f"Cannot merge {type(other).__name__} into LatencyCounts")
+        super().merge(other)
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def percentiles(self, qs: Sequence[float]) -> List[float]:
+        values = sorted(self.counts)
+        return percentiles_from_counts(values, [self.counts[v] for v in values], qs)
+
+
+class LatencyHistogram(LatencyDistribution):
+    """Log-linear bucketed histogram, in the style of HdrHistogram.
+
+    Values below 2**significant_bits each get their own bucket and are exact.
+    Larger values share buckets whose width is at most 2**-significant_bits of
+    the value on either side of the bucket midpoint, so every percentile is
+    within that relative error. Memory is a fixed array of counts regardless of
+    the number of requests, and two histograms with the same settings merge by
+    adding counts. Values are clamped to [0, 2**max_bits), min and max are
+    tracked exactly.
+    """
+
+    def __init__(self, significant_bits: int = 8, max_bits: int = 40) -> None:
+        if not 1 <= significant_bits < max_bits <= 62:
+            raise ValueError(
+                f"Invalid histogram bits: significant_bits={significant_bits}, max_bits={max_bits}"
+            )
+        super().__init__()
+        self.significant_bits = significant_bits
+        self.max_bits = max_bits
+        self.exact_limit = 1 << significant_bits
+        self.half = self.exact_limit // 2
+        self.counts = np.zeros(
+            self.exact_limit + (max_bits - significant_bits) * self.half,
+            dtype=np.int64,
+        )
+
+    def bucket(self, latencies: np.ndarray) -> np.ndarray:
+        values = np.clip(latencies, 0, (1 << self.max_bits) - 1).astype(np.int64)
+        # Position of the highest set bit, exact for values below 2**53.
+        exponent = np.frexp(values.astype(np.float64))[1].astype(np.int64) - 1
+        shift = np.maximum(exponent - self.significant_bits + 1, 0)
+        large = (
+            self.exact_limit
+            + (exponent - self.significant_bits) * self.half
+            + (values >> shift)
+            - self.half
+        )
+        buckets: np.ndarray = np.where(values < self.exact_limit, values, large)
+        return buckets
+
+    def bucket_range(self, bucket: int) -> range:
+        """Values that fall into the given bucket."""
+        if bucket < self.exact_limit:
+            return range(bucket, bucket + 1)
+        block, offset = divmod(bucket - self.exact_limit, self.half)
+        shift = block + 1
+        low = (self.half + offset) << shift
+        return range(low, low + (1 << shift))
+
+    def add(self, latency: int) -> None:
+        self.count += 1
+        self._update_range(latency, latency)
+        value = min(max(latency, 0), (1 << self.max_bits) - 1)
+        if value < self.exact_limit:
+            self.counts[value] += 1
+        else:
+            shift = value.bit_length() - self.significant_bits
+            self.counts[
+                self.exact_limit
+                + (shift - 1) * self.half
+                + (value >> shift)
+                - self.half
+            ] += 1
+
+    def record(self, latencies: np.ndarray) -> None:
+        super().record(latencies)
+        self.counts += np.bincount(self.bucket(latencies), minlength=len(self.counts))
+
+    def merge(self, other: LatencyDistribution) -> None:
+        if not (
+            isinstance(other, LatencyHistogram)
+            and other.significant_bits == self.significant_bits
+            and other.max_bits == self.max_bits
+        ):
+            raise TypeError("Can only merge histograms with the same bits settings")
+        super().merge(other)
+        self.counts += other.counts
+
+    def percentiles(self, qs: Sequence[float]) -> List[float]:
+        assert self.min is not None and self.max is not None
+        buckets = np.flatnonzero(self.counts)
+        values = []
+        for bucket in buckets.tolist():
+            span = self.bucket_range(bucket)
+            midpoint = span.start + (len(span) - 1) // 2
+            values.append(int(np.clip(midpoint, self.min, self.max)))
+        return percentiles_from_counts(values, self.counts[buckets].tolist(), qs)
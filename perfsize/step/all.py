@@ -1,5 +1,5 @@
 from perfsize.perfsize import Config, Plan, StepManager
-from typing import Optional
+from typing import List, Optional, Sequence
 
 
 class AllStepManager(StepManager):
@@ -14,10 +14,8 @@ class AllStepManager(StepManager):
         if not self.plan.recommendation:
             if self.plan.history:
                 previous_config = self.plan.history[-1]
-                if previous_config.runs:
-                    previous_run = previous_config.runs[-1]
-                    if previous_run.status:
-                        self.plan.recommendation = previous_config.parameters
+                if previous_config.status:
+                    self.plan.recommendation = previous_config.parameters
 
         # Determine next step
         self.stepindex = self.stepindex + 1
@@ -27,3 +25,26 @@ class AllStepManager(StepManager):
         config = self.plan.configs[combination]
         self.plan.history.append(config)
         return config
+
+    def peek(self) -> Optional[Config]:
+        # Steps do not depend on results, so the next one is known.
+        if self.stepindex + 1 >= len(self.plan.combinations):
+            return None
+        return self.plan.configs[self.plan.combinations[self.stepindex + 1]]
+
+    def next_batch(self, count: int, pending: Sequence[Config] = ()) -> List[Config]:
+        # Every config is tested regardless of other results, so hand out as
+        # many as asked. Same recommendation as testing one at a time: the
+        # first config in step order that passed.
+        for config in self.plan.history:
+            if config.status:
+                self.plan.recommendation = config.parameters
+                break
+        stop = min(self.stepindex + 1 + count, len(self.plan.combinations))
+        batch = [
+            self.plan.configs[self.plan.combinations[index]]
+            for index in range(self.stepindex + 1, stop)
+        ]
+        self.stepindex = stop - 1
+        self.plan.history.extend(batch)
+        return batch
@@ -0,0 +1,150 @@
+import itertools
+from perfsize.perfsize import Config, Plan, StepManager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class ShapeSearch:
+    """Binary search state of one shape: the range [low, high] of TPS indexes
+    still to search, and the config being tested at tps_index, if any."""
+
+    def __init__(self, high: int) -> None:
+        self.low = 0
+        self.high = high
+        self.tps_index = -1
+        self.current: Optional[Config] = None
+
+
+class BinarySearchStepManager(StepManager):
+    """Binary search the TPS parameter for each combination of the other
+    parameters, called a shape here, like instance type and count.
+
+    Assumes a shape that fails at some TPS also fails at every higher TPS, so
+    the TPS values in the plan's parameter list must be in ascending order.
+    A step passes if its Config.status is True.
+
+    `max_passing` maps each shape searched so far, as a tuple of its other
+    parameter values in plan order, to its highest passing TPS, or None if no
+    TPS passed. Plan.recommendation is the first shape in plan order with a
+    passing TPS, at its highest passing TPS.
+
+    When several environments are available, next_batch searches up to that
+    many shapes at the same time, one step of each at a time.
+    """
+
+    def __init__(self, plan: Plan, tps_parameter: str = "steady_state_tps") -> None:
+        super().__init__(plan)
+        if tps_parameter not in plan.parameter_lists:
+            raise ValueError(f"Plan has no parameter {tps_parameter}")
+        self.tps_parameter = tps_parameter
+        self.tps_position = list(plan.parameter_lists).index(tps_parameter)
+        self.tps_values = plan.parameter_lists[tps_parameter]
+        self.shapes: List[Tuple[str, ...]] = list(
+            itertools.product(
+                *[
+                    values
+                    for name, values in plan.parameter_lists.items()
+                    if name != tps_parameter
+                ]
+            )
+        )
+        self.max_passing: Dict[Tuple[str, ...], Optional[str]] = {}
+        # Search state of the shapes started and not done yet. A shape is done
+        # once it is in max_passing but not here.
+        self.searches: Dict[Tuple[str, ...], ShapeSearch] = {}
+        # Shapes before this index are all done.
+        self.shape_index = 0
+
+    def combination(self, shape: Tuple[str, ...], tps: str) -> Tuple[str, ...]:
+        return shape[: self.tps_position] + (tps,) + shape[self.tps_position :]
+
+    def state(self, shape: Tuple[str, ...]) -> ShapeSearch:
+        """Search state of a shape not done yet, started on first use."""
+        if shape not in self.searches:
+            self.searches[shape] = ShapeSearch(len(self.tps_values) - 1)
+        return self.searches[shape]
+
+    def next(self) -> Optional[Config]:
+        batch = self.next_batch(1)
+        return batch[0] if batch else None
+
+    def next_batch(self, count: int, pending: Sequence[Config] = ()) -> List[Config]:
+        # Each shape is searched one step at a time, as each step depends on
+        # the result of the previous one, but up to count shapes at once.
+        testing = {id(config) for config in pending}
+        narrowed = False
+        for shape, search in self.searches.items():
+            if search.current is not None and id(search.current) not in testing:
+                self.narrow(shape, search)
+                narrowed = True
+        if narrowed:
+            self.update_recommendation()
+
+        batch: List[Config] = []
+        for shape in itertools.islice(self.shapes, self.shape_index, None):
+            if len(batch) >= count:
+                break
+            if shape in self.max_passing and shape not in self.searches:
+                continue
+            search = self.state(shape)
+            if search.current is not None:
+                continue
+            if self.searching(shape):
+                search.tps_index = self.choose(shape)
+                tps = self.tps_values[search.tps_index]
+                search.current = self.plan.configs[self.combination(shape, tps)]
+                self.plan.history.append(search.current)
+                batch.append(search.current)
+                continue
+            # Search of this shape is done.
+            self.max_passing.setdefault(shape, None)
+            del self.searches[shape]
+        while self.shape_index < len(self.shapes):
+            shape = self.shapes[self.shape_index]
+            if shape not in self.max_passing or shape in self.searches:
+                break
+            self.shape_index = self.shape_index + 1
+        return batch
+
+    def narrow(self, shape: Tuple[str, ...], search: ShapeSearch) -> None:
+        """Narrow the search range of a shape by the result of its current
+        step, which is done testing."""
+        assert search.current is not None
+        if search.current.status:
+            self.max_passing[shape] = self.tps_values[search.tps_index]
+            search.low = search.tps_index + 1
+        else:
+            search.high = search.tps_index - 1
+        search.current = None
+
+    def peek(self) -> Optional[Config]:
+        # Only known when the search of the current shape ends either way,
+        # then the next step is the midpoint of the next shape.
+        if self.shape_index + 1 >= len(self.shapes):
+            return None
+        search = self.searches.get(self.shapes[self.shape_index])
+        if search is None or search.current is None:
+            return None
+        if not search.low == search.high == search.tps_index:
+            return None
+        shape = self.shapes[self.shape_index + 1]
+        tps = self.tps_values[(len(self.tps_values) - 1) // 2]
+        return self.plan.configs[self.combination(shape, tps)]
+
+    def searching(self, shape: Tuple[str, ...]) -> bool:
+        """Whether the search of the shape should go on."""
+        search = self.state(shape)
+        return search.low <= search.high
+
+    def choose(self, shape: Tuple[str, ...]) -> int:
+        """Index of the TPS value to test next for the shape, within the
+        range [low, high] of its search state."""
+        search = self.state(shape)
+        return (search.low + search.high) // 2
+
+    def update_recommendation(self) -> None:
+        for shape in self.shapes:
+            tps = self.max_passing.get(shape)
+            if tps is not None:
+                combination = self.combination(shape, tps)
+                self.plan.recommendation = self.plan.configs[combination].parameters
+                return
@@ -0,0 +1,120 @@
+from __future__ import annotations
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import Config, Plan, StepManager
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+# Orderings of a parameter's values, in the order of its list in the plan.
+# Later values of a CAPACITY parameter (like instance count) make a config
+# easier to pass, later values of a LOAD parameter (like TPS) make it harder.
+CAPACITY = "capacity"
+LOAD = "load"
+
+UNKNOWN = -1
+FAIL = 0
+PASS = 1
+
+
+class DominanceStepManager(StepManager):
+    """Test configs of a multi-dimensional grid, skipping those whose result
+    is implied by configs tested already.
+
+    `orderings` maps parameter names to CAPACITY or LOAD. A config is at least
+    as easy as another if it is at least as far along every CAPACITY list, no
+    further along any LOAD list, and has the same value for every parameter
+    without an ordering. When a config passes, every config at least as easy
+    passes too. When it fails, every config at least as hard fails too.
+
+    The next config is the untested one whose result decides the most others
+    either way: the one maximizing the smaller of the number of unknown configs
+    it would imply passing and the number it would imply failing. Ties go to
+    the earliest in plan order. Like AllStepManager, Plan.recommendation is the
+    first config in plan order known to pass, tested or implied.
+    """
+
+    def __init__(self, plan: Plan, orderings: Dict[str, str]) -> None:
+        super().__init__(plan)
+        for name, ordering in orderings.items():
+            if name not in plan.parameter_lists:
+                raise ValueError(f"Plan has no parameter {name}")
+            if ordering not in (CAPACITY, LOAD):
+                raise ValueError(
+                    f"Unsupported ordering {ordering} for {name}, expected {CAPACITY} or {LOAD}"
+                )
+        self.orderings = orderings
+        self.combinations: List[Tuple[str, ...]] = list(plan.combinations)
+        self.index = {
+            combination: index for index, combination in enumerate(self.combinations)
+        }
+        ordered = []
+        unordered = []
+        for position, (name, values) in enumerate(plan.parameter_lists.items()):
+            value_index = {value: index for index, value in enumerate(values)}
+            column = [value_index[c[position]] for c in self.combinations]
+            if orderings.get(name) == CAPACITY:
+                ordered.append(column)
+            elif orderings.get(name) == LOAD:
+                ordered.append([-index for index in column])
+            else:
+                unordered.append(column)
+        # Per config, larger values in `ordered` are easier to pass.
+        count = len(self.combinations)
+        self.ordered = np.array(ordered, dtype=np.int64).T.reshape(count, -1)
+        self.unordered = np.array(unordered, dtype=np.int64).T.reshape(count, -1)
+        self.states = np.full(count, UNKNOWN, dtype=np.int8)
+        self.tested: Set[Tuple[str, ...]] = set()
+        self.current: Optional[int] = None
+
+    def easier(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Whether each config in rows is at least as easy as each in columns."""
+        ordered = self.ordered[rows][:, None, :] >= self.ordered[columns][None, :, :]
+        unordered = (
+            self.unordered[rows][:, None, :] == self.unordered[columns][None, :, :]
+        )
+        result: np.ndarray = ordered.all(axis=2) & unordered.all(axis=2)
+        return result
+
+    def passed(self, combination: Tuple[str, ...]) -> Optional[bool]:
+        """Known result of a config, tested or implied, or None if unknown."""
+        state = self.states[self.index[combination]]
+        return None if state == UNKNOWN else bool(state == PASS)
+
+    def next(self) -> Optional[Config]:
+        # Record the latest result, and the results it implies.
+        if self.current is not None:
+            config = self.plan.configs[self.combinations[self.current]]
+            unknown = np.flatnonzero(self.states == UNKNOWN)
+            current = np.array([self.current])
+            if config.status:
+                implied = unknown[self.easier(unknown, current)[:, 0]]
+                self.states[implied] = PASS
+                self.states[self.current] = PASS
+            else:
+                implied = unknown[self.easier(current, unknown)[0]]
+                self.states[implied] = FAIL
+                self.states[self.current] = FAIL
+            self.current = None
+            self.update_recommendation()
+
+        unknown = np.flatnonzero(self.states == UNKNOWN)
+        if not unknown.size:
+            return None
+        easier = self.easier(unknown, unknown)
+        implied_pass = easier.sum(axis=0)
+        implied_fail = easier.sum(axis=1)
+        self.current = int(unknown[np.argmax(np.minimum(implied_pass, implied_fail))])
+        combination = self.combinations[self.current]
+        self.tested.add(combination)
+        config = self.plan.configs[combination]
+        self.plan.history.append(config)
+        return config
+
+    def update_recommendation(self) -> None:
+        passing = np.flatnonzero(self.states == PASS)
+        if passing.size:
+            combination = self.combinations[int(passing[0])]
+            self.plan.recommendation = self.plan.configs[combination].parameters
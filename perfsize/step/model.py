@@ -0,0 +1,127 @@
+from __future__ import annotations
+from decimal import Decimal
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import Config, Plan
+from perfsize.step.binary import BinarySearchStepManager, ShapeSearch
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+
+class LatencyCurve:
+    """Queueing style latency curve, latency = base / (1 - tps / capacity),
+    fitted as 1 / latency = intercept + slope * tps by least squares.
+    The latency grows without bound as tps approaches capacity."""
+
+    def __init__(self, intercept: float, slope: float):
+        self.intercept = intercept
+        self.slope = slope
+
+    @classmethod
+    def fit(cls, points: List[Tuple[float, float]]) -> Optional["LatencyCurve"]:
+        """Curve through (tps, latency) points, or None if there are fewer
+        than two distinct tps values or latency does not grow with tps."""
+        if len({tps for tps, _ in points}) < 2:
+            return None
+        tps = np.array([tps for tps, _ in points])
+        inverse = 1 / np.array([latency for _, latency in points])
+        slope, intercept = np.polyfit(tps, inverse, 1)
+        if slope >= 0 or intercept <= 0:
+            return None
+        return cls(float(intercept), float(slope))
+
+    @property
+    def capacity(self) -> float:
+        return -self.intercept / self.slope
+
+    def latency(self, tps: float) -> float:
+        """Predicted latency at tps, infinite at or above capacity."""
+        inverse = self.intercept + self.slope * tps
+        return 1 / inverse if inverse > 0 else float("inf")
+
+    def tps(self, latency: float) -> float:
+        """TPS at which the predicted latency reaches the given latency."""
+        return (1 / latency - self.intercept) / self.slope
+
+    def __repr__(self) -> str:
+        return f"LatencyCurve(1/latency = {self.intercept:.6g} + {self.slope:.6g} * tps, capacity={self.capacity:.6g})"
+
+
+class ModelStepManager(BinarySearchStepManager):
+    """Search the TPS parameter for each shape like BinarySearchStepManager,
+    but pick the next TPS where a LatencyCurve fitted to the shape's results
+    so far predicts `metric` reaches `threshold`, instead of the midpoint.
+
+    Falls back to the midpoint until the curve can be fitted, and after a
+    curve pick that did not halve the range, as when latency jumps at a
+    cliff the curve cannot predict. Curve picks are kept at least `MARGIN` of
+    the range away from its ends, so each one also shrinks it. The search of a
+    shape ends once the highest passing and lowest failing TPS are within
+    `tolerance` of each other. `curves` has the latest fitted curve of each
+    shape, to report along with `max_passing` and Plan.recommendation.
+    """
+
+    SATURATION = 10
+    MARGIN = 0.2
+
+    def __init__(
+        self,
+        plan: Plan,
+        threshold: Decimal,
+        tolerance: Decimal = Decimal("0"),
+        metric: str = "latency_success_p99",
+        tps_parameter: str = "steady_state_tps",
+    ) -> None:
+        super().__init__(plan, tps_parameter)
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.metric = metric
+        self.points: Dict[Tuple[str, ...], List[Tuple[float, float]]] = {}
+        self.curves: Dict[Tuple[str, ...], Optional[LatencyCurve]] = {}
+        # Width of the range at the last curve pick of each shape.
+        self.widths: Dict[Tuple[str, ...], int] = {}
+
+    def searching(self, shape: Tuple[str, ...]) -> bool:
+        if not super().searching(shape):
+            return False
+        search = self.state(shape)
+        if search.low == 0 or search.high == len(self.tps_values) - 1:
+            return True
+        highest_pass = Decimal(self.tps_values[search.low - 1])
+        lowest_fail = Decimal(self.tps_values[search.high + 1])
+        return lowest_fail - highest_pass > self.tolerance
+
+    def narrow(self, shape: Tuple[str, ...], search: ShapeSearch) -> None:
+        # Refit the curve of the shape with the result of its current step.
+        assert search.current is not None
+        points = self.points.setdefault(shape, [])
+        tps = float(self.tps_values[search.tps_index])
+        for run in search.current.runs:
+            for result in run.results:
+                # Latency far beyond the threshold is past saturation,
+                # where the model no longer applies.
+                if (
+                    result.metric == self.metric
+                    and 0 < result.value <= self.threshold * self.SATURATION
+                ):
+                    points.append((tps, float(result.value)))
+        self.curves[shape] = LatencyCurve.fit(points)
+        super().narrow(shape, search)
+
+    def choose(self, shape: Tuple[str, ...]) -> int:
+        curve = self.curves.get(shape)
+        search = self.state(shape)
+        width = search.high - search.low + 1
+        previous = self.widths.pop(shape, None)
+        if curve is None or (previous is not None and width > previous / 2):
+            return super().choose(shape)
+        self.widths[shape] = width
+        target = curve.tps(float(self.threshold))
+        margin = int((width - 1) * self.MARGIN)
+        return min(
+            range(search.low + margin, search.high - margin + 1),
+            key=lambda index: abs(float(self.tps_values[index]) - target),
+        )
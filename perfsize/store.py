@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+import os
+from perfsize.files import atomic_write
+from perfsize.journal import decode_run, encode_run, parameters_key
+from perfsize.perfsize import Config, LoadManager, Result, ResultManager, Run
+from typing import Any, Dict, List, Optional, Set
+
+log = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """Runs measured by earlier plans, kept in a directory with one JSON file
+    per config, so a plan over the same configs can reuse them rather than
+    sending the load again.
+
+    Entries are keyed by a SHA-256 of the config's parameters, in canonical
+    order, and of `version`, naming the software under test. Each entry keeps
+    every run stored for its config, and `get` serves each of them at most
+    once, so repeated runs of a config are independent samples. Entries of
+    other versions are never returned, and runs stored more than `ttl` ago
+    are treated as missing. `purge` deletes both. Only result values are
+    stored, results read back are checked against the requirements of the
+    new config.
+    """
+
+    VERSION = 2
+    SUFFIX = ".run.json"
+
+    def __init__(self, root: str, version: str, ttl: Optional[timedelta] = None):
+        self.root = root
+        self.version = version
+        self.ttl = ttl
+        # Ids of runs returned by get or stored by put, by entry key, so no
+        # run is used twice for a config and stored runs are told apart
+        # from new runs.
+        self.served: Dict[str, Set[str]] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, parameters: Dict[str, str]) -> str:
+        canonical = json.dumps([self.version, parameters_key(parameters)])
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def path(self, parameters: Dict[str, str]) -> str:
+        return os.path.join(self.root, f"{self.key(parameters)}{self.SUFFIX}")
+
+    def read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError) as e:
+            log.debug(f"Ignoring result store entry {path}: {e}")
+            return None
+        if entry.get("format") != self.VERSION or entry["version"] != self.version:
+            return None
+        return entry
+
+    def write(self, path: str, entry: Dict[str, Any]) -> None:
+        with atomic_write(path) as f:
+            json.dump(entry, f)
+
+    def fresh(self, stored: Dict[str, Any]) -> bool:
+        if self.ttl is None:
+            return True
+        return datetime.utcnow() - datetime.fromisoformat(stored["stored"]) <= self.ttl
+
+    def was_served(self, config: Config, run: Run) -> bool:
+        return run.id in self.served.get(self.key(config.parameters), set())
+
+    def get(self, config: Config) -> Optional[Run]:
+        """A stored run of config not served before, or None if all were
+        served, stale or of another version."""
+        entry = self.read(self.path(config.parameters))
+        if entry is None:
+            return None
+        served = self.served.setdefault(self.key(config.parameters), set())
+        for stored in entry["runs"]:
+            if self.fresh(stored) and stored["run"]["id"] not in served:
+                run = decode_run(stored["run"], config)
+                served.add(run.id)
+                return run
+        return None
+
+    def put(self, config: Config, run: Run) -> None:
+        """Add run to the entry of config, dropping its stale runs."""
+        path = self.path(config.parameters)
+        entry = self.read(path)
+        runs = [] if entry is None else [s for s in entry["runs"] if self.fresh(s)]
+        runs.append(
+            {"stored": datetime.utcnow().isoformat(), "run": encode_run(config, run)}
+        )
+        self.write(
+            path, {"format": self.VERSION, "version": self.version, "runs": runs}
+        )
+        self.served.setdefault(self.key(config.parameters), set()).add(run.id)
+
+    def purge(self) -> int:
+        """Delete stale runs, and entries of other versions or left without
+        runs, returning how many entries were deleted."""
+        deleted = 0
+        for filename in os.listdir(self.root):
+            if not filename.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.root, filename)
+            entry = self.read(path)
+            runs = [] if entry is None else [s for s in entry["runs"] if self.fresh(s)]
+            if not runs:
+                os.remove(path)
+                deleted = deleted + 1
+            elif entry is not None and len(runs) < len(entry["runs"]):
+                self.write(path, {**entry, "runs": runs})
+        return deleted
+
+
+class CachingLoadManager(LoadManager):
+    """Return a stored run of a config not returned before when the store has
+    one, else send the load with the wrapped load manager."""
+
+    def __init__(self, load_manager: LoadManager, store: ResultStore):
+        self.load_manager = load_manager
+        self.store = store
+
+    def send(self, config: Config) -> Run:
+        run = self.store.get(config)
+        if run is not None:
+            print(
+                f"CachingLoadManager is reusing stored run {run.id} for {config.parameters}"
+            )
+            return run
+        return self.load_manager.send(config)
+
+    def abort(self, config: Config) -> None:
+        self.load_manager.abort(config)
+
+
+class CachingResultManager(ResultManager):
+    """Query the wrapped result managers for new runs and store the results.
+    Runs from the store already have their results and are left as they are.
+
+    Aborted runs are not stored, since when to abort depended on the
+    requirements at the time.
+    """
+
+    def __init__(self, result_managers: List[ResultManager], store: ResultStore):
+        self.result_managers = result_managers
+        self.store = store
+
+    def query(self, config: Config, run: Run) -> None:
+        if self.store.was_served(config, run):
+            return
+        for result_manager in self.result_managers:
+            result_manager.query(config, run)
+        if not run.aborted:
+            self.store.put(config, run)
+
+    def interim_start(self, config: Config) -> None:
+        for result_manager in self.result_managers:
+            result_manager.interim_start(config)
+
+    def interim(self, config: Config) -> List[Result]:
+        results: List[Result] = []
+        for result_manager in self.result_managers:
+            results.extend(result_manager.interim(config))
+        return results
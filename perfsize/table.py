@@ -0,0 +1,138 @@
+from __future__ import annotations
+from perfsize.lazy import LazyModule
+from perfsize.perfsize import Config, Run
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = LazyModule("numpy")
+    pd = LazyModule("pandas")
+
+# Codes in the passed column.
+UNKNOWN = -1
+FAIL = 0
+PASS = 1
+
+
+class ResultsTable:
+    """Results of all runs of a plan as columns, with one row per result.
+
+    Parameter columns hold the index of each value in its list in the plan,
+    so rows can be selected by parameter values with integer comparisons, and
+    converted back in plan order. Metric names are coded the same way, in
+    order of first appearance. Values are float64, for queries and plots,
+    while the Results keep the exact Decimals. Columns grow by doubling, so
+    appending a run costs the same however many rows there are.
+    """
+
+    def __init__(self, parameter_lists: Dict[str, List[str]], capacity: int = 1024):
+        self.parameter_lists = parameter_lists
+        self.names = list(parameter_lists)
+        self.value_indexes = [
+            {value: index for index, value in enumerate(values)}
+            for values in parameter_lists.values()
+        ]
+        self.metrics: List[str] = []
+        self.metric_index: Dict[str, int] = {}
+        self.run_ids: List[str] = []
+        self.size = 0
+        self.codes = np.empty((capacity, len(self.names)), dtype=np.int32)
+        self.run = np.empty(capacity, dtype=np.int32)
+        self.metric = np.empty(capacity, dtype=np.int32)
+        self.value = np.empty(capacity, dtype=np.float64)
+        self.passed = np.empty(capacity, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def grow(self, size: int) -> None:
+        capacity = len(self.run)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity = capacity * 2
+        codes = np.empty((capacity, len(self.names)), dtype=np.int32)
+        codes[: self.size] = self.codes[: self.size]
+        self.codes = codes
+        for name in ["run", "metric", "value", "passed"]:
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self.size] = column[: self.size]
+            setattr(self, name, grown)
+
+    def append(self, config: Config, run: Run) -> None:
+        """Add a row for each result of run, a run of config."""
+        count = len(run.results)
+        self.grow(self.size + count)
+        rows = slice(self.size, self.size + count)
+        self.codes[rows] = [
+            value_index[config.parameters[name]]
+            for name, value_index in zip(self.names, self.value_indexes)
+        ]
+        self.run[rows] = len(self.run_ids)
+        self.run_ids.append(run.id)
+        for row, result in enumerate(run.results, start=self.size):
+            metric = self.metric_index.get(result.metric)
+            if metric is None:
+                metric = len(self.metrics)
+                self.metrics.append(result.metric)
+                self.metric_index[result.metric] = metric
+            self.metric[row] = metric
+            self.value[row] = float(result.value)
+            if not result.conditions:
+                self.passed[row] = UNKNOWN
+            else:
+                self.passed[row] = FAIL if result.failures else PASS
+        self.size = self.size + count
+
+    def rows(self, metric: Optional[str] = None, **parameters: str) -> np.ndarray:
+        """Positions of rows of metric, if given, with the given parameter
+        values, in the order they were added."""
+        mask = np.ones(self.size, dtype=bool)
+        if metric is not None:
+            if metric not in self.metric_index:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.metric[: self.size] == self.metric_index[metric]
+        for name, value in parameters.items():
+            position = self.names.index(name)
+            code = self.value_indexes[position].get(value)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.codes[: self.size, position] == code
+        rows: np.ndarray = np.flatnonzero(mask)
+        return rows
+
+    def values(self, rows: np.ndarray) -> np.ndarray:
+        values: np.ndarray = self.value[rows]
+        return values
+
+    def parameter(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Values of a parameter in the given rows, as strings."""
+        position = self.names.index(name)
+        values: np.ndarray = np.array(self.parameter_lists[name], dtype=object)[
+            self.codes[rows, position]
+        ]
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """All rows as a DataFrame indexed by the parameters, with parameter
+        and metric levels as categoricals ordered like the plan."""
+        size = self.size
+        columns = {
+            name: pd.Categorical.from_codes(
+                self.codes[:size, position],
+                categories=self.parameter_lists[name],
+                ordered=True,
+            )
+            for position, name in enumerate(self.names)
+        }
+        columns["run_id"] = np.array(self.run_ids, dtype=object)[self.run[:size]]
+        columns["metric"] = pd.Categorical.from_codes(
+            self.metric[:size], categories=self.metrics
+        )
+        columns["value"] = self.value[:size]
+        passed = self.passed[:size]
+        columns["passed"] = np.where(passed == UNKNOWN, None, passed == PASS)
+        return pd.DataFrame(columns).set_index(self.names)
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from perfsize.perfsize import (
+    lt,
+    Condition,
+    LoadManager,
+    Plan,
+    Reporter,
+    ResultManager,
+    StepManager,
+    Workflow,
+)
+from perfsize.environment.mock import MockEnvironmentManager
+from perfsize.load.mock import MockLoadManager
+from perfsize.result.mock import MockResultManager
+import pytest
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@pytest.fixture
+def make_plan() -> Callable[..., Plan]:
+    """Make plans over instance types and TPS values, then any other
+    parameter lists, by default requiring p99 latency under 200. Other
+    keyword arguments are passed to Plan."""
+
+    def make(
+        tps: Sequence[str],
+        instance_types: Sequence[str] = ("ml.m5.large", "ml.m5.xlarge"),
+        requirements: Optional[Dict[str, List[Condition]]] = None,
+        parameter_lists: Optional[Dict[str, List[str]]] = None,
+        **options: Any,
+    ) -> Plan:
+        if requirements is None:
+            requirements = {
+                "latency_success_p99": [Condition(lt(Decimal("200")), "value < 200")]
+            }
+        return Plan(
+            parameter_lists={
+                "instance_type": list(instance_types),
+                "steady_state_tps": list(tps),
+                **(parameter_lists or {}),
+            },
+            requirements=requirements,
+            **options,
+        )
+
+    return make
+
+
+@pytest.fixture
+def run_workflow() -> Callable[..., Dict[str, str]]:
+    """Run plans with mock environment and load managers, by default with a
+    MockResultManager, returning the recommendation."""
+
+    def run(
+        plan: Plan,
+        step_manager: StepManager,
+        result_managers: Optional[List[ResultManager]] = None,
+        load_manager: Optional[LoadManager] = None,
+        reporters: Optional[List[Reporter]] = None,
+        **options: Any,
+    ) -> Dict[str, str]:
+        return Workflow(
+            plan=plan,
+            step_manager=step_manager,
+            environment_manager=MockEnvironmentManager(),
+            load_manager=load_manager or MockLoadManager(),
+            result_managers=result_managers or [MockResultManager()],
+            reporters=reporters or [],
+            **options,
+        ).run()
+
+    return run
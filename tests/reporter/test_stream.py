@@ -0,0 +1,94 @@
+import csv
+from datetime import datetime
+from decimal import Decimal
+import json
+from perfsize.perfsize import lt, Condition, Config, Plan, Result, Run
+from perfsize.reporter.stream import StreamReporter
+from perfsize.step.binary import BinarySearchStepManager
+from pathlib import Path
+import pytest
+from typing import Callable, Dict
+
+
+@pytest.fixture
+def run_plan(
+    make_plan: Callable[..., Plan], run_workflow: Callable[..., Dict[str, str]]
+) -> Callable[[StreamReporter], Plan]:
+    def run(reporter: StreamReporter) -> Plan:
+        plan = make_plan(
+            ["10", "20", "30"],
+            requirements={
+                "latency_success_p99": [Condition(lt(Decimal("200")), "value < 200")],
+                "percent_fail": [Condition(lt(Decimal("0.01")), "value < 0.01")],
+            },
+        )
+        run_workflow(plan, BinarySearchStepManager(plan), reporters=[reporter])
+        return plan
+
+    return run
+
+
+class TestStreamReporter:
+    def test_jsonl(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture[str],
+        run_plan: Callable[[StreamReporter], Plan],
+    ) -> None:
+        path = tmp_path / "steps.jsonl"
+        reporter = StreamReporter(str(path))
+        plan = run_plan(reporter)
+        rows = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(rows) == len(plan.history) == 4
+        assert rows[0]["step"] == 1
+        assert rows[0]["parameters"] == plan.history[0].parameters
+        assert rows[0]["status"] is True
+        assert rows[0]["confidence"] is None
+        assert rows[0]["results"] == {
+            "latency_success_p99": "199",
+            "percent_fail": "0",
+        }
+        output = capsys.readouterr().out
+        assert "Steps: 4 (passed 4, failed 0, aborted 0, no status 0)" in output
+        assert (
+            "Recommendation: {'instance_type': 'ml.m5.large', 'steady_state_tps': '30'}"
+            in output
+        )
+
+    def test_csv(
+        self, tmp_path: Path, run_plan: Callable[[StreamReporter], Plan]
+    ) -> None:
+        path = tmp_path / "steps.csv"
+        run_plan(StreamReporter(str(path), format="csv"))
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        # One row per result of each of the 4 steps.
+        assert len(rows) == 8
+        assert [row["step"] for row in rows] == ["1", "1", "2", "2", "3", "3", "4", "4"]
+        assert rows[2]["instance_type"] == "ml.m5.large"
+        assert rows[2]["metric"] == "latency_success_p99"
+        assert rows[2]["value"] == "199"
+        assert rows[3]["metric"] == "percent_fail"
+        assert rows[3]["value"] == "0"
+        assert rows[2]["status"] == "True"
+
+    def test_csv_keeps_later_metrics(self, tmp_path: Path) -> None:
+        path = tmp_path / "steps.csv"
+        reporter = StreamReporter(str(path), format="csv")
+        plan = Plan({"instance_type": ["ml.m5.large"]}, {})
+        config = Config({"instance_type": "ml.m5.large"}, {})
+        now = datetime.utcnow()
+        reporter.step(plan, config, Run("empty", now, now, []))
+        results = [Result("count_fail", Decimal("3"), [])]
+        reporter.step(plan, config, Run("later", now, now, results))
+        reporter.render(plan)
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(row["run_id"], row["metric"], row["value"]) for row in rows] == [
+            ("empty", "", ""),
+            ("later", "count_fail", "3"),
+        ]
+
+    def test_invalid_format(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            StreamReporter(str(tmp_path / "steps.xml"), format="xml")
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from perfsize.perfsize import (
     lt,
@@ -23,10 +23,24 @@ from perfsize.environment.mock import MockEnvironmentManager
 from perfsize.load.mock import MockLoadManager
 from perfsize.reporter.mock import MockReporter
 from perfsize.result.mock import MockResultManager
-from perfsize.result.gatling import Metric, GatlingResultManager
+from perfsize.result.gatling import (
+    ALL_REQUESTS,
+    Metric,
+    GatlingResultManager,
+    ParseCache,
+    planned_requests,
+    request_metric,
+    RunDirectoryIndex,
+)
 from perfsize.step.mock import MockStepManager
+import os
+from pathlib import Path
 from pprint import pprint
 import pytest
+import random
+import threading
+import time
+from typing import List, Tuple
 from unittest.mock import patch
 
 
@@ -70,3 +84,643 @@ class TestGatlingResultManager:
         )
         result_manager.query(config, run)
         pprint(run.results)
+
+
+SIMULATION_LOG = (
+    "examples/perfsize-results-root/test_run_tag-20210514085734518/simulation.log"
+)
+
+
+def write_simulation_log(path: str, requests: List[Tuple[str, int, int, str]]) -> None:
+    with open(path, "w") as f:
+        f.write(
+            "RUN\tGenericSageMakerScenario\ttest_run_tag\t1620982654518\t \t3.2.0\n"
+        )
+        for index, (name, start, end, status) in enumerate(requests):
+            f.write(f"USER\tSageMaker\t{index}\tSTART\t{start}\t{start}\n")
+            f.write(f"REQUEST\t{index}\t\t{name}\t{start}\t{end}\t{status}\t \n")
+            f.write(f"USER\tSageMaker\t{index}\tEND\t{start}\t{end}\n")
+
+
+def mixed_requests() -> List[Tuple[str, int, int, str]]:
+    rng = random.Random(42)
+    requests = []
+    for index in range(500):
+        name = rng.choice(["predict-a", "predict-b", "predict-c"])
+        start = 1620982657000 + index * 10
+        status = "KO" if rng.random() < 0.1 else "OK"
+        requests.append((name, start, start + rng.randint(50, 900), status))
+    # One request name with failures only.
+    requests.append(("predict-d", 1620982667000, 1620982667100, "KO"))
+    return requests
+
+
+def failing_requests() -> List[Tuple[str, int, int, str]]:
+    # 80 failures in 200 requests.
+    statuses = ["KO"] * 80 + ["OK"] * 120
+    return [
+        ("predict", 1620982657000 + index, 1620982657100 + index, status)
+        for index, status in enumerate(statuses)
+    ]
+
+
+@pytest.fixture
+def mixed_log(tmp_path: Path) -> str:
+    path = str(tmp_path / "simulation.log")
+    write_simulation_log(path, mixed_requests())
+    return path
+
+
+class TestGatlingParseEngines:
+    def test_invalid_engine(self) -> None:
+        with pytest.raises(ValueError):
+            GatlingResultManager(results_path="unused", engine="invalid")
+
+    @pytest.mark.parametrize("engine", ["stream", "numpy"])
+    def test_engine_matches_pandas_on_example(self, engine: str) -> None:
+        pandas_stats = GatlingResultManager("unused").parse(SIMULATION_LOG)
+        engine_stats = GatlingResultManager("unused", engine=engine).parse(
+            SIMULATION_LOG
+        )
+        assert engine_stats == pandas_stats
+
+    @pytest.mark.parametrize("engine", ["stream", "numpy"])
+    def test_engine_matches_pandas_on_mixed_log(
+        self, engine: str, mixed_log: str
+    ) -> None:
+        pandas_stats = GatlingResultManager("unused").parse(mixed_log)
+        # Small chunks so the numpy engine has to split on line boundaries.
+        engine_stats = GatlingResultManager(
+            "unused", engine=engine, chunk_size=1000
+        ).parse(mixed_log)
+        assert list(engine_stats) == list(pandas_stats)
+        assert engine_stats == pandas_stats
+        assert engine_stats["predict-d"][Metric.latency_success_p99] == Decimal("0")
+
+    @pytest.mark.parametrize("engine", ["pandas", "stream", "numpy"])
+    def test_engine_rejects_bad_request_format(
+        self, engine: str, tmp_path: Path
+    ) -> None:
+        path = str(tmp_path / "simulation.log")
+        write_simulation_log(path, [("predict-a", 1, 2, "OK")])
+        with open(path, "a") as f:
+            f.write("REQUEST\t1\tpredict-a\t1\t2\tOK\n")
+        with pytest.raises(ValueError):
+            GatlingResultManager("unused", engine=engine).parse(path)
+
+    @pytest.mark.parametrize("engine", ["pandas", "stream", "numpy"])
+    def test_engine_rejects_bad_header(self, engine: str, tmp_path: Path) -> None:
+        path = str(tmp_path / "simulation.log")
+        with open(path, "w") as f:
+            f.write("REQUEST\t1\t\tpredict-a\t1\t2\tOK\t \n")
+        with pytest.raises(ValueError):
+            GatlingResultManager("unused", engine=engine).parse(path)
+
+    def test_numpy_without_trailing_newline(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "simulation.log")
+        with open(path, "w") as f:
+            f.write("RUN\tscenario\ttag\t1620982654518\t \t3.2.0\n")
+            f.write("REQUEST\t1\t\tpredict-a\t1000\t1250\tOK\t ")
+        stats = GatlingResultManager("unused", engine="numpy").parse(path)
+        assert stats[ALL_REQUESTS][Metric.latency_success_max] == Decimal("250")
+
+    def test_numpy_with_control_characters(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "simulation.log")
+        write_simulation_log(path, mixed_requests())
+        with open(path, "a") as f:
+            f.write("REQUEST\t1\t\tpredict-a\t1000\t1250\tKO\tbad\x00\x08body\n")
+        pandas_stats = GatlingResultManager("unused").parse(path)
+        numpy_stats = GatlingResultManager("unused", engine="numpy").parse(path)
+        assert numpy_stats == pandas_stats
+
+    def test_query_adds_results_by_request_name(self) -> None:
+        name = "SageMaker-LEARNING-model-sim-public-c-1"
+        p99_conditions = [Condition(lt(Decimal("200")), "value < 200")]
+        config = Config(
+            parameters={},
+            requirements={
+                request_metric(name, Metric.latency_success_p99): p99_conditions
+            },
+        )
+        run = Run("test_run_tag", datetime.now(), datetime.now(), results=[])
+        GatlingResultManager("examples/perfsize-results-root").query(config, run)
+        results = {result.metric: result for result in run.results}
+        assert results[Metric.latency_success_p99].conditions == []
+        by_name = results[request_metric(name, Metric.latency_success_p99)]
+        assert by_name.value == results[Metric.latency_success_p99].value
+        assert by_name.failures == p99_conditions
+        assert run.status is False
+
+        run = Run("test_run_tag", datetime.now(), datetime.now(), results=[])
+        GatlingResultManager(
+            "examples/perfsize-results-root", by_request_name=False
+        ).query(config, run)
+        assert len(run.results) == 16
+        assert run.status is None
+
+    def test_histogram_backend(self, mixed_log: str) -> None:
+        exact = GatlingResultManager("unused", engine="numpy").parse(mixed_log)
+        histogram = GatlingResultManager(
+            "unused", engine="numpy", latency_backend="histogram"
+        ).parse(mixed_log)
+        assert list(histogram) == list(exact)
+        for name in exact:
+            for metric, value in exact[name].items():
+                assert abs(histogram[name][metric] - value) <= value / 256 + 1
+
+
+class TestGatlingMultiNode:
+    @pytest.fixture
+    def results_root(self, tmp_path: Path) -> Path:
+        requests = mixed_requests()
+        for index in range(3):
+            run_dir = tmp_path / f"test_run_tag-2021051408573451{index}"
+            run_dir.mkdir()
+            write_simulation_log(str(run_dir / "simulation.log"), requests[index::3])
+        return tmp_path
+
+    def test_find_run_dirs(self, results_root: Path) -> None:
+        result_manager = GatlingResultManager(str(results_root))
+        assert len(result_manager.find_run_dirs("test_run_tag")) == 3
+        with pytest.raises(RuntimeError):
+            result_manager.find_run_dir("test_run_tag")
+        with pytest.raises(RuntimeError):
+            result_manager.find_run_dirs("missing_tag")
+
+    @pytest.mark.parametrize("latency_backend", ["exact", "histogram"])
+    @pytest.mark.parametrize("max_workers", [1, 3])
+    def test_parse_many_matches_concatenated_log(
+        self, results_root: Path, latency_backend: str, max_workers: int
+    ) -> None:
+        result_manager = GatlingResultManager(
+            str(results_root),
+            engine="numpy",
+            latency_backend=latency_backend,
+            max_workers=max_workers,
+        )
+        paths = [
+            str(results_root / run_dir / "simulation.log")
+            for run_dir in result_manager.find_run_dirs("test_run_tag")
+        ]
+        requests = []
+        for index in range(3):
+            requests.extend(mixed_requests()[index::3])
+        concatenated = str(results_root / "concatenated.log")
+        write_simulation_log(concatenated, requests)
+        expected = result_manager.parse(concatenated)
+        merged = result_manager.parse_many(paths)
+        assert list(merged) == list(expected)
+        assert merged == expected
+
+    def test_query_multi_node(self, results_root: Path) -> None:
+        config = Config(parameters={}, requirements={})
+        run = Run("test_run_tag", datetime.now(), datetime.now(), results=[])
+        GatlingResultManager(str(results_root), multi_node=True).query(config, run)
+        results = {result.metric: result.value for result in run.results}
+        assert results[Metric.count_total] == Decimal(len(mixed_requests()))
+
+
+class TestParseCache:
+    @pytest.mark.parametrize("latency_backend", ["exact", "histogram"])
+    def test_cache_hit(
+        self, mixed_log: str, tmp_path: Path, latency_backend: str
+    ) -> None:
+        cache = ParseCache(str(tmp_path))
+        result_manager = GatlingResultManager(
+            str(tmp_path),
+            engine="numpy",
+            latency_backend=latency_backend,
+            cache=cache,
+        )
+        expected = result_manager.parse(mixed_log)
+        assert os.path.exists(cache.sidecar_path(mixed_log, latency_backend))
+        with patch.object(
+            GatlingResultManager, "aggregate_numpy", side_effect=AssertionError
+        ):
+            cached = result_manager.parse(mixed_log)
+        assert list(cached) == list(expected)
+        assert cached == expected
+
+    def test_cache_miss_when_log_changes(self, mixed_log: str, tmp_path: Path) -> None:
+        result_manager = GatlingResultManager(
+            str(tmp_path), engine="numpy", cache=ParseCache(str(tmp_path))
+        )
+        before = result_manager.parse(mixed_log)
+        with open(mixed_log, "a") as f:
+            f.write("REQUEST\t9999\t\tpredict-e\t1620982668000\t1620982668100\tOK\t \n")
+        after = result_manager.parse(mixed_log)
+        assert "predict-e" not in before
+        assert after["predict-e"][Metric.count_total] == Decimal("1")
+
+    def test_content_hash(self, mixed_log: str, tmp_path: Path) -> None:
+        cache = ParseCache(str(tmp_path), content_hash=True)
+        assert "sha256" in cache.fingerprint(mixed_log)
+        result_manager = GatlingResultManager(str(tmp_path), cache=cache)
+        assert result_manager.parse(mixed_log) == result_manager.parse(mixed_log)
+
+    def test_eviction(self, tmp_path: Path) -> None:
+        paths = []
+        for index in range(3):
+            run_dir = tmp_path / f"run-{index}"
+            run_dir.mkdir()
+            path = str(run_dir / "simulation.log")
+            write_simulation_log(path, mixed_requests())
+            paths.append(path)
+        cache = ParseCache(str(tmp_path))
+        result_manager = GatlingResultManager(str(tmp_path), cache=cache)
+        for index, path in enumerate(paths):
+            result_manager.parse(path)
+            sidecar_path = cache.sidecar_path(path, "exact")
+            os.utime(sidecar_path, ns=(index, index))
+        # Sidecar sizes can differ by a few bytes, as compressed metadata varies.
+        cache.max_bytes = sum(
+            os.path.getsize(cache.sidecar_path(path, "exact")) for path in paths[1:]
+        )
+        cache.evict()
+        assert not os.path.exists(cache.sidecar_path(paths[0], "exact"))
+        assert os.path.exists(cache.sidecar_path(paths[1], "exact"))
+        assert os.path.exists(cache.sidecar_path(paths[2], "exact"))
+
+    def test_eviction_scans_run_directories_only(self, tmp_path: Path) -> None:
+        report_dir = tmp_path / "run-0" / "js"
+        report_dir.mkdir(parents=True)
+        nested = str(report_dir / "simulation.log")
+        write_simulation_log(nested, mixed_requests())
+        path = str(tmp_path / "run-0" / "simulation.log")
+        write_simulation_log(path, mixed_requests())
+        cache = ParseCache(str(tmp_path))
+        result_manager = GatlingResultManager(str(tmp_path), cache=cache)
+        result_manager.parse(nested)
+        result_manager.parse(path)
+        assert [path for _, _, path in cache.scan()] == [
+            cache.sidecar_path(path, "exact")
+        ]
+        cache.max_bytes = 0
+        cache.evict()
+        assert os.path.exists(cache.sidecar_path(nested, "exact"))
+        assert not os.path.exists(cache.sidecar_path(path, "exact"))
+
+    def test_eviction_after_a_tenth_written(self, tmp_path: Path) -> None:
+        paths = []
+        for index in range(4):
+            path = str(tmp_path / f"simulation-{index}.log")
+            write_simulation_log(path, mixed_requests())
+            paths.append(path)
+        cache = ParseCache(str(tmp_path))
+        result_manager = GatlingResultManager(str(tmp_path), cache=cache)
+        result_manager.parse(paths[0])
+        size = os.path.getsize(cache.sidecar_path(paths[0], "exact"))
+        cache.max_bytes = int(size * 25)
+        with patch.object(cache, "evict", wraps=cache.evict) as evict:
+            for path in paths[1:]:
+                result_manager.parse(path)
+            # Evicts once a tenth of max_bytes, 2.5 sidecars, was written.
+            assert evict.call_count == 1
+
+    def test_eviction_with_parallel_parse(self, tmp_path: Path) -> None:
+        paths = []
+        for index in range(4):
+            path = str(tmp_path / f"simulation-{index}.log")
+            write_simulation_log(path, mixed_requests())
+            paths.append(path)
+        cache = ParseCache(str(tmp_path))
+        GatlingResultManager(str(tmp_path), cache=cache).parse(paths[0])
+        sidecar_path = cache.sidecar_path(paths[0], "exact")
+        size = os.path.getsize(sidecar_path)
+        os.remove(sidecar_path)
+        cache.written = 0
+        cache.max_bytes = int(size * 25)
+        result_manager = GatlingResultManager(str(tmp_path), cache=cache, max_workers=2)
+        result_manager.parse_many(paths)
+        # Sidecars are saved by this process, so it counts the bytes written
+        # and evicts once a tenth of max_bytes, 2.5 sidecars, was, leaving
+        # the count at the last one.
+        assert cache.written == os.path.getsize(cache.sidecar_path(paths[3], "exact"))
+        assert result_manager.parse_many(paths) == GatlingResultManager(
+            str(tmp_path), max_workers=2
+        ).parse_many(paths)
+
+
+class TestRunDirectoryIndex:
+    def test_find_and_refresh(self, tmp_path: Path) -> None:
+        for name in ["tag-b-2", "tag-a-1", "tag-ab-1", "other"]:
+            (tmp_path / name).mkdir()
+        (tmp_path / "tag-a-file").touch()
+        index = RunDirectoryIndex(str(tmp_path))
+        assert index.find("tag-a") == ["tag-a-1", "tag-ab-1"]
+        assert index.find("tag-a-") == ["tag-a-1"]
+        assert index.names == ["other", "tag-a-1", "tag-ab-1", "tag-b-2"]
+
+        (tmp_path / "tag-c-1").mkdir()
+        (tmp_path / "tag-a-1").rmdir()
+        assert index.find("tag-c") == ["tag-c-1"]
+        assert index.find("tag-a") == ["tag-ab-1"]
+
+    def test_unchanged_directory_is_not_scanned(self, tmp_path: Path) -> None:
+        (tmp_path / "tag-a-1").mkdir()
+        # An mtime close to the scan time is not trusted, so age it.
+        hour_ago = time.time() - 3600
+        os.utime(tmp_path, (hour_ago, hour_ago))
+        index = RunDirectoryIndex(str(tmp_path))
+        assert index.find("tag-a") == ["tag-a-1"]
+        with patch("os.scandir", side_effect=AssertionError):
+            assert index.find("tag-a") == ["tag-a-1"]
+
+    def test_directory_added_in_the_same_mtime_tick(self, tmp_path: Path) -> None:
+        (tmp_path / "tag-1").mkdir()
+        result_manager = GatlingResultManager(str(tmp_path), multi_node=True)
+        stat = os.stat(tmp_path)
+        assert result_manager.find_run_dirs("tag") == ["tag-1"]
+        # With coarse mtimes, adding a directory may leave the mtime as it was.
+        (tmp_path / "tag-2").mkdir()
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert result_manager.find_run_dirs("tag") == ["tag-1", "tag-2"]
+        with pytest.raises(RuntimeError):
+            result_manager.find_run_dir("tag")
+
+    def test_nested_directories_are_ignored(self, tmp_path: Path) -> None:
+        (tmp_path / "parent" / "tag-a-1").mkdir(parents=True)
+        result_manager = GatlingResultManager(str(tmp_path))
+        with pytest.raises(RuntimeError):
+            result_manager.find_run_dir("tag-a")
+
+
+class TestGatlingTrimAndWindows:
+    @pytest.mark.parametrize("engine", ["pandas", "stream", "numpy"])
+    def test_warmup_and_cooldown(self, engine: str, tmp_path: Path) -> None:
+        # Simulation starts at 1620982654518 and the last request ends at
+        # 1620982667100, so keep requests starting in [1620982657518, 1620982661100).
+        requests = mixed_requests()
+        kept = [r for r in requests if 1620982657518 <= r[1] < 1620982661100]
+        expected_log = str(tmp_path / "expected.log")
+        write_simulation_log(expected_log, kept)
+        trimmed_log = str(tmp_path / "trimmed.log")
+        write_simulation_log(trimmed_log, requests)
+        expected = GatlingResultManager("unused").parse(expected_log)
+        trimmed = GatlingResultManager(
+            "unused",
+            engine=engine,
+            chunk_size=1000,
+            warmup=timedelta(seconds=3),
+            cooldown=timedelta(seconds=6),
+        ).parse(trimmed_log)
+        assert "predict-d" not in trimmed
+        assert trimmed == expected
+
+    def test_trimming_everything(self, mixed_log: str) -> None:
+        with pytest.raises(RuntimeError):
+            GatlingResultManager(
+                "unused", engine="numpy", warmup=timedelta(minutes=1)
+            ).parse(mixed_log)
+
+    def test_trimmed_results_cached_separately(
+        self, mixed_log: str, tmp_path: Path
+    ) -> None:
+        cache = ParseCache(str(tmp_path))
+        full = GatlingResultManager("unused", engine="numpy", cache=cache)
+        trimmed = GatlingResultManager(
+            "unused", engine="numpy", cache=cache, warmup=timedelta(seconds=5)
+        )
+        expected = trimmed.parse(mixed_log)
+        assert full.parse(mixed_log) != expected
+        assert trimmed.parse(mixed_log) == expected
+
+    def test_windows(self, mixed_log: str) -> None:
+        result_manager = GatlingResultManager("unused", engine="numpy")
+        df = result_manager.windows(mixed_log, "1s")
+        # Requests start every 10ms from 1620982657000, then predict-d alone.
+        assert len(df) == 6
+        assert df.index[0] == datetime(2021, 5, 14, 8, 57, 37, tzinfo=timezone.utc)
+        assert list(df[Metric.count_total][:5]) == [Decimal(100)] * 5
+        assert list(df["throughput"][:5]) == [Decimal(100)] * 5
+        assert df[Metric.percent_fail].iloc[-1] == Decimal(100)
+        whole = result_manager.parse(mixed_log)[ALL_REQUESTS]
+        assert df[Metric.count_fail].sum() == whole[Metric.count_fail]
+        assert df[Metric.latency_success_max].max() == whole[Metric.latency_success_max]
+
+        df = result_manager.windows(mixed_log, timedelta(seconds=10))
+        assert len(df) == 2
+        assert list(df["throughput"]) == [Decimal("30"), Decimal("20.1")]
+
+    def test_invalid_window(self, mixed_log: str) -> None:
+        with pytest.raises(ValueError):
+            GatlingResultManager("unused").windows(mixed_log, "0s")
+
+    def test_validate_time_range(self) -> None:
+        config = Config(parameters={}, requirements={})
+        result_manager = GatlingResultManager(
+            "examples/perfsize-results-root", validate_time_range=True
+        )
+        run = Run("test_run_tag", datetime.now(), datetime.now(), results=[])
+        with pytest.raises(RuntimeError):
+            result_manager.query(config, run)
+        run = Run("test_run_tag", datetime(2021, 5, 13), datetime(2021, 5, 16), [])
+        result_manager.query(config, run)
+        assert run.results
+
+
+class TestSimulationLogFollower:
+    def test_follow_growing_log(self, mixed_log: str, tmp_path: Path) -> None:
+        result_manager = GatlingResultManager("unused", engine="numpy")
+        expected = result_manager.parse(mixed_log)
+        with open(mixed_log, "rb") as f:
+            content = f.read()
+        path = str(tmp_path / "growing" / "simulation.log")
+        follower = result_manager.follow(path)
+        assert follower.poll() == 0
+        os.mkdir(os.path.dirname(path))
+        added = 0
+        # Uneven pieces, so lines and the header are split across polls.
+        with open(path, "wb") as f:
+            for begin in range(0, len(content), 997):
+                f.write(content[begin : begin + 997])
+                f.flush()
+                added += follower.poll()
+                snapshot = follower.snapshot()
+                if added:
+                    assert snapshot[ALL_REQUESTS][Metric.count_total] == added
+                else:
+                    assert snapshot == {}
+        assert added == len(mixed_requests())
+        assert follower.poll() == 0
+        assert follower.snapshot() == expected
+
+    def test_follow_header_only_and_partial_lines(self, tmp_path: Path) -> None:
+        # Gatling writes the RUN header first, then requests line by line.
+        path = str(tmp_path / "simulation.log")
+        follower = GatlingResultManager("unused", engine="numpy").follow(path)
+        with open(path, "w") as f:
+            f.write("RUN\tscenario\ttag\t1620982654518\t \t3.2.0\n")
+            f.flush()
+            assert follower.poll() == 0
+            assert follower.snapshot() == {}
+            f.write("REQUEST\t1\t\tpredict-a\t1000\t12")
+            f.flush()
+            assert follower.poll() == 0
+            f.write("50\tOK\t")
+            f.flush()
+            assert follower.poll() == 0
+            f.write(" \nREQUEST\t2\t\tpredict-a\t1100\t1200\tOK\t \n")
+            f.flush()
+            assert follower.poll() == 2
+        stats = follower.snapshot()[ALL_REQUESTS]
+        assert stats[Metric.count_total] == Decimal(2)
+        assert stats[Metric.latency_success_max] == Decimal(250)
+
+    def test_follow_with_warmup_and_truncation(
+        self, mixed_log: str, tmp_path: Path
+    ) -> None:
+        result_manager = GatlingResultManager(
+            "unused", engine="numpy", warmup=timedelta(seconds=5)
+        )
+        follower = result_manager.follow(mixed_log)
+        follower.poll()
+        # Only the requests starting from 1620982659518 are kept, 248 + predict-d.
+        assert follower.count == 249
+        write_simulation_log(mixed_log, mixed_requests()[-1:])
+        follower.poll()
+        assert list(follower.snapshot()) == [ALL_REQUESTS, "predict-d"]
+
+    def test_interim_follows_new_run_directories(
+        self, mixed_log: str, tmp_path: Path
+    ) -> None:
+        results_root = tmp_path / "results"
+        (results_root / "previous_run_tag-20210514085734518").mkdir(parents=True)
+        max_name = request_metric("predict-a", Metric.latency_success_max)
+        config = Config(
+            parameters={},
+            requirements={
+                Metric.percent_fail: [Condition(lt(Decimal("5")), "value < 5")],
+                Metric.count_total: [Condition(gte(Decimal("1000")), "value >= 1000")],
+                Metric.latency_success_max: [
+                    Condition(lt(Decimal("800")), "value < 800"),
+                    Condition(gte(Decimal("0")), "value >= 0"),
+                ],
+                max_name: [Condition(lt(Decimal("800")), "value < 800")],
+            },
+        )
+        result_manager = GatlingResultManager(
+            str(results_root), interim_min_requests=10
+        )
+        result_manager.interim_start(config)
+        assert result_manager.interim(config) == []
+        run_dir = results_root / "test_run_tag-20210514085734519"
+        run_dir.mkdir()
+        write_simulation_log(str(run_dir / "simulation.log"), [])
+        assert result_manager.interim(config) == []
+        write_simulation_log(str(run_dir / "simulation.log"), mixed_requests()[:5])
+        assert result_manager.interim(config) == []
+        write_simulation_log(str(run_dir / "simulation.log"), mixed_requests())
+        results = {result.metric: result for result in result_manager.interim(config)}
+        # Failure rates can recover, and counts can still reach lower bounds.
+        assert list(results) == [Metric.latency_success_max, max_name]
+        assert [
+            c.description for c in results[Metric.latency_success_max].failures
+        ] == ["value < 800"]
+        assert results[Metric.latency_success_max].conditions == [
+            config.requirements[Metric.latency_success_max][0]
+        ]
+        assert results[max_name].failures
+
+        # A repeated run of the same config follows only its own directory.
+        result_manager.interim_start(config)
+        assert result_manager.interim(config) == []
+
+    def test_planned_requests(self) -> None:
+        parameters = {"steady_state_tps": "10", "steady_state_minutes": "2"}
+        assert planned_requests(Config(parameters, {})) == 1200
+        parameters.update({"ramp_start_tps": "0", "ramp_minutes": "1"})
+        assert planned_requests(Config(parameters, {})) == 300 + 1200
+
+    def test_interim_failure_rate_bound(self, tmp_path: Path) -> None:
+        config = Config(
+            parameters={},
+            requirements={
+                Metric.percent_fail: [
+                    Condition(lt(Decimal("5")), "value < 5"),
+                    Condition(lt(Decimal("10")), "value < 10"),
+                    Condition(gte(Decimal("0")), "value >= 0"),
+                ],
+                Metric.percent_success: [
+                    Condition(gt(Decimal("95")), "value > 95"),
+                ],
+            },
+        )
+        result_manager = GatlingResultManager(
+            str(tmp_path), interim_min_requests=10, planned_requests=lambda _: 1000
+        )
+        result_manager.interim_start(config)
+        run_dir = tmp_path / "test_run_tag-20210514085734519"
+        run_dir.mkdir()
+        # 80 failures in the first 200 of 1000 requests.
+        write_simulation_log(str(run_dir / "simulation.log"), failing_requests())
+        results = {result.metric: result for result in result_manager.interim(config)}
+        assert list(results) == [Metric.percent_success, Metric.percent_fail]
+        # At least 8% of all requests fail, whatever the rest of them do.
+        assert results[Metric.percent_fail].value == Decimal("8")
+        assert [c.description for c in results[Metric.percent_fail].conditions] == [
+            "value < 5",
+            "value < 10",
+        ]
+        assert [c.description for c in results[Metric.percent_fail].failures] == [
+            "value < 5"
+        ]
+        assert results[Metric.percent_success].value == Decimal("92")
+        assert results[Metric.percent_success].failures
+
+        # Without a planned total, failure rates can still recover.
+        result_manager = GatlingResultManager(str(tmp_path), interim_min_requests=10)
+        result_manager.interim_start(config)
+        (tmp_path / "test_run_tag-20210514085734520").mkdir()
+        os.replace(
+            run_dir / "simulation.log",
+            tmp_path / "test_run_tag-20210514085734520" / "simulation.log",
+        )
+        assert result_manager.interim(config) == []
+
+    def test_workflow_aborts_on_failure_rate(self, tmp_path: Path) -> None:
+        plan = Plan(
+            {"steady_state_tps": ["5"], "steady_state_minutes": ["1"]},
+            {Metric.percent_fail: [Condition(lt(Decimal("5")), "value < 5")]},
+        )
+        load_manager = FailingLoadManager(tmp_path)
+        Workflow(
+            plan=plan,
+            step_manager=MockStepManager(plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=load_manager,
+            result_managers=[
+                GatlingResultManager(
+                    str(tmp_path),
+                    interim_min_requests=10,
+                    planned_requests=planned_requests,
+                )
+            ],
+            reporters=[],
+            abort_check_seconds=0.01,
+        ).run()
+        # 80 failures of 300 planned requests, so over 5% whatever the rest do.
+        run = plan.history[0].runs[0]
+        assert load_manager.aborted.is_set()
+        assert run.aborted
+        assert run.status is False
+
+
+class FailingLoadManager(LoadManager):
+    """Writes a simulation.log with 80 failures in 200 requests, then waits
+    for abort."""
+
+    def __init__(self, results_path: Path) -> None:
+        self.results_path = results_path
+        self.aborted = threading.Event()
+
+    def send(self, config: Config) -> Run:
+        start = datetime.utcnow()
+        run_dir = self.results_path / "failing_run-20210514085734519"
+        run_dir.mkdir()
+        write_simulation_log(str(run_dir / "simulation.log"), failing_requests())
+        self.aborted.wait(timeout=5)
+        return Run("failing_run", start, datetime.utcnow(), [])
+
+    def abort(self, config: Config) -> None:
+        self.aborted.set()
@@ -0,0 +1,114 @@
+import numpy as np
+from perfsize.result.latency import (
+    LatencyCounts,
+    LatencyHistogram,
+    percentiles_from_counts,
+)
+import pytest
+
+PERCENTILES = [0, 25, 50, 75, 90, 95, 98, 99, 100]
+
+
+@pytest.fixture
+def latencies() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    return rng.lognormal(mean=5, sigma=1, size=20000).astype(np.int64)
+
+
+class TestPercentilesFromCounts:
+    def test_matches_numpy(self) -> None:
+        rng = np.random.default_rng(3)
+        for size in (1, 2, 3, 10, 101):
+            values = rng.integers(-5, 500, size=size)
+            unique, counts = np.unique(values, return_counts=True)
+            expected = [float(np.percentile(values, q)) for q in PERCENTILES]
+            assert (
+                percentiles_from_counts(unique.tolist(), counts.tolist(), PERCENTILES)
+                == expected
+            )
+
+
+class TestLatencyCounts:
+    def test_record_and_add(self, latencies: np.ndarray) -> None:
+        counts = LatencyCounts()
+        counts.record(latencies[:100])
+        for latency in latencies[100:200].tolist():
+            counts.add(latency)
+        assert counts.count == 200
+        assert counts.min == int(latencies[:200].min())
+        assert counts.max == int(latencies[:200].max())
+        expected = [float(np.percentile(latencies[:200], q)) for q in PERCENTILES]
+        assert counts.percentiles(PERCENTILES) == expected
+
+    def test_record_narrow_and_wide_ranges(self) -> None:
+        # Counted with bincount when the range is narrow, sorted otherwise.
+        narrow = np.array([105, 100, 105, 103, 100, 105], dtype=np.int64)
+        wide = np.array([5, 100000, 5, 7], dtype=np.int64)
+        counts = LatencyCounts()
+        counts.record(narrow)
+        assert counts.counts == {100: 2, 103: 1, 105: 3}
+        counts.record(wide)
+        assert counts.counts == {5: 2, 7: 1, 100: 2, 103: 1, 105: 3, 100000: 1}
+        counts.record(np.empty(0, dtype=np.int64))
+        assert counts.count == 10
+
+    def test_merge_requires_same_type(self) -> None:
+        with pytest.raises(TypeError):
+            LatencyCounts().merge(LatencyHistogram())
+
+
+class TestLatencyHistogram:
+    def test_exact_below_limit(self) -> None:
+        values = np.arange(256)
+        histogram = LatencyHistogram(significant_bits=8)
+        histogram.record(values)
+        expected = [float(np.percentile(values, q)) for q in PERCENTILES]
+        assert histogram.percentiles(PERCENTILES) == expected
+
+    def test_bounded_relative_error(self, latencies: np.ndarray) -> None:
+        histogram = LatencyHistogram(significant_bits=8)
+        histogram.record(latencies)
+        assert histogram.min == int(latencies.min())
+        assert histogram.max == int(latencies.max())
+        for q, value in zip(PERCENTILES, histogram.percentiles(PERCENTILES)):
+            exact = np.percentile(latencies, q)
+            assert abs(value - exact) <= exact * 2**-8 + 1
+
+    def test_merge_matches_single_histogram(self, latencies: np.ndarray) -> None:
+        whole = LatencyHistogram()
+        whole.record(latencies)
+        merged = LatencyHistogram()
+        for part in np.array_split(latencies, 3):
+            histogram = LatencyHistogram()
+            histogram.record(part)
+            merged.merge(histogram)
+        assert merged.count == whole.count
+        assert (merged.counts == whole.counts).all()
+        assert merged.percentiles(PERCENTILES) == whole.percentiles(PERCENTILES)
+
+    def test_merge_requires_same_settings(self) -> None:
+        with pytest.raises(TypeError):
+            LatencyHistogram(significant_bits=8).merge(
+                LatencyHistogram(significant_bits=7)
+            )
+
+    def test_bucket_range(self) -> None:
+        histogram = LatencyHistogram(significant_bits=4, max_bits=12)
+        values = np.arange(1 << 12)
+        buckets = histogram.bucket(values)
+        assert buckets.max() == len(histogram.counts) - 1
+        for value, bucket in zip(values.tolist(), buckets.tolist()):
+            assert value in histogram.bucket_range(bucket)
+
+    def test_add_matches_record(self, latencies: np.ndarray) -> None:
+        recorded = LatencyHistogram()
+        recorded.record(latencies)
+        added = LatencyHistogram()
+        for latency in latencies.tolist():
+            added.add(latency)
+        assert (added.counts == recorded.counts).all()
+        assert (added.min, added.max, added.count) == (
+            recorded.min,
+            recorded.max,
+            recorded.count,
+        )
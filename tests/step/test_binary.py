@@ -0,0 +1,109 @@
+from datetime import datetime
+from decimal import Decimal
+from perfsize.perfsize import lt, Condition, Config, Plan, Result, ResultManager, Run
+from perfsize.step.binary import BinarySearchStepManager
+import pytest
+from typing import Callable, Dict
+
+TPS = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "20"]
+TPS += ["30", "40", "50", "60", "70", "80", "90", "100", "200", "300", "400"]
+
+
+class CapacityResultManager(ResultManager):
+    """Fails steps above a fixed max TPS per instance type."""
+
+    def __init__(self, capacity: Dict[str, int]) -> None:
+        self.capacity = capacity
+
+    def query(self, config: Config, run: Run) -> None:
+        tps = int(config.parameters["steady_state_tps"])
+        passed = tps <= self.capacity[config.parameters["instance_type"]]
+        run.results.append(
+            Result(
+                "percent_fail",
+                Decimal("0" if passed else "100"),
+                config.requirements["percent_fail"],
+            )
+        )
+
+
+PERCENT_FAIL = {"percent_fail": [Condition(lt(Decimal("1")), "value < 1")]}
+
+
+@pytest.fixture
+def plan(make_plan: Callable[..., Plan]) -> Plan:
+    return make_plan(
+        TPS,
+        ["ml.m5.large", "ml.m5.xlarge", "ml.m5.2xlarge"],
+        PERCENT_FAIL,
+        {"initial_instance_count": ["1", "2"]},
+    )
+
+
+class TestBinarySearchStepManager:
+    def test_invalid_tps_parameter(self, plan: Plan) -> None:
+        with pytest.raises(ValueError):
+            BinarySearchStepManager(plan, tps_parameter="missing")
+
+    def test_finds_max_passing_tps_per_shape(
+        self, plan: Plan, run_workflow: Callable[..., Dict[str, str]]
+    ) -> None:
+        capacity = {"ml.m5.large": 0, "ml.m5.xlarge": 45, "ml.m5.2xlarge": 400}
+        step_manager = BinarySearchStepManager(plan)
+        run_workflow(plan, step_manager, [CapacityResultManager(capacity)])
+        assert step_manager.max_passing == {
+            ("ml.m5.large", "1"): None,
+            ("ml.m5.large", "2"): None,
+            ("ml.m5.xlarge", "1"): "40",
+            ("ml.m5.xlarge", "2"): "40",
+            ("ml.m5.2xlarge", "1"): "400",
+            ("ml.m5.2xlarge", "2"): "400",
+        }
+        # At most ceil(log2(22 + 1)) = 5 steps per shape instead of 22.
+        assert len(plan.history) <= 6 * 5
+        assert plan.recommendation == {
+            "instance_type": "ml.m5.xlarge",
+            "steady_state_tps": "40",
+            "initial_instance_count": "1",
+        }
+
+    def test_no_recommendation_if_all_fail(
+        self, plan: Plan, run_workflow: Callable[..., Dict[str, str]]
+    ) -> None:
+        capacity = {"ml.m5.large": 0, "ml.m5.xlarge": 0, "ml.m5.2xlarge": 0}
+        step_manager = BinarySearchStepManager(plan)
+        run_workflow(plan, step_manager, [CapacityResultManager(capacity)])
+        assert set(step_manager.max_passing.values()) == {None}
+        assert plan.recommendation == {}
+
+    def test_next_batch_searches_shapes_at_once(self, plan: Plan) -> None:
+        capacity = {"ml.m5.large": 0, "ml.m5.xlarge": 45, "ml.m5.2xlarge": 400}
+        result_manager = CapacityResultManager(capacity)
+        step_manager = BinarySearchStepManager(plan)
+        batch = step_manager.next_batch(4)
+        # The midpoint of each of the first 4 shapes.
+        assert [config.parameters for config in batch] == [
+            {
+                "instance_type": instance_type,
+                "steady_state_tps": "20",
+                "initial_instance_count": count,
+            }
+            for instance_type in ["ml.m5.large", "ml.m5.xlarge"]
+            for count in ["1", "2"]
+        ]
+        for config in batch[1:]:
+            run = Run("id", datetime.now(), datetime.now(), [])
+            result_manager.query(config, run)
+            config.runs.append(run)
+        # A shape still being tested gets no other step.
+        batch = step_manager.next_batch(6, batch[:1])
+        assert [config.parameters["steady_state_tps"] for config in batch] == [
+            "5",
+            "80",
+            "80",
+            "20",
+            "20",
+        ]
+        assert batch[0].parameters["instance_type"] == "ml.m5.large"
+        assert batch[0].parameters["initial_instance_count"] == "2"
+        assert plan.recommendation["instance_type"] == "ml.m5.xlarge"
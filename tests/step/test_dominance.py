@@ -0,0 +1,87 @@
+from datetime import datetime
+from decimal import Decimal
+from perfsize.perfsize import lt, Condition, Config, Plan, Result, ResultManager, Run
+from perfsize.step.dominance import CAPACITY, LOAD, DominanceStepManager
+import pytest
+from typing import Callable, Dict
+
+CAPACITY_PER_INSTANCE = {"ml.m5.large": 30, "ml.m5.xlarge": 70, "ml.m5.2xlarge": 150}
+
+
+def passes(parameters: Dict[str, str]) -> bool:
+    capacity = CAPACITY_PER_INSTANCE[parameters["instance_type"]] * int(
+        parameters["initial_instance_count"]
+    )
+    return int(parameters["steady_state_tps"]) <= capacity
+
+
+class CapacityResultManager(ResultManager):
+    """Fails steps above the capacity of the instance type and count."""
+
+    def query(self, config: Config, run: Run) -> None:
+        run.results.append(
+            Result(
+                "percent_fail",
+                Decimal("0" if passes(config.parameters) else "100"),
+                config.requirements["percent_fail"],
+            )
+        )
+
+
+@pytest.fixture
+def plan(make_plan: Callable[..., Plan]) -> Plan:
+    return make_plan(
+        [str(tps) for tps in range(10, 610, 10)],
+        list(CAPACITY_PER_INSTANCE),
+        {"percent_fail": [Condition(lt(Decimal("1")), "value < 1")]},
+        {
+            "initial_instance_count": ["1", "2", "3", "4"],
+            "region": ["us-west-2", "us-east-1"],
+        },
+    )
+
+
+ORDERINGS = {
+    "instance_type": CAPACITY,
+    "initial_instance_count": CAPACITY,
+    "steady_state_tps": LOAD,
+}
+
+
+class TestDominanceStepManager:
+    def test_invalid_orderings(self, plan: Plan) -> None:
+        with pytest.raises(ValueError):
+            DominanceStepManager(plan, {"missing": CAPACITY})
+        with pytest.raises(ValueError):
+            DominanceStepManager(plan, {"steady_state_tps": "sideways"})
+
+    def test_implied_results_match_actual(
+        self, plan: Plan, run_workflow: Callable[..., Dict[str, str]]
+    ) -> None:
+        step_manager = DominanceStepManager(plan, ORDERINGS)
+        recommendation = run_workflow(plan, step_manager, [CapacityResultManager()])
+        for combination, config in plan.configs.items():
+            assert step_manager.passed(combination) == passes(config.parameters)
+        assert len(step_manager.tested) == len(plan.history)
+        assert len(plan.history) < len(plan.configs) / 10
+        assert recommendation == {
+            "instance_type": "ml.m5.large",
+            "initial_instance_count": "1",
+            "steady_state_tps": "10",
+            "region": "us-west-2",
+        }
+
+    def test_unordered_parameters_are_independent(self, plan: Plan) -> None:
+        step_manager = DominanceStepManager(plan, {})
+        config = step_manager.next()
+        assert config is not None
+        config.runs.append(Run("id", datetime.now(), datetime.now(), []))
+        step_manager.next()
+        # Without orderings, a result implies nothing about other configs.
+        assert (
+            sum(
+                step_manager.passed(combination) is not None
+                for combination in plan.combinations
+            )
+            == 1
+        )
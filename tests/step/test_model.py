@@ -0,0 +1,126 @@
+from decimal import Decimal
+from perfsize.perfsize import Config, Plan, Result, ResultManager, Run
+from perfsize.step.binary import BinarySearchStepManager
+from perfsize.step.model import LatencyCurve, ModelStepManager
+import pytest
+from typing import Callable, Dict
+
+CAPACITY = {"ml.m5.large": 130, "ml.m5.xlarge": 270, "ml.m5.2xlarge": 610}
+TPS = [str(tps) for tps in range(10, 1010, 10)]
+
+
+class QueueingResultManager(ResultManager):
+    """p99 latency of 50ms without load, growing like an M/M/1 queue."""
+
+    def query(self, config: Config, run: Run) -> None:
+        tps = int(config.parameters["steady_state_tps"])
+        utilization = tps / CAPACITY[config.parameters["instance_type"]]
+        p99 = 50 / (1 - utilization) if utilization < 1 else 60000
+        run.results.append(
+            Result(
+                "latency_success_p99",
+                Decimal(int(p99)),
+                config.requirements["latency_success_p99"],
+            )
+        )
+
+
+class CliffResultManager(ResultManager):
+    """p99 latency growing slowly with TPS up to a cliff, then saturated."""
+
+    def __init__(self, cliff: int):
+        self.cliff = cliff
+
+    def query(self, config: Config, run: Run) -> None:
+        tps = int(config.parameters["steady_state_tps"])
+        p99 = 50 + tps // 100 if tps < self.cliff else 1500
+        run.results.append(
+            Result(
+                "latency_success_p99",
+                Decimal(p99),
+                config.requirements["latency_success_p99"],
+            )
+        )
+
+
+class TestLatencyCurve:
+    def test_fit(self) -> None:
+        points = [(tps, 50 / (1 - tps / 200)) for tps in (20.0, 100.0, 150.0)]
+        curve = LatencyCurve.fit(points)
+        assert curve is not None
+        assert curve.capacity == pytest.approx(200)
+        assert curve.latency(100) == pytest.approx(100)
+        assert curve.tps(200) == pytest.approx(150)
+        assert curve.latency(250) == float("inf")
+        assert "capacity=200" in repr(curve)
+
+    def test_fit_needs_growing_latency(self) -> None:
+        assert LatencyCurve.fit([(10.0, 50.0)]) is None
+        assert LatencyCurve.fit([(10.0, 50.0), (10.0, 60.0)]) is None
+        assert LatencyCurve.fit([(10.0, 60.0), (20.0, 50.0)]) is None
+
+
+class TestModelStepManager:
+    def test_fewer_steps_than_binary_search(
+        self,
+        make_plan: Callable[..., Plan],
+        run_workflow: Callable[..., Dict[str, str]],
+    ) -> None:
+        binary_plan = make_plan(TPS, CAPACITY)
+        binary = BinarySearchStepManager(binary_plan)
+        run_workflow(binary_plan, binary, [QueueingResultManager()])
+        model_plan = make_plan(TPS, CAPACITY)
+        model = ModelStepManager(model_plan, threshold=Decimal("200"))
+        run_workflow(model_plan, model, [QueueingResultManager()])
+        # Highest passing TPS is just under 3/4 of capacity.
+        assert model.max_passing == binary.max_passing
+        assert model.max_passing == {
+            ("ml.m5.large",): "90",
+            ("ml.m5.xlarge",): "200",
+            ("ml.m5.2xlarge",): "450",
+        }
+        assert len(model_plan.history) < len(binary_plan.history)
+        curve = model.curves[("ml.m5.2xlarge",)]
+        assert curve is not None
+        assert curve.capacity == pytest.approx(610, rel=0.05)
+        assert model_plan.recommendation == {
+            "instance_type": "ml.m5.large",
+            "steady_state_tps": "90",
+        }
+
+    def test_tolerance(
+        self,
+        make_plan: Callable[..., Plan],
+        run_workflow: Callable[..., Dict[str, str]],
+    ) -> None:
+        plan = make_plan(TPS, CAPACITY)
+        exact = ModelStepManager(plan, threshold=Decimal("200"))
+        run_workflow(plan, exact, [QueueingResultManager()])
+        plan = make_plan(TPS, CAPACITY)
+        tolerant = ModelStepManager(
+            plan, threshold=Decimal("200"), tolerance=Decimal("100")
+        )
+        run_workflow(plan, tolerant, [QueueingResultManager()])
+        assert len(plan.history) <= len(exact.plan.history)
+        for shape, tps in tolerant.max_passing.items():
+            assert tps is not None
+            exact_tps = exact.max_passing[shape]
+            assert exact_tps is not None
+            assert 0 <= int(exact_tps) - int(tps) <= 100
+
+    @pytest.mark.parametrize("cliff", [50, 260, 530, 770])
+    def test_latency_cliff_close_to_binary_search(
+        self,
+        make_plan: Callable[..., Plan],
+        run_workflow: Callable[..., Dict[str, str]],
+        cliff: int,
+    ) -> None:
+        binary_plan = make_plan(TPS, ["ml.m5.large"])
+        binary = BinarySearchStepManager(binary_plan)
+        run_workflow(binary_plan, binary, [CliffResultManager(cliff)])
+        model_plan = make_plan(TPS, ["ml.m5.large"])
+        model = ModelStepManager(model_plan, threshold=Decimal("200"))
+        run_workflow(model_plan, model, [CliffResultManager(cliff)])
+        assert model.max_passing == binary.max_passing
+        # Without the fallback the curve crept up on the cliff in up to 19 steps.
+        assert len(model_plan.history) <= len(binary_plan.history) + 2
@@ -0,0 +1,101 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+import numpy as np
+from perfsize.archive import load, save, summary
+from perfsize.perfsize import gte, lt, Condition, Plan, Result, Run
+from pathlib import Path
+import pytest
+from typing import Callable
+
+
+def add_runs(plan: Plan) -> Plan:
+    for tps, value in [("10", "150.125"), ("30", "0.1000000000000000000001")]:
+        config = plan.configs[("ml.m5.xlarge", tps)]
+        for index in range(2):
+            results = [
+                Result(
+                    "latency_success_p99",
+                    Decimal(value) + index,
+                    config.requirements["latency_success_p99"],
+                ),
+                Result("percent_fail", Decimal("0E-8"), []),
+            ]
+            start = datetime(2021, 5, 14, 8, 57, 34, 518000)
+            config.runs.append(Run(f"{tps}-{index}", start, datetime.now(), results))
+        plan.history.append(config)
+    plan.history[-1].runs[-1].aborted = True
+    plan.recommendation = plan.history[0].parameters
+    return plan
+
+
+@pytest.fixture
+def make_archived_plan(make_plan: Callable[..., Plan]) -> Callable[..., Plan]:
+    def make(lazy: bool = False) -> Plan:
+        plan = make_plan(
+            ["10", "20", "30"],
+            requirements={
+                "latency_success_p99": [
+                    Condition(lt(Decimal("200")), "value < 200"),
+                    Condition(gte(Decimal("0")), "value >= 0"),
+                ]
+            },
+            lazy=lazy,
+            load_parameters=["steady_state_tps"],
+        )
+        return add_runs(plan)
+
+    return make
+
+
+class TestArchive:
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_round_trip(
+        self, tmp_path: Path, lazy: bool, make_archived_plan: Callable[..., Plan]
+    ) -> None:
+        plan = make_archived_plan(lazy)
+        path = str(tmp_path / "plan.npz")
+        save(plan, path)
+        loaded = load(path)
+        assert repr(loaded) == repr(plan)
+        assert loaded.load_parameters == ["steady_state_tps"]
+        assert loaded.recommendation == plan.recommendation
+        assert [repr(config) for config in loaded.history] == [
+            repr(config) for config in plan.history
+        ]
+        value = loaded.history[1].runs[0].results[0].value
+        assert value == Decimal("0.1000000000000000000001")
+        assert str(loaded.history[1].runs[0].results[1].value) == "0E-8"
+        assert [c.status for c in loaded.history] == [True, False]
+        assert loaded.history[1].runs[1].aborted
+        assert loaded.configs[("ml.m5.large", "10")].runs == []
+
+    def test_summary_and_plan_without_runs(
+        self, tmp_path: Path, make_archived_plan: Callable[..., Plan]
+    ) -> None:
+        path = str(tmp_path / "plan.npz")
+        save(make_archived_plan(), path)
+        meta = summary(path)
+        assert meta["statuses"] == [True, False]
+        assert meta["runs"] == 4
+        assert meta["results"] == 8
+        loaded = load(path, runs=False)
+        assert [c.parameters["steady_state_tps"] for c in loaded.history] == [
+            "10",
+            "30",
+        ]
+        assert all(config.runs == [] for config in loaded.history)
+
+    def test_unsupported(
+        self, tmp_path: Path, make_archived_plan: Callable[..., Plan]
+    ) -> None:
+        plan = make_archived_plan()
+        plan.requirements["other"] = [Condition(lambda value: True, "always")]
+        with pytest.raises(ValueError):
+            save(plan, str(tmp_path / "plan.npz"))
+
+        path = str(tmp_path / "future.npz")
+        meta = json.dumps({"version": 99}).encode()
+        np.savez_compressed(path, meta=np.frombuffer(meta, dtype=np.uint8))
+        with pytest.raises(ValueError):
+            load(path)
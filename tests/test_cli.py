@@ -0,0 +1,93 @@
+from decimal import Decimal
+import json
+from perfsize.archive import summary
+from perfsize.cli import main, parse_condition
+from perfsize.perfsize import Comparison, lt, Result
+from pathlib import Path
+import pytest
+import subprocess
+import sys
+
+# Time allowed to import the core modules, step managers, result managers
+# and the CLI in a fresh interpreter, without numpy, pandas or yaml.
+COLD_START_BUDGET_SECONDS = 0.5
+
+PLAN = """\
+parameters:
+  instance_type: [ml.m5.large, ml.m5.xlarge]
+  steady_state_tps: [10, 20, 30]
+load_parameters: [steady_state_tps]
+requirements:
+  latency_success_p99: ["< 200", ">= 0"]
+step_manager:
+  class: perfsize.step.binary.BinarySearchStepManager
+  options:
+    tps_parameter: steady_state_tps
+environment_manager: perfsize.environment.mock.MockEnvironmentManager
+load_manager: perfsize.load.mock.MockLoadManager
+result_managers:
+  - perfsize.result.mock.MockResultManager
+workflow:
+  teardown_between_steps: false
+"""
+
+
+class TestCli:
+    def test_cold_start(self) -> None:
+        code = """\
+import sys, time
+start = time.perf_counter()
+import perfsize.perfsize, perfsize.cli, perfsize.evaluate, perfsize.table
+import perfsize.step.binary, perfsize.step.dominance, perfsize.step.model
+import perfsize.result.gatling
+print(time.perf_counter() - start)
+print(sorted(name for name in ("numpy", "pandas", "yaml") if name in sys.modules))
+"""
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout.split("\n")
+        assert output[1] == "[]"
+        assert float(output[0]) < COLD_START_BUDGET_SECONDS
+
+    def test_no_decimal_trap(self) -> None:
+        with pytest.raises(TypeError):
+            lt(Decimal("1"))(0.5)  # type: ignore[arg-type]
+        with pytest.raises(TypeError):
+            Result("p99", 1.5, [])  # type: ignore[arg-type]
+        # Other code in the process may still mix floats and decimals.
+        assert Decimal("1.5") < 2.0
+
+    def test_parse_condition(self) -> None:
+        condition = parse_condition(" >= 0.01")
+        assert condition.function == Comparison(">=", Decimal("0.01"))
+        assert condition.description == "value >= 0.01"
+        with pytest.raises(ValueError):
+            parse_condition("<200")
+
+    def test_run_plan(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        plan_path = tmp_path / "plan.yaml"
+        plan_path.write_text(PLAN)
+        journal_path = tmp_path / "journal.jsonl"
+        saved_path = tmp_path / "plan.npz"
+        assert (
+            main(
+                [
+                    str(plan_path),
+                    "--journal",
+                    str(journal_path),
+                    "--save",
+                    str(saved_path),
+                ]
+            )
+            == 0
+        )
+        recommendation = json.loads(capsys.readouterr().out.splitlines()[-1])
+        assert recommendation == {
+            "instance_type": "ml.m5.large",
+            "steady_state_tps": "30",
+        }
+        assert summary(str(saved_path))["recommendation"] == recommendation
+        assert len(journal_path.read_text().splitlines()) == 4
+
+        plan_path.write_text(PLAN.replace("< 200", "< 100"))
+        assert main([str(plan_path)]) == 1
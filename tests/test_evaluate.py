@@ -0,0 +1,140 @@
+from datetime import datetime
+from decimal import Decimal
+from perfsize.perfsize import (
+    lt,
+    lte,
+    gt,
+    gte,
+    eq,
+    neq,
+    Comparison,
+    Condition,
+    Plan,
+    Result,
+    Run,
+    Workflow,
+)
+from perfsize.environment.mock import MockEnvironmentManager
+from perfsize.evaluate import BatchEvaluator, exact
+from perfsize.load.mock import MockLoadManager
+from perfsize.result.mock import MockResultManager
+from perfsize.step.all import AllStepManager
+import pickle
+import pytest
+from typing import Dict, List
+from unittest.mock import patch
+
+
+def make_run(values: Dict[str, str], conditions: List[Condition]) -> Run:
+    # Only p99 has conditions.
+    results = [
+        Result(metric, Decimal(value), conditions if metric == "p99" else [])
+        for metric, value in values.items()
+    ]
+    return Run("id", datetime.now(), datetime.now(), results)
+
+
+class TestComparison:
+    def test_comparison(self) -> None:
+        assert lt(Decimal("200")) == Comparison("<", Decimal("200"))
+        assert lt(Decimal("200")) != lte(Decimal("200"))
+        assert repr(gte(Decimal("0"))) == "Comparison('>=', Decimal('0'))"
+        with pytest.raises(ValueError):
+            Comparison("<>", Decimal("1"))
+
+    def test_pickle_plan(self) -> None:
+        plan = Plan(
+            {"steady_state_tps": ["1", "2"]},
+            {"p99": [Condition(lt(Decimal("200")), "value < 200")]},
+        )
+        copy = pickle.loads(pickle.dumps(plan))
+        function = copy.requirements["p99"][0].function
+        assert function == lt(Decimal("200"))
+        assert function(Decimal("199.99"))
+
+
+class TestBatchEvaluator:
+    def test_matches_run_status(self) -> None:
+        conditions = [
+            Condition(gt(Decimal("0.1")), "value > 0.1"),
+            Condition(lte(Decimal("200.000000000000000001")), "precise"),
+            Condition(neq(Decimal("150")), "value != 150"),
+            Condition(lambda value: value != Decimal("42"), "not 42"),
+        ]
+        values = [
+            "0.1",
+            "0.10000000000000001",
+            "1E-400",
+            "42",
+            "150",
+            "199.9",
+            "200.000000000000000001",
+            "200.000000000000000002",
+            "1E+400",
+        ]
+        runs = [make_run({"p99": value}, conditions) for value in values]
+        runs.append(make_run({"p99": "100", "other": "1"}, conditions))
+        runs.append(make_run({"other": "1"}, conditions))
+        aborted = make_run({"p99": "100"}, conditions)
+        aborted.aborted = True
+        runs.append(aborted)
+        evaluator = BatchEvaluator({"p99": conditions})
+        assert evaluator.evaluate(runs) == [run.status for run in runs]
+        assert evaluator.evaluate(runs)[5:8] == [True, True, False]
+
+    def test_cache(self) -> None:
+        conditions = [Condition(eq(Decimal("1")), "value == 1")]
+        evaluator = BatchEvaluator({"p99": conditions})
+        run = make_run({"p99": "1"}, conditions)
+        assert evaluator.evaluate([run]) == [True]
+        with patch.object(evaluator, "check") as check:
+            assert evaluator.evaluate([run]) == [True]
+            check.assert_not_called()
+        run.results.append(Result("p99", Decimal("2"), conditions))
+        assert evaluator.evaluate([run]) == [False]
+
+    def test_exact(self) -> None:
+        assert exact(Decimal("123456789012345"))
+        assert not exact(Decimal("1234567890123456"))
+        assert not exact(Decimal("NaN"))
+
+    def test_new_requirements_for_finished_plan(self) -> None:
+        plan = Plan(
+            {"instance_type": ["ml.m5.large"], "steady_state_tps": ["1", "2", "3"]},
+            {"latency_success_p99": [Condition(lt(Decimal("200")), "value < 200")]},
+        )
+        Workflow(
+            plan=plan,
+            step_manager=AllStepManager(plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+        ).run()
+        assert all(config.status for config in plan.history)
+        stricter = BatchEvaluator(
+            {"latency_success_p99": [Condition(lt(Decimal("150")), "value < 150")]}
+        )
+        statuses = stricter.evaluate_plan(plan)
+        assert [config for config, _ in statuses] == plan.history
+        assert [status for _, status in statuses] == [False, False, False]
+
+    def test_cache_repeated_configs(self) -> None:
+        conditions = [Condition(lt(Decimal("200")), "value < 200")]
+        plan = Plan(
+            {"instance_type": ["ml.m5.large"], "steady_state_tps": ["1", "2"]},
+            {"p99": conditions},
+        )
+        for config, values in zip(plan.configs.values(), [["150", "170"], ["190"]]):
+            for value in values:
+                config.runs.append(make_run({"p99": value}, conditions))
+            plan.history.append(config)
+        evaluator = BatchEvaluator({"p99": conditions})
+        assert [status for _, status in evaluator.evaluate_plan(plan)] == [True, True]
+        with patch.object(evaluator, "compute", wraps=evaluator.compute) as compute:
+            assert [s for _, s in evaluator.evaluate_plan(plan)] == [True, True]
+            compute.assert_called_once_with([])
+        # A new run of the repeated config changes its mean.
+        repeated = plan.history[0]
+        repeated.runs.append(make_run({"p99": "300"}, conditions))
+        assert [s for _, s in evaluator.evaluate_plan(plan)] == [False, True]
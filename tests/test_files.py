@@ -0,0 +1,24 @@
+from perfsize.files import atomic_write
+from pathlib import Path
+import pytest
+
+
+class TestAtomicWrite:
+    def test_replaces_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "entry.json"
+        path.write_text("old")
+        with atomic_write(str(path)) as f:
+            f.write("new")
+            assert path.read_text() == "old"
+        assert path.read_text() == "new"
+        assert [p.name for p in tmp_path.iterdir()] == ["entry.json"]
+
+    def test_failed_write_removes_temporary_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "entry.npz"
+        path.write_bytes(b"old")
+        with pytest.raises(RuntimeError):
+            with atomic_write(str(path), "wb") as f:
+                f.write(b"partial")
+                raise RuntimeError("disk full")
+        assert path.read_bytes() == b"old"
+        assert [p.name for p in tmp_path.iterdir()] == ["entry.npz"]
@@ -0,0 +1,135 @@
+from datetime import datetime
+from decimal import Decimal
+from perfsize.perfsize import Config, ParallelWorkflow, Plan, Result, Run
+from perfsize.environment.mock import MockEnvironmentManager
+from perfsize.journal import decode_run, encode_run, Journal, parameters_key
+from perfsize.load.mock import MockLoadManager
+from perfsize.result.mock import MockResultManager
+from perfsize.step.all import AllStepManager
+from perfsize.step.binary import BinarySearchStepManager
+from pathlib import Path
+import pytest
+from typing import Callable, Dict, List
+
+
+class CrashingLoadManager(MockLoadManager):
+    """Raises after sending a given number of steps, like a dying process."""
+
+    def __init__(self, crash_after: int) -> None:
+        self.crash_after = crash_after
+        self.sent: List[Config] = []
+
+    def send(self, config: Config) -> Run:
+        if len(self.sent) == self.crash_after:
+            raise RuntimeError("crash")
+        self.sent.append(config)
+        return super().send(config)
+
+
+TPS = [str(tps) for tps in range(10, 110, 10)]
+
+
+class TestJournal:
+    def test_encode_decode(self, make_plan: Callable[..., Plan]) -> None:
+        plan = make_plan(TPS)
+        config = plan.configs[("ml.m5.large", "10")]
+        run = Run(
+            "run-id",
+            datetime(2021, 5, 14, 8, 57, 34, 518000),
+            datetime(2021, 5, 14, 9, 0, 0),
+            [
+                Result("latency_success_p99", Decimal("199.5"), []),
+                Result("percent_fail", Decimal("0.01"), []),
+            ],
+        )
+        run.aborted = True
+        decoded = decode_run(encode_run(config, run), config)
+        assert (decoded.id, decoded.start, decoded.end) == (run.id, run.start, run.end)
+        assert decoded.aborted
+        assert [(r.metric, r.value) for r in decoded.results] == [
+            ("latency_success_p99", Decimal("199.5")),
+            ("percent_fail", Decimal("0.01")),
+        ]
+        # Conditions come from the requirements of the config.
+        assert (
+            decoded.results[0].conditions == config.requirements["latency_success_p99"]
+        )
+        assert decoded.results[1].conditions == []
+        assert parameters_key({"b": "1", "a": "2"}) == (("a", "2"), ("b", "1"))
+
+    def test_resume_after_crash(
+        self,
+        tmp_path: Path,
+        make_plan: Callable[..., Plan],
+        run_workflow: Callable[..., Dict[str, str]],
+    ) -> None:
+        path = str(tmp_path / "journal.jsonl")
+        expected_plan = make_plan(TPS)
+        expected = run_workflow(
+            expected_plan,
+            BinarySearchStepManager(expected_plan),
+            journal=Journal(str(tmp_path / "other.jsonl")),
+        )
+
+        plan = make_plan(TPS)
+        crashing = CrashingLoadManager(crash_after=3)
+        with pytest.raises(RuntimeError):
+            run_workflow(
+                plan,
+                BinarySearchStepManager(plan),
+                load_manager=crashing,
+                journal=Journal(path),
+            )
+        # A crash in the middle of the last write leaves a partial line.
+        with open(path, "a") as f:
+            f.write('{"parameters": {"instance_')
+
+        plan = make_plan(TPS)
+        journal = Journal(path)
+        assert len(journal) == 3
+        load_manager = CrashingLoadManager(crash_after=1000)
+        recommendation = run_workflow(
+            plan,
+            BinarySearchStepManager(plan),
+            load_manager=load_manager,
+            journal=journal,
+        )
+        journal.close()
+        assert recommendation == expected
+        assert [c.parameters for c in plan.history] == [
+            c.parameters for c in expected_plan.history
+        ]
+        assert all(len(config.runs) == 1 for config in plan.history)
+        # Steps in the journal are not sent again.
+        assert load_manager.sent == plan.history[3:]
+        assert len(Journal(path)) == len(plan.history)
+
+    def test_parallel_resume(
+        self,
+        tmp_path: Path,
+        make_plan: Callable[..., Plan],
+        run_workflow: Callable[..., Dict[str, str]],
+    ) -> None:
+        path = str(tmp_path / "journal.jsonl")
+        plan = make_plan(TPS)
+        with pytest.raises(RuntimeError):
+            run_workflow(
+                plan,
+                AllStepManager(plan),
+                load_manager=CrashingLoadManager(crash_after=5),
+                journal=Journal(path),
+            )
+
+        plan = make_plan(TPS)
+        load_manager = CrashingLoadManager(crash_after=1000)
+        ParallelWorkflow(
+            plan=plan,
+            step_manager=AllStepManager(plan),
+            environment_managers=[MockEnvironmentManager() for _ in range(3)],
+            load_manager=load_manager,
+            result_managers=[MockResultManager()],
+            reporters=[],
+            journal=Journal(path),
+        ).run()
+        assert len(load_manager.sent) == 20 - 5
+        assert all(len(config.runs) == 1 for config in plan.configs.values())
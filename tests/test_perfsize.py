@@ -11,11 +11,13 @@ from perfsize.perfsize import (
     Result,
     Run,
     Config,
+    LazyConfigs,
     Plan,
     StepManager,
     EnvironmentManager,
     LoadManager,
     ResultManager,
+    ParallelWorkflow,
     Reporter,
     Workflow,
 )
@@ -23,8 +25,12 @@ from perfsize.environment.mock import MockEnvironmentManager
 from perfsize.load.mock import MockLoadManager
 from perfsize.reporter.mock import MockReporter
 from perfsize.result.mock import MockResultManager
+from perfsize.step.binary import BinarySearchStepManager
 from perfsize.step.mock import MockStepManager
 import pytest
+import threading
+import time
+from typing import List, Optional, Set, Tuple
 from unittest.mock import patch
 
 
@@ -159,6 +165,16 @@ class TestRun:
         assert result.successes == []
         assert run.status is None
 
+    def test_run_aborted(self) -> None:
+        run = Run(
+            "test-run-id",
+            datetime.fromisoformat("2021-04-01T00:00:00"),
+            datetime.fromisoformat("2021-04-01T01:00:00"),
+            [Result("percent_fail", Decimal("0"), [])],
+        )
+        run.aborted = True
+        assert run.status is False
+
 
 class TestConfig:
     def test_config(self) -> None:
@@ -182,6 +198,37 @@ class TestConfig:
         config = Config(parameters, requirements)
         assert config.runs == []
 
+    def test_config_status_and_confidence(self) -> None:
+        conditions = [Condition(lt(Decimal("200")), "value < 200")]
+        config = Config({"steady_state_tps": "100"}, {"p99": conditions})
+        assert config.status is None
+        assert config.confidence is None
+
+        def add(value: str) -> None:
+            results = [Result("p99", Decimal(value), conditions)]
+            config.runs.append(Run("id", datetime.now(), datetime.now(), results))
+
+        add("150")
+        assert config.status is True
+        assert config.confidence is None
+        add("152")
+        assert config.status is True
+        assert config.confidence is not None and config.confidence > 0.999
+        # A mean of 199 with values this far apart is hardly below 200.
+        add("243")
+        add("251")
+        assert config.status is True
+        confidence = config.confidence
+        assert confidence is not None and 0.5 < confidence < 0.9
+        # Status is the status of the mean, and a failure is as certain as
+        # the pass it replaces was not.
+        add("300")
+        assert config.status is False
+        assert config.confidence is not None and config.confidence > 0.5
+        config.runs[-1].aborted = True
+        assert config.status is False
+        assert config.confidence == 1.0
+
 
 @pytest.fixture
 def sample_plan() -> Plan:
@@ -238,6 +285,49 @@ class TestPlan:
         assert len(sample_plan.configs) == 88
         assert f"{sample_plan}".startswith("Plan")
 
+    def test_lazy_plan_matches_plan(self, sample_plan: Plan) -> None:
+        lazy_plan = Plan(sample_plan.parameter_lists, sample_plan.requirements, True)
+        assert list(lazy_plan.combinations) == sample_plan.combinations
+        assert lazy_plan.combinations[5] == sample_plan.combinations[5]
+        assert lazy_plan.combinations[-1] == sample_plan.combinations[-1]
+        assert lazy_plan.combinations[2:4] == sample_plan.combinations[2:4]
+        assert len(lazy_plan.configs) == 88
+        for index, (combination, config) in enumerate(lazy_plan.configs.items()):
+            assert lazy_plan.combinations.index(combination) == index
+            assert config.parameters == sample_plan.configs[combination].parameters
+        config = lazy_plan.configs[("ml.m5.large", "1", "1")]
+        assert lazy_plan.configs[("ml.m5.large", "1", "1")] is config
+        with pytest.raises(KeyError):
+            lazy_plan.configs[("ml.m5.large", "1", "1000")]
+        with pytest.raises(IndexError):
+            lazy_plan.combinations[88]
+
+    def test_lazy_plan_creates_configs_on_demand(self) -> None:
+        values = [str(value) for value in range(100)]
+        lazy_plan = Plan(
+            {"a": values, "b": values, "c": values, "d": values}, {}, lazy=True
+        )
+        assert len(lazy_plan.combinations) == 100_000_000
+        combination = lazy_plan.combinations[12_345_678]
+        assert combination == ("12", "34", "56", "78")
+        assert lazy_plan.configs[combination].parameters["d"] == "78"
+        assert isinstance(lazy_plan.configs, LazyConfigs)
+        assert len(lazy_plan.configs.materialized) == 1
+
+    def test_workflow_with_lazy_plan(self, sample_plan: Plan) -> None:
+        lazy_plan = Plan(sample_plan.parameter_lists, sample_plan.requirements, True)
+        workflow = Workflow(
+            plan=lazy_plan,
+            step_manager=MockStepManager(lazy_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[MockReporter()],
+        )
+        recommendation = workflow.run()
+        assert len(lazy_plan.history) == 88
+        assert recommendation["instance_type"] == "ml.m5.large"
+
 
 class TestStepManager:
     def test_step_manager(self, sample_plan: Plan) -> None:
@@ -262,6 +352,8 @@ class TestLoadManager:
         load_manager = LoadManager()
         with pytest.raises(NotImplementedError):
             run = load_manager.send(config)
+        with pytest.raises(NotImplementedError):
+            load_manager.abort(config)
 
 
 class TestResultManager:
@@ -276,6 +368,7 @@ class TestResultManager:
         result_manager = ResultManager()
         with pytest.raises(NotImplementedError):
             result_manager.query(config, run)
+        assert result_manager.interim(config) == []
 
 
 class TestReporter:
@@ -357,3 +450,469 @@ class TestWorkflow:
             teardown.assert_called_once()
             assert recommendation["instance_type"] == "ml.m5.large"
             assert recommendation["initial_instance_count"] == "1"
+
+
+class AbortableLoadManager(MockLoadManager):
+    """Sends load until aborted, or for at most a second."""
+
+    def __init__(self) -> None:
+        self.aborted = threading.Event()
+
+    def send(self, config: Config) -> Run:
+        run = super().send(config)
+        self.aborted.wait(timeout=1)
+        return run
+
+    def abort(self, config: Config) -> None:
+        super().abort(config)
+        self.aborted.set()
+
+
+class FailingInterimResultManager(MockResultManager):
+    def __init__(self) -> None:
+        self.starts = 0
+        self.calls = 0
+
+    def interim_start(self, config: Config) -> None:
+        self.starts += 1
+
+    def interim(self, config: Config) -> List[Result]:
+        self.calls += 1
+        return [
+            Result(
+                "percent_fail",
+                Decimal("40"),
+                config.requirements["percent_fail"],
+            )
+        ]
+
+
+class TestWorkflowEarlyAbort:
+    def test_abort_after_patience(self, sample_plan: Plan) -> None:
+        sample_plan.combinations = sample_plan.combinations[:1]
+        load_manager = AbortableLoadManager()
+        result_manager = FailingInterimResultManager()
+        workflow = Workflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=load_manager,
+            result_managers=[result_manager],
+            reporters=[],
+            abort_check_seconds=0.01,
+            abort_patience=3,
+        )
+        recommendation = workflow.run()
+        assert load_manager.aborted.is_set()
+        # Started once before the load, then one call per check until abort.
+        assert result_manager.starts == 1
+        assert result_manager.calls == 3
+        run = sample_plan.history[0].runs[0]
+        assert run.aborted
+        assert run.status is False
+        assert recommendation == {}
+
+    def test_no_abort_without_interim_failures(self, sample_plan: Plan) -> None:
+        sample_plan.combinations = sample_plan.combinations[:1]
+        workflow = Workflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+            abort_check_seconds=0.001,
+        )
+        recommendation = workflow.run()
+        assert sample_plan.history[0].runs[0].aborted is False
+        assert recommendation["instance_type"] == "ml.m5.large"
+
+    def test_interim_started_for_each_run(self, sample_plan: Plan) -> None:
+        sample_plan.combinations = sample_plan.combinations[:1]
+        result_manager = FailingInterimResultManager()
+        result_manager.interim = lambda config: []  # type: ignore[method-assign]
+        Workflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[result_manager],
+            reporters=[],
+            abort_check_seconds=0.001,
+            confidence=0.9,
+        ).run()
+        runs = sample_plan.history[0].runs
+        assert len(runs) == 2
+        assert result_manager.starts == 2
+
+
+class NoisyResultManager(MockResultManager):
+    """Reports the next of the given p99 values of each TPS in turn."""
+
+    def __init__(self, values: List[List[str]]) -> None:
+        self.values = values
+        self.queries = 0
+
+    def query(self, config: Config, run: Run) -> None:
+        values = self.values[int(config.parameters["steady_state_tps"]) - 1]
+        value = values[len(config.runs) - 1]
+        self.queries += 1
+        run.results.append(
+            Result(
+                "latency_success_p99",
+                Decimal(value),
+                config.requirements["latency_success_p99"],
+            )
+        )
+
+
+class TestWorkflowConfidence:
+    def test_repeat_until_confident(self, sample_plan: Plan) -> None:
+        sample_plan.combinations = sample_plan.combinations[:2]
+        result_manager = NoisyResultManager(
+            [["150", "151"], ["198", "202", "199", "201", "197"]]
+        )
+        workflow = Workflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[result_manager],
+            reporters=[MockReporter()],
+            confidence=0.95,
+            max_runs=5,
+        )
+        workflow.run()
+        clear, noisy = sample_plan.history
+        # A clear pass needs two runs, a noisy one runs up to the limit.
+        assert len(clear.runs) == 2
+        assert len(noisy.runs) == 5
+        assert noisy.status is True
+        assert noisy.confidence is not None and noisy.confidence < 0.95
+        assert result_manager.queries == 7
+
+    def test_parallel_repeat_until_confident(self, sample_plan: Plan) -> None:
+        sample_plan.combinations = sample_plan.combinations[:2]
+        result_manager = NoisyResultManager([["150", "151"], ["250", "350", "300"]])
+        ParallelWorkflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_managers=[MockEnvironmentManager(), MockEnvironmentManager()],
+            load_manager=MockLoadManager(),
+            result_managers=[result_manager],
+            reporters=[],
+            confidence=0.99,
+        ).run()
+        clear, failing = sample_plan.history
+        assert len(clear.runs) == 2
+        assert len(failing.runs) == 3
+        assert failing.status is False
+
+    def test_invalid_confidence(self, sample_plan: Plan) -> None:
+        with pytest.raises(ValueError):
+            Workflow(
+                plan=sample_plan,
+                step_manager=MockStepManager(sample_plan),
+                environment_manager=MockEnvironmentManager(),
+                load_manager=MockLoadManager(),
+                result_managers=[],
+                reporters=[],
+                confidence=0.3,
+            )
+
+
+class SlowLoadManager(MockLoadManager):
+    def __init__(self) -> None:
+        self.threads: Set[str] = set()
+        self.lock = threading.Lock()
+        self.sending = 0
+        self.peak = 0
+
+    def send(self, config: Config) -> Run:
+        with self.lock:
+            self.threads.add(threading.current_thread().name)
+            self.sending += 1
+            self.peak = max(self.peak, self.sending)
+        time.sleep(0.02)
+        try:
+            return super().send(config)
+        finally:
+            with self.lock:
+                self.sending -= 1
+
+
+class TestParallelWorkflow:
+    def test_parallel_workflow(self, sample_plan: Plan) -> None:
+        environment_managers = [MockEnvironmentManager() for _ in range(4)]
+        load_manager = SlowLoadManager()
+        workflow = ParallelWorkflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_managers=environment_managers,
+            load_manager=load_manager,
+            result_managers=[MockResultManager()],
+            reporters=[MockReporter()],
+        )
+        with patch(
+            "perfsize.environment.mock.MockEnvironmentManager.teardown"
+        ) as teardown:
+            recommendation = workflow.run()
+            assert teardown.call_count == 88
+        # Loads were sent from every environment's thread, and overlapped.
+        assert len(load_manager.threads) == 4
+        assert load_manager.peak > 1
+        assert len(sample_plan.history) == 88
+        assert all(len(config.runs) == 1 for config in sample_plan.history)
+        assert recommendation["instance_type"] == "ml.m5.large"
+        assert recommendation["steady_state_tps"] == "1"
+
+    def test_parallel_workflow_teardown_at_end(self, sample_plan: Plan) -> None:
+        workflow = ParallelWorkflow(
+            plan=sample_plan,
+            step_manager=MockStepManager(sample_plan),
+            environment_managers=[MockEnvironmentManager() for _ in range(3)],
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+            teardown_between_steps=False,
+        )
+        with patch(
+            "perfsize.environment.mock.MockEnvironmentManager.teardown"
+        ) as teardown:
+            workflow.run()
+            assert teardown.call_count == 3
+
+    def test_parallel_workflow_binary_search(self, sample_plan: Plan) -> None:
+        load_manager = SlowLoadManager()
+        workflow = ParallelWorkflow(
+            plan=sample_plan,
+            step_manager=BinarySearchStepManager(sample_plan),
+            environment_managers=[MockEnvironmentManager() for _ in range(4)],
+            load_manager=load_manager,
+            result_managers=[MockResultManager()],
+            reporters=[],
+        )
+        recommendation = workflow.run()
+        # The 4 shapes were searched at the same time, each one step at a time.
+        assert load_manager.peak > 1
+        assert len(sample_plan.history) == 4 * 5
+        # Same steps and recommendation as searching one shape at a time.
+        serial_plan = Plan(sample_plan.parameter_lists, sample_plan.requirements)
+        Workflow(
+            plan=serial_plan,
+            step_manager=BinarySearchStepManager(serial_plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+        ).run()
+        assert recommendation == serial_plan.recommendation
+        assert recommendation["steady_state_tps"] == "400"
+        assert sorted(
+            tuple(config.parameters.values()) for config in serial_plan.history
+        ) == sorted(tuple(config.parameters.values()) for config in sample_plan.history)
+
+    def test_parallel_workflow_needs_environment(self, sample_plan: Plan) -> None:
+        with pytest.raises(ValueError):
+            ParallelWorkflow(
+                sample_plan,
+                MockStepManager(sample_plan),
+                [],
+                MockLoadManager(),
+                [],
+                [],
+            )
+
+
+class TestInfrastructureReuse:
+    def test_plan_orders_load_parameters_fastest(self) -> None:
+        parameter_lists = {
+            "steady_state_tps": ["1", "2", "3"],
+            "instance_type": ["ml.m5.large", "ml.m5.xlarge"],
+        }
+        for lazy in (False, True):
+            plan = Plan(parameter_lists, {}, lazy, ["steady_state_tps"])
+            assert list(plan.combinations) == [
+                ("1", "ml.m5.large"),
+                ("2", "ml.m5.large"),
+                ("3", "ml.m5.large"),
+                ("1", "ml.m5.xlarge"),
+                ("2", "ml.m5.xlarge"),
+                ("3", "ml.m5.xlarge"),
+            ]
+            assert plan.combinations[4] == ("2", "ml.m5.xlarge")
+            assert plan.combinations.index(("2", "ml.m5.xlarge")) == 4
+            config = plan.configs[("2", "ml.m5.xlarge")]
+            assert plan.infrastructure_key(config) == ("ml.m5.xlarge",)
+        with pytest.raises(ValueError):
+            Plan(parameter_lists, {}, load_parameters=["missing"])
+
+    @pytest.mark.parametrize("teardown_between_steps", [True, False])
+    def test_workflow_redeploys_only_for_infrastructure(
+        self, sample_plan: Plan, teardown_between_steps: bool
+    ) -> None:
+        plan = Plan(
+            sample_plan.parameter_lists,
+            sample_plan.requirements,
+            load_parameters=["steady_state_tps"],
+        )
+        workflow = Workflow(
+            plan=plan,
+            step_manager=MockStepManager(plan),
+            environment_manager=MockEnvironmentManager(),
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+            teardown_between_steps=teardown_between_steps,
+        )
+        with patch(
+            "perfsize.environment.mock.MockEnvironmentManager.setup"
+        ) as setup, patch(
+            "perfsize.environment.mock.MockEnvironmentManager.teardown"
+        ) as teardown:
+            workflow.run()
+            assert setup.call_count == 4
+            assert teardown.call_count == (4 if teardown_between_steps else 1)
+        assert len(plan.history) == 88
+        assert workflow.deploy_count == 4
+        assert workflow.deploy_seconds >= 0
+
+    def test_parallel_workflow_reuses_slots(self, sample_plan: Plan) -> None:
+        plan = Plan(
+            sample_plan.parameter_lists,
+            sample_plan.requirements,
+            load_parameters=["steady_state_tps"],
+        )
+        workflow = ParallelWorkflow(
+            plan=plan,
+            step_manager=BinarySearchStepManager(plan),
+            environment_managers=[MockEnvironmentManager() for _ in range(2)],
+            load_manager=MockLoadManager(),
+            result_managers=[MockResultManager()],
+            reporters=[],
+        )
+        with patch(
+            "perfsize.environment.mock.MockEnvironmentManager.teardown"
+        ) as teardown:
+            workflow.run()
+            assert teardown.call_count == 4
+        assert workflow.deploy_count == 4
+        assert len(plan.history) == 4 * 5
+
+
+class RecordingEnvironmentManager(MockEnvironmentManager):
+    def __init__(self, events: List[Tuple[str, str]]) -> None:
+        self.events = events
+
+    def setup(self, config: Config) -> None:
+        self.events.append(("setup", config.parameters["instance_type"]))
+        time.sleep(0.02)
+
+    def teardown(self, config: Config) -> None:
+        self.events.append(("teardown", config.parameters["instance_type"]))
+
+
+class RecordingLoadManager(MockLoadManager):
+    def __init__(self, events: List[Tuple[str, str]]) -> None:
+        self.events = events
+
+    def send(self, config: Config) -> Run:
+        time.sleep(0.05)
+        self.events.append(("send", config.parameters["instance_type"]))
+        return super().send(config)
+
+
+class WrongGuessStepManager(MockStepManager):
+    def peek(self) -> Optional[Config]:
+        return self.plan.configs[self.plan.combinations[-1]]
+
+
+class TestWorkflowLookahead:
+    def make_plan(self) -> Plan:
+        return Plan(
+            {
+                "instance_type": ["ml.m5.large", "ml.m5.xlarge"],
+                "steady_state_tps": ["1", "2"],
+            },
+            {},
+            load_parameters=["steady_state_tps"],
+        )
+
+    def test_lookahead_sets_up_next_environment_during_load(self) -> None:
+        plan = self.make_plan()
+        events: List[Tuple[str, str]] = []
+        workflow = Workflow(
+            plan=plan,
+            step_manager=MockStepManager(plan),
+            environment_manager=RecordingEnvironmentManager(events),
+            load_manager=RecordingLoadManager(events),
+            result_managers=[],
+            reporters=[],
+            lookahead=True,
+        )
+        workflow.run()
+        assert events == [
+            ("setup", "ml.m5.large"),
+            ("send", "ml.m5.large"),
+            ("setup", "ml.m5.xlarge"),
+            ("send", "ml.m5.large"),
+            ("teardown", "ml.m5.large"),
+            ("send", "ml.m5.xlarge"),
+            ("send", "ml.m5.xlarge"),
+            ("teardown", "ml.m5.xlarge"),
+        ]
+        assert workflow.deploy_count == 2
+        assert workflow.lookahead_hits == 1
+        assert workflow.lookahead_misses == 0
+
+    def test_lookahead_discards_wrong_guess(self) -> None:
+        plan = self.make_plan()
+        events: List[Tuple[str, str]] = []
+        workflow = Workflow(
+            plan=plan,
+            step_manager=WrongGuessStepManager(plan),
+            environment_manager=RecordingEnvironmentManager(events),
+            load_manager=RecordingLoadManager(events),
+            result_managers=[],
+            reporters=[],
+            lookahead=True,
+        )
+        workflow.run()
+        assert events.count(("setup", "ml.m5.xlarge")) == 2
+        assert events.count(("teardown", "ml.m5.xlarge")) == 2
+        # Wrong while testing ml.m5.large at 1 TPS, right by chance at 2 TPS.
+        assert workflow.lookahead_misses == 1
+        assert workflow.lookahead_hits == 1
+        assert workflow.deploy_count == 3
+        assert len(plan.history) == 4
+
+    def test_lookahead_requires_teardown_between_steps(self, sample_plan: Plan) -> None:
+        with pytest.raises(ValueError):
+            Workflow(
+                plan=sample_plan,
+                step_manager=MockStepManager(sample_plan),
+                environment_manager=MockEnvironmentManager(),
+                load_manager=MockLoadManager(),
+                result_managers=[],
+                reporters=[],
+                teardown_between_steps=False,
+                lookahead=True,
+            )
+
+    def test_binary_search_peek(self, sample_plan: Plan) -> None:
+        step_manager = BinarySearchStepManager(sample_plan)
+        result_manager = MockResultManager()
+        load_manager = MockLoadManager()
+        peeked = []
+        config = step_manager.next()
+        while config:
+            guess = step_manager.peek()
+            run = load_manager.send(config)
+            config.runs.append(run)
+            result_manager.query(config, run)
+            config = step_manager.next()
+            if guess:
+                peeked.append(guess)
+                assert guess is config
+        # The last step of each shape but the last knows the next shape.
+        assert len(peeked) == 3
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import json
+from perfsize.perfsize import lt, Condition, Config, Plan, Run
+from perfsize.load.mock import MockLoadManager
+from perfsize.result.mock import MockResultManager
+from perfsize.step.all import AllStepManager
+from perfsize.store import CachingLoadManager, CachingResultManager, ResultStore
+from pathlib import Path
+import pytest
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class CountingLoadManager(MockLoadManager):
+    def __init__(self) -> None:
+        self.sent: List[Config] = []
+
+    def send(self, config: Config) -> Run:
+        self.sent.append(config)
+        return super().send(config)
+
+
+@pytest.fixture
+def run_plan(
+    make_plan: Callable[..., Plan], run_workflow: Callable[..., Dict[str, str]]
+) -> Callable[..., Tuple[Plan, CountingLoadManager]]:
+    """Run a plan through the store, requiring p99 latency under threshold."""
+
+    def run(
+        store: ResultStore, threshold: str, confidence: Optional[float] = None
+    ) -> Tuple[Plan, CountingLoadManager]:
+        condition = Condition(lt(Decimal(threshold)), f"value < {threshold}")
+        plan = make_plan(
+            ["10", "20"], requirements={"latency_success_p99": [condition]}
+        )
+        load_manager = CountingLoadManager()
+        run_workflow(
+            plan,
+            AllStepManager(plan),
+            [CachingResultManager([MockResultManager()], store)],
+            CachingLoadManager(load_manager, store),
+            confidence=confidence,
+        )
+        return plan, load_manager
+
+    return run
+
+
+class TestResultStore:
+    def test_reuse_with_new_requirements(
+        self, tmp_path: Path, run_plan: Callable[..., Tuple[Plan, CountingLoadManager]]
+    ) -> None:
+        store = ResultStore(str(tmp_path), "model-v1")
+        plan, load_manager = run_plan(store, "200")
+        assert len(load_manager.sent) == 4
+        assert plan.recommendation == {
+            "instance_type": "ml.m5.large",
+            "steady_state_tps": "10",
+        }
+
+        # Same configs with stricter requirements reuse the stored values.
+        plan, load_manager = run_plan(ResultStore(str(tmp_path), "model-v1"), "150")
+        assert load_manager.sent == []
+        assert plan.recommendation == {}
+        for config in plan.configs.values():
+            assert config.runs[0].results[0].value == Decimal("199")
+            assert config.runs[0].status is False
+
+    def test_version_and_ttl(
+        self, tmp_path: Path, run_plan: Callable[..., Tuple[Plan, CountingLoadManager]]
+    ) -> None:
+        store = ResultStore(str(tmp_path), "model-v1")
+        run_plan(store, "200")
+        _, load_manager = run_plan(ResultStore(str(tmp_path), "model-v2"), "200")
+        assert len(load_manager.sent) == 4
+
+        # Age the entries of model-v1 past the TTL.
+        store = ResultStore(str(tmp_path), "model-v1", ttl=timedelta(days=1))
+        for path in tmp_path.iterdir():
+            entry = json.loads(path.read_text())
+            if entry["version"] == "model-v1":
+                for stored in entry["runs"]:
+                    aged = datetime.utcnow() - timedelta(days=2)
+                    stored["stored"] = aged.isoformat()
+                path.write_text(json.dumps(entry))
+        config = Config({"steady_state_tps": "10", "instance_type": "ml.m5.large"}, {})
+        assert store.get(config) is None
+        # Replaces the stale run of one entry, then removes the other 3 entries
+        # and those of model-v2.
+        store.put(config, Run("kept", datetime.utcnow(), datetime.utcnow(), []))
+        assert store.purge() == 7
+        store = ResultStore(str(tmp_path), "model-v1", ttl=timedelta(days=1))
+        assert store.get(config) is not None
+        assert ResultStore(str(tmp_path), "model-v2").purge() == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_each_stored_run_served_once(self, tmp_path: Path) -> None:
+        store = ResultStore(str(tmp_path), "model-v1")
+        config = Config({"instance_type": "ml.m5.large"}, {})
+        now = datetime.utcnow()
+        store.put(config, Run("first", now, now, []))
+        store.put(config, Run("second", now, now, []))
+        # Runs stored by this store are already used.
+        assert store.get(config) is None
+
+        store = ResultStore(str(tmp_path), "model-v1")
+        served = [store.get(config), store.get(config), store.get(config)]
+        assert [run and run.id for run in served] == ["first", "second", None]
+        # Another config is served independently.
+        other = Config({"instance_type": "ml.m5.xlarge"}, {})
+        assert store.get(other) is None
+
+    def test_repeated_runs_are_not_reused(
+        self, tmp_path: Path, run_plan: Callable[..., Tuple[Plan, CountingLoadManager]]
+    ) -> None:
+        _, load_manager = run_plan(ResultStore(str(tmp_path), "model-v1"), "200")
+        assert len(load_manager.sent) == 4
+
+        # Each config has one stored run, so its second run sends the load.
+        store = ResultStore(str(tmp_path), "model-v1")
+        plan, load_manager = run_plan(store, "200", confidence=0.9)
+        assert len(load_manager.sent) == 4
+        for config in plan.configs.values():
+            assert len(config.runs) == 2
+            assert config.runs[0].id != config.runs[1].id
+
+        # Both runs of each config are now stored and reused once each.
+        store = ResultStore(str(tmp_path), "model-v1")
+        plan, load_manager = run_plan(store, "200", confidence=0.9)
+        assert load_manager.sent == []
+        for config in plan.configs.values():
+            assert len({run.id for run in config.runs}) == 2
@@ -0,0 +1,66 @@
+from datetime import datetime
+from decimal import Decimal
+from perfsize.perfsize import lt, Condition, Plan, Result, Run
+from perfsize.step.all import AllStepManager
+from perfsize.table import ResultsTable
+import pytest
+from typing import Callable, Dict
+
+
+@pytest.fixture
+def plan(make_plan: Callable[..., Plan]) -> Plan:
+    return make_plan(
+        ["10", "20", "30"],
+        requirements={
+            "latency_success_p99": [Condition(lt(Decimal("200")), "value < 200")],
+            "percent_fail": [Condition(lt(Decimal("0.01")), "value < 0.01")],
+        },
+    )
+
+
+class TestResultsTable:
+    def test_append_and_query(self, plan: Plan) -> None:
+        table = ResultsTable(plan.parameter_lists, capacity=2)
+        for (instance_type, tps), config in plan.configs.items():
+            results = [
+                Result(
+                    "latency_success_p99",
+                    Decimal(tps) * (2 if instance_type == "ml.m5.large" else 1),
+                    config.requirements["latency_success_p99"],
+                ),
+                Result("throughput", Decimal(tps), []),
+            ]
+            run = Run(f"{instance_type}-{tps}", datetime.now(), datetime.now(), results)
+            table.append(config, run)
+        assert len(table) == 12
+        rows = table.rows("latency_success_p99", instance_type="ml.m5.large")
+        assert list(table.parameter("steady_state_tps", rows)) == ["10", "20", "30"]
+        assert list(table.values(rows)) == [20.0, 40.0, 60.0]
+        assert len(table.rows(steady_state_tps="20")) == 4
+        assert len(table.rows("missing")) == 0
+        assert len(table.rows(instance_type="missing")) == 0
+
+        frame = table.to_frame()
+        assert frame.index.names == ["instance_type", "steady_state_tps"]
+        assert list(frame.columns) == ["run_id", "metric", "value", "passed"]
+        large = frame.xs("ml.m5.large", level="instance_type")
+        assert large[large.metric == "throughput"].passed.isna().all()
+        assert large[large.metric == "latency_success_p99"].passed.all()
+        assert list(frame.index.levels[1]) == ["10", "20", "30"]
+
+    def test_plan_results_follow_workflow(
+        self, plan: Plan, run_workflow: Callable[..., Dict[str, str]]
+    ) -> None:
+        run_workflow(plan, AllStepManager(plan))
+        # Created from the runs so far on first use.
+        table = plan.results
+        assert len(table) == 12
+        assert plan.results is table
+
+        # Then extended as the workflow records more runs.
+        plan.history = []
+        run_workflow(plan, AllStepManager(plan))
+        assert len(table) == 24
+        assert len(table.run_ids) == 12
+        rows = table.rows("percent_fail", instance_type="ml.m5.xlarge")
+        assert list(table.values(rows)) == [0.0] * 6